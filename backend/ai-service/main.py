@@ -0,0 +1,165 @@
+from fastapi import FastAPI, HTTPException, Header
+from pydantic import BaseModel
+from cachetools import TTLCache
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import List, Optional
+import asyncio
+import logging
+import os
+import httpx
+import jwt
+from jwt.exceptions import PyJWTError
+
+from backend.common.logs import RequestIdMiddleware, setup_logging
+from recommender import LazyModel, MicroBatcher, build_features, select_exercises
+
+SECRET_KEY = os.getenv("SECRET_KEY")  # Must match the key user_service signs tokens with
+USER_SERVICE_URL = os.getenv("USER_SERVICE_URL", "http://127.0.0.1:8000")
+# Compose service name and container port of workout_service
+WORKOUT_SERVICE_URL = os.getenv("WORKOUT_SERVICE_URL", "http://workout-service:8000")
+UPSTREAM_TIMEOUT = float(os.getenv("AI_UPSTREAM_TIMEOUT", "5.0"))
+HISTORY_SESSIONS = int(os.getenv("RECOMMENDER_HISTORY_SESSIONS", "20"))
+RESULT_CACHE_TTL = int(os.getenv("RECOMMENDER_CACHE_TTL", "3600"))
+RESULT_CACHE_SIZE = int(os.getenv("RECOMMENDER_CACHE_SIZE", "10000"))
+
+# JSON logs written off the event loop; levels from LOG_LEVEL / LOG_LEVELS
+setup_logging("ai_service")
+logger = logging.getLogger(__name__)
+
+upstream = {"client": None}
+model = LazyModel()
+batcher = MicroBatcher(model)
+
+# A recommendation only changes when the user logs a new session
+result_cache = TTLCache(maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL)
+cache_stats = {"hits": 0, "misses": 0}
+
+# Last catalogue body and its ETag; revalidated with If-None-Match on every miss
+catalogue_state = {"etag": None, "workouts": []}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    upstream["client"] = httpx.AsyncClient(timeout=UPSTREAM_TIMEOUT)
+    yield
+    await upstream["client"].aclose()
+
+app = FastAPI(title="AI Recommendation Service", lifespan=lifespan)
+app.add_middleware(RequestIdMiddleware)
+
+
+class RecommendedExercise(BaseModel):
+    workout_key: int
+    workout_name: str
+    workout_part: str
+    sets: int
+    reps: int
+    target_weight: Optional[float] = None
+
+class Recommendation(BaseModel):
+    user_id: int
+    based_on_session_id: Optional[int] = None
+    exercises: List[RecommendedExercise]
+
+
+def decode_token(authorization: str) -> dict:
+    token = authorization[7:] if authorization.startswith('Bearer ') else authorization
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+    except PyJWTError:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+
+
+async def fetch_json(url: str, authorization: str, params: dict = None):
+    try:
+        response = await upstream["client"].get(url, headers={"Authorization": authorization}, params=params)
+    except httpx.RequestError as e:
+        logger.error("Upstream request to %s failed: %s", url, e)
+        raise HTTPException(status_code=503, detail="Upstream service unavailable")
+    if response.status_code >= 400:
+        raise HTTPException(status_code=response.status_code, detail="Upstream service rejected the request")
+    return response.json()
+
+
+def check_access(claims: dict, user_id: int):
+    # Users may only see their own recommendation; a trainer's access is checked upstream
+    if claims.get("type") == "user":
+        if claims.get("user_id") != user_id:
+            raise HTTPException(status_code=403, detail="Not authorized to access this user's recommendations")
+    elif claims.get("type") != "trainer":
+        raise HTTPException(status_code=401, detail="Invalid user type")
+
+
+async def fetch_profile(claims: dict, user_id: int, authorization: str) -> dict:
+    if claims.get("type") == "user":
+        return await fetch_json(f"{USER_SERVICE_URL}/users/me/", authorization)
+    profile = await fetch_json(f"{USER_SERVICE_URL}/trainer/connected-users/{user_id}", authorization)
+    if profile is None:
+        raise HTTPException(status_code=403, detail="User is not connected to this trainer")
+    return profile
+
+
+async def fetch_catalogue() -> list:
+    headers = {"If-None-Match": catalogue_state["etag"]} if catalogue_state["etag"] else {}
+    try:
+        response = await upstream["client"].get(f"{WORKOUT_SERVICE_URL}/workouts/catalogue", headers=headers)
+    except httpx.RequestError as e:
+        if catalogue_state["workouts"]:
+            logger.warning("Catalogue revalidation failed, serving cached copy: %s", e)
+            return catalogue_state["workouts"]
+        raise HTTPException(status_code=503, detail="Workout catalogue unavailable")
+    if response.status_code == 304:
+        return catalogue_state["workouts"]
+    response.raise_for_status()
+    catalogue_state["workouts"] = response.json()["workouts"]
+    catalogue_state["etag"] = response.headers.get("etag")
+    return catalogue_state["workouts"]
+
+
+@app.get("/users/{user_id}/recommendation", response_model=Recommendation)
+async def recommend_next_workout(user_id: int, authorization: str = Header(None)):
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Authorization header is missing")
+    claims = decode_token(authorization)
+    check_access(claims, user_id)
+
+    # The history request is authorized by the workout service (a trainer must be connected to the
+    # user) and gives the cache key, so a cache hit needs no other upstream call
+    history = await fetch_json(f"{WORKOUT_SERVICE_URL}/users/{user_id}/sessions", authorization, {"limit": HISTORY_SESSIONS})
+    sessions = history["sessions"]
+    last_session_id = sessions[0]["session_id"] if sessions else None
+
+    cache_key = (user_id, last_session_id)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        cache_stats["hits"] += 1
+        return cached
+    cache_stats["misses"] += 1
+
+    profile, catalogue = await asyncio.gather(fetch_profile(claims, user_id, authorization), fetch_catalogue())
+    if not catalogue:
+        raise HTTPException(status_code=503, detail="Workout catalogue is empty")
+    features, best_1rm = build_features(sessions, catalogue, date.today())
+    scores = await batcher.score(features)
+    result = {
+        "user_id": user_id,
+        "based_on_session_id": last_session_id,
+        "exercises": select_exercises(scores, catalogue, best_1rm, profile),
+    }
+    result_cache[cache_key] = result
+    return result
+
+
+@app.get("/health")
+async def health_check():
+    return {"status": "healthy", "model_loaded": model.loaded}
+
+@app.get("/stats/recommender")
+async def recommender_stats():
+    return {
+        "model_loaded": model.loaded,
+        "batching": batcher.stats(),
+        "result_cache": {**cache_stats, "size": len(result_cache), "maxsize": result_cache.maxsize, "ttl": RESULT_CACHE_TTL},
+        "catalogue_etag": catalogue_state["etag"],
+    }
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MODEL_PATH = os.getenv("RECOMMENDER_MODEL_PATH")
+BATCH_MAX_SIZE = int(os.getenv("RECOMMENDER_BATCH_MAX_SIZE", "32"))
+BATCH_MAX_WAIT_MS = float(os.getenv("RECOMMENDER_BATCH_MAX_WAIT_MS", "5"))
+
+# Feature order shared by build_features and the model weights
+FEATURES = ("weeks_since_trained", "never_trained", "part_recent_share", "bias")
+DEFAULT_WEIGHTS = (1.0, 0.4, -1.5, 0.1)
+
+# workout_goal code -> (sets, reps, share of estimated 1RM)
+@dataclass(frozen=True)
+class Prescription:
+    sets: int
+    reps: int
+    intensity: float
+
+GOAL_PRESCRIPTIONS = {
+    1: Prescription(sets=5, reps=5, intensity=0.85),    # strength
+    2: Prescription(sets=4, reps=10, intensity=0.75),   # hypertrophy
+    3: Prescription(sets=3, reps=15, intensity=0.60),   # endurance
+}
+DEFAULT_PRESCRIPTION = GOAL_PRESCRIPTIONS[2]
+MINUTES_PER_EXERCISE = 10
+# Sessions per week at or above / below which the per-session sets move by one, keeping
+# weekly volume per exercise roughly level across schedules
+HIGH_FREQUENCY = 5
+LOW_FREQUENCY = 2
+MAX_PER_PART = 2
+
+
+def epley_1rm(weight: float, reps: int | None) -> float:
+    if reps is None or reps <= 1:
+        return weight
+    return weight * (1 + reps / 30)
+
+
+class RecommendationModel:
+    """Linear scorer over FEATURES; small enough to run on CPU inside the request path."""
+
+    def __init__(self, weights):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        if self.weights.shape != (len(FEATURES),):
+            raise ValueError(f"Expected {len(FEATURES)} weights, got {self.weights.shape}")
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH):
+        if path:
+            with open(path) as f:
+                weights = json.load(f)["weights"]
+            logger.info("Loaded recommender weights from %s", path)
+        else:
+            weights = DEFAULT_WEIGHTS
+        return cls(weights)
+
+    def score(self, features: np.ndarray) -> np.ndarray:
+        return features @ self.weights
+
+
+class LazyModel:
+    """Loads the model on first use so the service starts without touching model files."""
+
+    def __init__(self, loader=RecommendationModel.load):
+        self._loader = loader
+        self._model = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    async def get(self) -> RecommendationModel:
+        if self._model is None:
+            async with self._lock:
+                if self._model is None:
+                    self._model = await asyncio.to_thread(self._loader)
+        return self._model
+
+
+def build_features(history: list, catalogue: list, today: date) -> tuple:
+    """One feature row per catalogue exercise, plus each exercise's best estimated 1RM."""
+    last_trained = {}
+    best_1rm = {}
+    part_of = {w["workout_key"]: w["workout_part"] for w in catalogue}
+    part_volume = {}
+    for session in history:
+        session_date = date.fromisoformat(str(session["workout_date"]))
+        for s in session["sets"]:
+            key = s["workout_key"]
+            last_trained[key] = max(last_trained.get(key, session_date), session_date)
+            best_1rm[key] = max(best_1rm.get(key, 0.0), epley_1rm(s["weight"], s.get("reps")))
+            part = part_of.get(key)
+            part_volume[part] = part_volume.get(part, 0.0) + s["weight"] * (s.get("reps") or 1)
+    total_volume = sum(part_volume.values()) or 1.0
+
+    features = np.zeros((len(catalogue), len(FEATURES)), dtype=np.float64)
+    for i, workout in enumerate(catalogue):
+        key = workout["workout_key"]
+        if key in last_trained:
+            features[i, 0] = min((today - last_trained[key]).days / 7, 2.0)
+        else:
+            features[i, 1] = 1.0
+        features[i, 2] = part_volume.get(workout["workout_part"], 0.0) / total_volume
+        features[i, 3] = 1.0
+    return features, best_1rm
+
+
+def sets_for_frequency(sets: int, frequency: int | None) -> int:
+    if not frequency:
+        return sets
+    if frequency >= HIGH_FREQUENCY:
+        return max(2, sets - 1)
+    if frequency <= LOW_FREQUENCY:
+        return sets + 1
+    return sets
+
+
+def select_exercises(scores: np.ndarray, catalogue: list, best_1rm: dict, profile: dict) -> list:
+    prescription = GOAL_PRESCRIPTIONS.get(profile.get("workout_goal"), DEFAULT_PRESCRIPTION)
+    sets = sets_for_frequency(prescription.sets, profile.get("workout_frequency"))
+    count = max(1, (profile.get("workout_duration") or 45) // MINUTES_PER_EXERCISE)
+    per_part = {}
+    picked = []
+    for i in np.argsort(-scores, kind="stable"):
+        workout = catalogue[i]
+        part = workout["workout_part"]
+        if per_part.get(part, 0) >= MAX_PER_PART:
+            continue
+        per_part[part] = per_part.get(part, 0) + 1
+        one_rm = best_1rm.get(workout["workout_key"])
+        picked.append({
+            **workout,
+            "sets": sets,
+            "reps": prescription.reps,
+            # Round to the nearest 2.5 kg plate step
+            "target_weight": round(one_rm * prescription.intensity / 2.5) * 2.5 if one_rm else None,
+        })
+        if len(picked) == count:
+            break
+    return picked
+
+
+class MicroBatcher:
+    """Collects concurrent scoring requests and scores them with one matrix product.
+
+    A batch is flushed when it reaches ``max_size`` or ``max_wait`` seconds after
+    its first request, whichever comes first.
+    """
+
+    def __init__(self, model: LazyModel, max_size: int = BATCH_MAX_SIZE, max_wait: float = BATCH_MAX_WAIT_MS / 1000):
+        self.model = model
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self._pending = []
+        self._timer = None
+        # The event loop only keeps weak references to tasks; hold running batches until they finish
+        self._tasks = set()
+        self.batches = 0
+        self.batched_requests = 0
+
+    async def score(self, features: np.ndarray) -> np.ndarray:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((features, future))
+        if len(self._pending) >= self.max_size:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush_now)
+        return await future
+
+    def _flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list):
+        try:
+            model = await self.model.get()
+            stacked = np.vstack([features for features, _ in batch])
+            scores = await asyncio.to_thread(model.score, stacked)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += 1
+        self.batched_requests += len(batch)
+        offset = 0
+        for features, future in batch:
+            if not future.done():
+                future.set_result(scores[offset:offset + len(features)])
+            offset += len(features)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "requests": self.batched_requests,
+            "avg_batch_size": round(self.batched_requests / self.batches, 2) if self.batches else 0.0,
+            "in_flight": len(self._tasks),
+            "max_size": self.max_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
@@ -0,0 +1,71 @@
+import os
+import logging
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from backend.common import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(prefix: str, name: str, default: str) -> str:
+    # A service-specific variable (USER_DB_POOL_SIZE) wins over the shared one (DB_POOL_SIZE)
+    return os.getenv(f"{prefix}_{name}", os.getenv(name, default))
+
+def _flag(value: str) -> bool:
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+def create_engine(url: str, prefix: str) -> AsyncEngine:
+    """Build a service's async engine from environment settings.
+
+    Settings: DB_ECHO, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE, DB_POOL_PRE_PING and DB_STATEMENT_CACHE_SIZE (asyncpg
+    prepared statements per connection). Each may be prefixed with the
+    service's ``prefix`` to override it for that service only.
+    """
+    backend = make_url(url).get_backend_name()
+    options = {"echo": _flag(_setting(prefix, "DB_ECHO", "false"))}
+
+    # SQLite gets a static/singleton pool from SQLAlchemy that takes no sizing arguments
+    if backend != "sqlite":
+        options.update(
+            pool_size=int(_setting(prefix, "DB_POOL_SIZE", "5")),
+            max_overflow=int(_setting(prefix, "DB_MAX_OVERFLOW", "10")),
+            pool_timeout=float(_setting(prefix, "DB_POOL_TIMEOUT", "30")),
+            pool_recycle=int(_setting(prefix, "DB_POOL_RECYCLE", "1800")),
+            pool_pre_ping=_flag(_setting(prefix, "DB_POOL_PRE_PING", "true")),
+        )
+    if make_url(url).get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": int(_setting(prefix, "DB_STATEMENT_CACHE_SIZE", "100")),
+        }
+
+    logger.info("Creating %s engine for %s with %s", backend, prefix,
+                {k: v for k, v in options.items() if k != "connect_args"})
+    engine = create_async_engine(url, **options)
+    metrics.instrument_engine(engine)
+    return engine
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__, "status": pool.status()}
+    # Only queue pools report sizing; static/null pools have nothing to count
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        counter = getattr(pool, name, None)
+        if callable(counter):
+            stats[name] = counter()
+    return stats
+
+
+async def check_health(engine: AsyncEngine) -> dict:
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        database = "ok"
+    except Exception as e:
+        logger.error("Database health check failed: %s", e)
+        database = "unavailable"
+    return {"database": database, "pool": pool_stats(engine)}
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# redis://host:port/db to fan events out across processes; unset keeps them in-process.
+# The services run in separate containers, so docker-compose ships a redis service and sets it;
+# without it nothing published by user_service reaches workout_service and mapping invalidations
+# wait for the cache TTL
+EVENT_BUS_URL = os.getenv("EVENT_BUS_URL")
+RESUBSCRIBE_DELAY = float(os.getenv("EVENT_BUS_RESUBSCRIBE_DELAY", "1.0"))
+
+TRAINER_USER_MAPPING_CHANNEL = "trainer-user-mapping"
+# {"user_ids": [...], "trainer_ids": [...]} once accounts are gone from user_service
+MEMBER_DELETED_CHANNEL = "member-deleted"
+
+
+class InMemoryEventBus:
+    """Process-local pub/sub with the same interface as the Redis bus.
+
+    Used when both services share a process (tests, benchmarks) or when
+    EVENT_BUS_URL is not configured.
+    """
+
+    def __init__(self):
+        self._subscribers: dict[str, list] = {}
+
+    async def publish(self, channel: str, message: dict):
+        # Round-trip through JSON so handlers see exactly what Redis would deliver
+        payload = json.loads(json.dumps(message))
+        for handler in list(self._subscribers.get(channel, [])):
+            try:
+                await handler(payload)
+            except Exception:
+                logger.exception("Event handler failed on channel %s", channel)
+
+    async def subscribe(self, channel: str, handler):
+        self._subscribers.setdefault(channel, []).append(handler)
+
+    async def unsubscribe(self, channel: str, handler):
+        handlers = self._subscribers.get(channel, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    async def close(self):
+        pass
+
+
+class RedisEventBus:
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("EVENT_BUS_URL points at Redis but the 'redis' package is not installed") from e
+        self._redis = redis.from_url(url)
+        self._listeners: dict[tuple, tuple] = {}
+
+    async def publish(self, channel: str, message: dict):
+        await self._redis.publish(channel, json.dumps(message))
+
+    async def subscribe(self, channel: str, handler):
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(channel)
+        task = asyncio.create_task(self._listen(channel, pubsub, handler))
+        self._listeners[(channel, handler)] = (pubsub, task)
+
+    async def unsubscribe(self, channel: str, handler):
+        listener = self._listeners.pop((channel, handler), None)
+        if listener is None:
+            return
+        pubsub, task = listener
+        task.cancel()
+        await pubsub.unsubscribe(channel)
+        await pubsub.aclose()
+
+    async def _listen(self, channel: str, pubsub, handler):
+        while True:
+            try:
+                async for item in pubsub.listen():
+                    if item["type"] != "message":
+                        continue
+                    try:
+                        await handler(json.loads(item["data"]))
+                    except Exception:
+                        logger.exception("Event handler failed on channel %s", channel)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # A dropped connection would otherwise end the subscription for good; redis-py
+                # reconnects and re-subscribes on the next read
+                logger.exception("Lost subscription to channel %s, retrying", channel)
+                await asyncio.sleep(RESUBSCRIBE_DELAY)
+
+    async def close(self):
+        for channel, handler in list(self._listeners):
+            await self.unsubscribe(channel, handler)
+        await self._redis.aclose()
+
+
+_event_bus = None
+
+def is_process_local() -> bool:
+    return not EVENT_BUS_URL
+
+def warn_if_process_local(consequence: str):
+    # Called at startup by each service that depends on cross-service events
+    if is_process_local():
+        logger.warning("EVENT_BUS_URL is not set, so events stay inside this process: %s", consequence)
+
+def get_event_bus():
+    global _event_bus
+    if _event_bus is None:
+        _event_bus = RedisEventBus(EVENT_BUS_URL) if EVENT_BUS_URL else InMemoryEventBus()
+    return _event_bus
+
+async def publish(channel: str, message: dict):
+    # Invalidation is best effort: a lost event only means a stale entry until its TTL expires
+    try:
+        await get_event_bus().publish(channel, message)
+    except Exception:
+        logger.exception("Failed to publish event on channel %s", channel)
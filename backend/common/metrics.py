@@ -0,0 +1,198 @@
+"""Per-route request metrics in Prometheus text format.
+
+``MetricsMiddleware`` times each request and, through a context variable,
+collects what the request spent in SQL (engine events from
+``instrument_engine``), outbound HTTP (``add_http_time``) and bcrypt
+(``add_bcrypt_time``). With METRICS_ENABLED=false the middleware passes
+requests straight through, no engine listeners are attached and the
+``add_*`` helpers return immediately.
+"""
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from fastapi import HTTPException, Response
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: tuple, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series = {}
+
+    def observe(self, labels: tuple, value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            base = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, labels))
+            sep = "," if base else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {total}")
+            lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+    def clear(self):
+        self._series.clear()
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+
+    def inc(self, labels: tuple, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            base = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(self.labelnames, labels))
+            lines.append(f"{self.name}{{{base}}} {value}")
+        return lines
+
+    def clear(self):
+        self._values.clear()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Request latency by route template.",
+                            ("method", "route", "status"))
+REQUEST_SQL_STATEMENTS = Histogram("http_request_sql_statements", "SQL statements executed per request.",
+                                   ("method", "route"), COUNT_BUCKETS)
+REQUEST_DB_SECONDS = Histogram("http_request_db_seconds", "Time spent executing SQL per request.",
+                               ("method", "route"))
+REQUEST_HTTP_SECONDS = Histogram("http_request_upstream_seconds", "Time spent in outbound HTTP calls per request.",
+                                 ("method", "route"))
+REQUEST_BCRYPT_SECONDS = Histogram("http_request_bcrypt_seconds", "Time spent waiting on bcrypt per request.",
+                                   ("method", "route"))
+HISTOGRAMS = (REQUEST_LATENCY, REQUEST_SQL_STATEMENTS, REQUEST_DB_SECONDS, REQUEST_HTTP_SECONDS, REQUEST_BCRYPT_SECONDS)
+
+SINGLE_FLIGHT_CALLS = Counter("single_flight_calls_total",
+                              "Coalesced lookups by outcome: executed ran the query, collapsed shared another call's result.",
+                              ("name", "outcome"))
+COUNTERS = (SINGLE_FLIGHT_CALLS,)
+
+
+class RequestMetrics:
+    __slots__ = ("sql_statements", "db_seconds", "http_seconds", "bcrypt_seconds")
+
+    def __init__(self):
+        self.sql_statements = 0
+        self.db_seconds = 0.0
+        self.http_seconds = 0.0
+        self.bcrypt_seconds = 0.0
+
+
+_current: ContextVar[RequestMetrics | None] = ContextVar("request_metrics", default=None)
+
+
+def current() -> RequestMetrics | None:
+    return _current.get()
+
+def add_http_time(seconds: float):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.http_seconds += seconds
+
+def add_bcrypt_time(seconds: float):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.bcrypt_seconds += seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    metrics = _current.get()
+    started = getattr(context, "_metrics_started", None)
+    if metrics is not None and started is not None:
+        metrics.sql_statements += 1
+        metrics.db_seconds += time.perf_counter() - started
+
+
+def instrument_engine(engine: AsyncEngine):
+    # SQLAlchemy's async layer carries the caller's context into its greenlet, so the
+    # listeners see the request's RequestMetrics
+    if not METRICS_ENABLED:
+        return
+    if not event.contains(engine.sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not METRICS_ENABLED or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current.reset(token)
+            # The route template, not the raw path, keeps label cardinality bounded
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            labels = (scope["method"], route)
+            REQUEST_LATENCY.observe(labels + (str(status_code),), elapsed)
+            REQUEST_SQL_STATEMENTS.observe(labels, metrics.sql_statements)
+            REQUEST_DB_SECONDS.observe(labels, metrics.db_seconds)
+            REQUEST_HTTP_SECONDS.observe(labels, metrics.http_seconds)
+            REQUEST_BCRYPT_SECONDS.observe(labels, metrics.bcrypt_seconds)
+
+
+def render() -> str:
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    for counter in COUNTERS:
+        lines.extend(counter.render())
+    return "\n".join(lines) + "\n"
+
+
+def metrics_response() -> Response:
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(content=render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,20 @@
+import os
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from backend.common.engine import create_engine
+
+SQLALCHEMY_DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_HOMEWORK_URL")
+
+if not SQLALCHEMY_DATABASE_URL:
+    raise ValueError("SQLALCHEMY_DATABASE_HOMEWORK_URL is not set in the environment")
+
+# Pool sizing and echo come from DB_* / HOMEWORK_DB_* environment variables
+engine = create_engine(SQLALCHEMY_DATABASE_URL, "HOMEWORK")
+
+AsyncSession = sessionmaker(
+    engine, class_=AsyncSession, expire_on_commit=False
+)
+
+async def get_db():
+    async with AsyncSession() as session:
+        yield session
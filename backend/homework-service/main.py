@@ -0,0 +1,206 @@
+from fastapi import FastAPI, Depends, HTTPException, Header
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import List
+import asyncio
+import logging
+import os
+import httpx
+import jwt
+from jwt.exceptions import PyJWTError
+
+from backend.common.engine import pool_stats
+from backend.common.logs import RequestIdMiddleware, setup_logging
+
+import database
+import models
+import schemas
+from database import get_db
+from scheduler import HomeworkScheduler, HOMEWORK_SCHEDULER_INTERVAL, horizon, materialise_users
+
+SECRET_KEY = os.getenv("SECRET_KEY")  # Must match the key user_service signs tokens with
+USER_SERVICE_URL = os.getenv("USER_SERVICE_URL", "http://127.0.0.1:8000")
+UPSTREAM_TIMEOUT = float(os.getenv("HOMEWORK_UPSTREAM_TIMEOUT", "5.0"))
+MAPPINGS_PAGE_SIZE = 500
+
+# JSON logs written off the event loop; levels from LOG_LEVEL / LOG_LEVELS
+setup_logging("homework_service")
+logger = logging.getLogger(__name__)
+
+upstream = {"client": None}
+scheduler = HomeworkScheduler(database.AsyncSession)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tables come from the migration_hw Alembic tree, run before the service starts
+    upstream["client"] = httpx.AsyncClient(timeout=UPSTREAM_TIMEOUT)
+    scheduler_task = None
+    if HOMEWORK_SCHEDULER_INTERVAL > 0:
+        scheduler_task = asyncio.create_task(scheduler.run_forever())
+    yield
+    if scheduler_task:
+        scheduler_task.cancel()
+        try:
+            await scheduler_task
+        except asyncio.CancelledError:
+            pass
+    await upstream["client"].aclose()
+    await database.engine.dispose()
+
+app = FastAPI(title="Homework Service", lifespan=lifespan)
+app.add_middleware(RequestIdMiddleware)
+
+
+def get_current_member(authorization: str = Header(None)) -> dict:
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Authorization header is missing")
+    token = authorization[7:] if authorization.startswith('Bearer ') else authorization
+    try:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+    except PyJWTError:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+    user_type = claims.get("type")
+    if user_type not in ("user", "trainer") or claims.get(f"{user_type}_id") is None:
+        raise HTTPException(status_code=401, detail="Invalid token claims")
+    return {"user_type": user_type, "id": claims[f"{user_type}_id"], "authorization": authorization}
+
+def require_trainer(current_member: dict = Depends(get_current_member)) -> dict:
+    if current_member["user_type"] != "trainer":
+        raise HTTPException(status_code=403, detail="Trainer access required")
+    return current_member
+
+
+# Accepted client ids of the calling trainer, paged through user_service's /my-mappings/
+async def fetch_accepted_client_ids(authorization: str) -> set:
+    client_ids = set()
+    after_id = 0
+    while True:
+        try:
+            response = await upstream["client"].get(
+                f"{USER_SERVICE_URL}/my-mappings/",
+                params={"status": "accepted", "limit": MAPPINGS_PAGE_SIZE, "after_id": after_id},
+                headers={"Authorization": authorization},
+            )
+        except httpx.RequestError as e:
+            logger.error("Fetching trainer clients failed: %s", e)
+            raise HTTPException(status_code=503, detail="User service unavailable")
+        if response.status_code >= 400:
+            raise HTTPException(status_code=response.status_code, detail="Error fetching trainer clients")
+        page = response.json()
+        client_ids.update(m["user_id"] for m in page)
+        if len(page) < MAPPINGS_PAGE_SIZE:
+            return client_ids
+        after_id = page[-1]["mapping_id"]
+
+
+@app.post("/routines", response_model=schemas.Routine)
+async def create_routine(
+    routine: schemas.RoutineCreate,
+    trainer: dict = Depends(require_trainer),
+    db: AsyncSession = Depends(get_db)
+):
+    db_routine = models.HomeworkRoutine(
+        trainer_id=trainer["id"], name=routine.name, items=[item.model_dump() for item in routine.items]
+    )
+    db.add(db_routine)
+    await db.commit()
+    await db.refresh(db_routine)
+    return db_routine
+
+@app.get("/routines", response_model=List[schemas.Routine])
+async def read_routines(trainer: dict = Depends(require_trainer), db: AsyncSession = Depends(get_db)):
+    result = await db.execute(
+        select(models.HomeworkRoutine).where(models.HomeworkRoutine.trainer_id == trainer["id"])
+        .order_by(models.HomeworkRoutine.routine_id)
+    )
+    return result.scalars().all()
+
+
+# Fan one routine out to many clients: one multi-row INSERT plus their daily rows, in one transaction
+@app.post("/assignments/bulk", response_model=schemas.BulkAssignResponse)
+async def bulk_assign(
+    request: schemas.BulkAssign,
+    trainer: dict = Depends(require_trainer),
+    db: AsyncSession = Depends(get_db)
+):
+    if request.end_date is not None and request.end_date < request.start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    routine = await db.get(models.HomeworkRoutine, request.routine_id)
+    if routine is None or routine.trainer_id != trainer["id"]:
+        raise HTTPException(status_code=404, detail="Routine not found")
+
+    user_ids = sorted(set(request.user_ids))
+    client_ids = await fetch_accepted_client_ids(trainer["authorization"])
+    not_clients = [user_id for user_id in user_ids if user_id not in client_ids]
+    if not_clients:
+        raise HTTPException(status_code=400, detail=f"Not accepted clients of this trainer: {not_clients}")
+
+    result = await db.execute(
+        insert(models.HomeworkAssignment).returning(models.HomeworkAssignment.assignment_id),
+        [{
+            "routine_id": routine.routine_id,
+            "trainer_id": trainer["id"],
+            "user_id": user_id,
+            "start_date": request.start_date,
+            "end_date": request.end_date,
+            "days_of_week": request.days_of_week,
+            "active": True,
+        } for user_id in user_ids],
+    )
+    assignment_ids = sorted(result.scalars().all())
+    daily_rows = await materialise_users(db, user_ids, *horizon(None, scheduler.horizon_days))
+    await db.commit()
+    return {"routine_id": routine.routine_id, "assigned": len(assignment_ids),
+            "assignment_ids": assignment_ids, "daily_rows": daily_rows}
+
+@app.delete("/assignments/{assignment_id}", status_code=204)
+async def cancel_assignment(
+    assignment_id: int,
+    trainer: dict = Depends(require_trainer),
+    db: AsyncSession = Depends(get_db)
+):
+    assignment = await db.get(models.HomeworkAssignment, assignment_id)
+    if assignment is None or assignment.trainer_id != trainer["id"]:
+        raise HTTPException(status_code=404, detail="Assignment not found")
+    assignment.active = False
+    await db.flush()
+    await materialise_users(db, [assignment.user_id], *horizon(None, scheduler.horizon_days))
+    await db.commit()
+
+
+# Served straight from the materialised table: one primary-key lookup
+@app.get("/homework/today", response_model=schemas.DailyHomework)
+async def read_homework_today(current_member: dict = Depends(get_current_member), db: AsyncSession = Depends(get_db)):
+    return await read_homework(date.today(), current_member, db)
+
+@app.get("/homework/{homework_date}", response_model=schemas.DailyHomework)
+async def read_homework(
+    homework_date: date,
+    current_member: dict = Depends(get_current_member),
+    db: AsyncSession = Depends(get_db)
+):
+    if current_member["user_type"] != "user":
+        raise HTTPException(status_code=403, detail="Only users have homework")
+    _, end = horizon(None, scheduler.horizon_days)
+    if homework_date > end:
+        raise HTTPException(status_code=400, detail=f"Homework is scheduled {scheduler.horizon_days} days ahead")
+    row = await db.get(models.DailyHomework, (current_member["id"], homework_date))
+    return {"user_id": current_member["id"], "homework_date": homework_date,
+            "routines": row.routines if row else []}
+
+
+@app.get("/health")
+async def health_check():
+    return {"status": "healthy"}
+
+# Connection pool usage, for sizing against the Postgres connection budget
+@app.get("/stats/db-pool")
+async def read_db_pool_stats():
+    return pool_stats(database.engine)
+
+@app.get("/stats/scheduler")
+async def scheduler_stats():
+    return scheduler.stats()
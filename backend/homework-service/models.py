@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, ForeignKey, JSON, Index, func
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+# Every day of the week; bit 0 is Monday, matching date.weekday()
+ALL_DAYS = 0b1111111
+
+class HomeworkRoutine(Base):
+    __tablename__ = "homework_routine"
+    routine_id = Column(Integer, primary_key=True)
+    trainer_id = Column(Integer, nullable=False, index=True)
+    name = Column(String, nullable=False)
+    items = Column(JSON, nullable=False)  # [{"workout_key", "sets", "reps"}]
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+class HomeworkAssignment(Base):
+    __tablename__ = "homework_assignment"
+    assignment_id = Column(Integer, primary_key=True)
+    routine_id = Column(Integer, ForeignKey("homework_routine.routine_id"), nullable=False)
+    trainer_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=True)
+    days_of_week = Column(Integer, nullable=False, default=ALL_DAYS)
+    active = Column(Boolean, nullable=False, default=True)
+
+    __table_args__ = (
+        Index("ix_homework_assignment_user_id_active", "user_id", "active"),
+    )
+
+class DailyHomework(Base):
+    # Materialised by scheduler.py; one row per user and day so "today" is a primary-key read
+    __tablename__ = "daily_homework"
+    user_id = Column(Integer, primary_key=True)
+    homework_date = Column(Date, primary_key=True)
+    routines = Column(JSON, nullable=False)
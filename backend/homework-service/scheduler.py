@@ -0,0 +1,133 @@
+"""Materialises homework assignments into daily_homework.
+
+Each run rewrites the next ``horizon_days`` of rows for a batch of users at a
+time, so the read path never has to expand date ranges or join routines.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import models
+
+logger = logging.getLogger(__name__)
+
+HOMEWORK_HORIZON_DAYS = int(os.getenv("HOMEWORK_HORIZON_DAYS", "14"))
+HOMEWORK_SCHEDULER_INTERVAL = int(os.getenv("HOMEWORK_SCHEDULER_INTERVAL", "3600"))
+HOMEWORK_SCHEDULER_BATCH_SIZE = int(os.getenv("HOMEWORK_SCHEDULER_BATCH_SIZE", "500"))
+HOMEWORK_RETENTION_DAYS = int(os.getenv("HOMEWORK_RETENTION_DAYS", "30"))
+
+Assignment = models.HomeworkAssignment
+Daily = models.DailyHomework
+
+
+def horizon(today: date = None, days: int = HOMEWORK_HORIZON_DAYS) -> tuple:
+    today = today or date.today()
+    return today, today + timedelta(days=days - 1)
+
+
+def _active_in(start: date, end: date):
+    return (
+        Assignment.active.is_(True),
+        Assignment.start_date <= end,
+        or_(Assignment.end_date.is_(None), Assignment.end_date >= start),
+    )
+
+
+# Rewrite the daily rows for these users between start and end; runs inside the caller's transaction
+async def materialise_users(db: AsyncSession, user_ids: list, start: date, end: date) -> int:
+    await db.execute(delete(Daily).where(
+        Daily.user_id.in_(user_ids), Daily.homework_date >= start, Daily.homework_date <= end
+    ))
+    rows = (await db.execute(
+        select(Assignment, models.HomeworkRoutine)
+        .join(models.HomeworkRoutine, models.HomeworkRoutine.routine_id == Assignment.routine_id)
+        .where(Assignment.user_id.in_(user_ids), *_active_in(start, end))
+        .order_by(Assignment.assignment_id)
+    )).all()
+
+    days = {}
+    for assignment, routine in rows:
+        entry = {
+            "assignment_id": assignment.assignment_id,
+            "routine_id": routine.routine_id,
+            "trainer_id": assignment.trainer_id,
+            "name": routine.name,
+            "items": routine.items,
+        }
+        day = max(start, assignment.start_date)
+        last = min(end, assignment.end_date or end)
+        while day <= last:
+            if assignment.days_of_week >> day.weekday() & 1:
+                days.setdefault((assignment.user_id, day), []).append(entry)
+            day += timedelta(days=1)
+
+    if days:
+        await db.execute(insert(Daily), [
+            {"user_id": user_id, "homework_date": day, "routines": routines}
+            for (user_id, day), routines in days.items()
+        ])
+    return len(days)
+
+
+class HomeworkScheduler:
+    def __init__(self, session_factory, horizon_days: int = HOMEWORK_HORIZON_DAYS,
+                 batch_size: int = HOMEWORK_SCHEDULER_BATCH_SIZE, interval: int = HOMEWORK_SCHEDULER_INTERVAL):
+        self.session_factory = session_factory
+        self.horizon_days = horizon_days
+        self.batch_size = batch_size
+        self.interval = interval
+        self.runs = 0
+        self.last_run = None
+
+    async def run_once(self, today: date = None) -> dict:
+        began = time.perf_counter()
+        start, end = horizon(today, self.horizon_days)
+        users = rows = 0
+        last_user_id = None
+        async with self.session_factory() as db:
+            while True:
+                query = (select(Assignment.user_id).distinct().where(*_active_in(start, end))
+                         .order_by(Assignment.user_id).limit(self.batch_size))
+                if last_user_id is not None:
+                    query = query.where(Assignment.user_id > last_user_id)
+                user_ids = (await db.execute(query)).scalars().all()
+                if not user_ids:
+                    break
+                rows += await materialise_users(db, user_ids, start, end)
+                await db.commit()
+                users += len(user_ids)
+                last_user_id = user_ids[-1]
+
+            # Users whose last assignment ended or was cancelled, and rows past retention
+            await db.execute(delete(Daily).where(
+                Daily.homework_date >= start,
+                Daily.user_id.not_in(select(Assignment.user_id).where(*_active_in(start, end))),
+            ))
+            await db.execute(delete(Daily).where(
+                Daily.homework_date < start - timedelta(days=HOMEWORK_RETENTION_DAYS)
+            ))
+            await db.commit()
+
+        self.runs += 1
+        self.last_run = {"date": start.isoformat(), "users": users, "rows": rows,
+                         "seconds": round(time.perf_counter() - began, 3)}
+        logger.info("Homework materialised for %d users (%d daily rows) in %.3fs",
+                    users, rows, self.last_run["seconds"])
+        return self.last_run
+
+    async def run_forever(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error("Homework scheduler run failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {"runs": self.runs, "last_run": self.last_run,
+                "horizon_days": self.horizon_days, "interval": self.interval}
@@ -0,0 +1,43 @@
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import date
+from typing import List, Optional
+
+class RoutineItem(BaseModel):
+    workout_key: int
+    sets: int = Field(ge=1)
+    reps: Optional[int] = Field(default=None, ge=1)
+
+class RoutineCreate(BaseModel):
+    name: str
+    items: List[RoutineItem] = Field(min_length=1)
+
+class Routine(RoutineCreate):
+    routine_id: int
+    trainer_id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+class BulkAssign(BaseModel):
+    routine_id: int
+    user_ids: List[int] = Field(min_length=1, max_length=1000)
+    start_date: date
+    end_date: Optional[date] = None
+    days_of_week: int = Field(default=0b1111111, ge=1, le=0b1111111, description="Bitmask, bit 0 is Monday")
+
+class BulkAssignResponse(BaseModel):
+    routine_id: int
+    assigned: int
+    assignment_ids: List[int]
+    daily_rows: int
+
+class HomeworkRoutine(BaseModel):
+    assignment_id: int
+    routine_id: int
+    trainer_id: int
+    name: str
+    items: List[RoutineItem]
+
+class DailyHomework(BaseModel):
+    user_id: int
+    homework_date: date
+    routines: List[HomeworkRoutine]
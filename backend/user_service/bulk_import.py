@@ -0,0 +1,350 @@
+"""Bulk member import for onboarding a whole gym at once.
+
+Rows come from CSV (with a header line) or NDJSON and are processed in chunks:
+one set-based query checks every email in the chunk against both member
+tables, passwords are hashed in parallel on a process pool, and users,
+trainers and trainer-user mappings go in as multi-row INSERTs, committed once
+per chunk. Bad rows are reported by line number and skipped; the rest of the
+chunk still imports.
+
+Columns: email, password, first_name, last_name, and optionally account_type
+(user | trainer, default user), trainer_email (maps the user to that trainer,
+who may appear earlier in the same file) and mapping_status (pending |
+accepted, default accepted).
+
+CLI:
+    python -m backend.user_service.bulk_import members.csv [--format csv|ndjson] [--chunk-size 500]
+"""
+import argparse
+import asyncio
+import codecs
+import collections
+import csv
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+
+from fastapi import HTTPException
+from sqlalchemy import insert, select, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import hashing, models, utils
+
+logger = logging.getLogger(__name__)
+
+BULK_IMPORT_CHUNK_SIZE = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "500"))
+BULK_IMPORT_HASH_WORKERS = int(os.getenv("BULK_IMPORT_HASH_WORKERS", str(os.cpu_count() or 1)))
+BULK_IMPORT_MAX_ERRORS = int(os.getenv("BULK_IMPORT_MAX_ERRORS", "1000"))
+
+ACCOUNT_TYPES = ("user", "trainer")
+MAPPING_STATUSES = {status.value: status for status in models.MappingStatus}
+
+_import_hasher = None
+# One import at a time per process: imports share the hash pool and its pending limit
+_import_lock = asyncio.Lock()
+
+
+def get_import_hasher() -> hashing.PasswordHasher:
+    # Separate from the request-path hasher so an import can't starve logins; created on first import
+    global _import_hasher
+    if _import_hasher is None:
+        _import_hasher = hashing.PasswordHasher(
+            workers=BULK_IMPORT_HASH_WORKERS, max_pending=BULK_IMPORT_CHUNK_SIZE, kind="process"
+        )
+    return _import_hasher
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    users_created: int = 0
+    trainers_created: int = 0
+    mappings_created: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+
+    def fail(self, line: int, email, error: str):
+        self.failed += 1
+        if len(self.errors) < BULK_IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line, "email": email, "error": error})
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "users_created": self.users_created,
+            "trainers_created": self.trainers_created,
+            "mappings_created": self.mappings_created,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+async def iter_lines(chunks):
+    # Split a byte stream into text lines without buffering the whole body. The incremental
+    # decoder holds back a multi-byte character split across two reads
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer.strip():
+        yield buffer.rstrip("\r")
+
+
+class _LineFeed:
+    # csv.reader pulls lines synchronously; parse_rows pushes them in from the async stream
+    def __init__(self):
+        self.lines = collections.deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+async def parse_rows(lines, fmt: str):
+    """Yield (line number, record or error message) pairs."""
+    header = None
+    line_no = 0
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    # A quoted CSV field may span lines; buffer them until the quotes balance, then read one record
+    record_line = None
+    open_quotes = False
+    async for line in lines:
+        line_no += 1
+        if fmt == "ndjson":
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_no, f"Invalid JSON: {e.msg}"
+                continue
+            yield line_no, record if isinstance(record, dict) else "Expected a JSON object"
+            continue
+        if not open_quotes:
+            if not line.strip():
+                continue
+            record_line = line_no
+        feed.lines.append(line + "\n")
+        open_quotes ^= line.count('"') % 2 == 1
+        if open_quotes:
+            continue
+        try:
+            values = next(reader)
+        except csv.Error as e:
+            feed.lines.clear()
+            yield record_line, f"Invalid CSV: {e}"
+            continue
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            continue
+        if len(values) != len(header):
+            yield record_line, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield record_line, dict(zip(header, values))
+    if open_quotes:
+        yield record_line, "Unterminated quoted field"
+
+
+# Emails are kept as given, like create_user does, so uniqueness compares them the same way
+def _validate(record: dict) -> dict:
+    email = (record.get("email") or "").strip()
+    if not email or "@" not in email:
+        raise ValueError("A valid email is required")
+    # Required at sign-up too (UserCreate / TrainerCreate); the member schemas reject rows without them
+    first_name = (record.get("first_name") or "").strip()
+    last_name = (record.get("last_name") or "").strip()
+    if not first_name or not last_name:
+        raise ValueError("first_name and last_name are required")
+    password = record.get("password") or ""
+    try:
+        utils.validate_password(password)
+    except HTTPException as e:
+        raise ValueError(e.detail)
+    account_type = (record.get("account_type") or "user").strip().lower()
+    if account_type not in ACCOUNT_TYPES:
+        raise ValueError(f"account_type must be one of {ACCOUNT_TYPES}")
+    trainer_email = (record.get("trainer_email") or "").strip() or None
+    if trainer_email and account_type != "user":
+        raise ValueError("Only users can be mapped to a trainer")
+    mapping_status = (record.get("mapping_status") or "accepted").strip().lower()
+    if mapping_status not in MAPPING_STATUSES:
+        raise ValueError(f"mapping_status must be one of {sorted(MAPPING_STATUSES)}")
+    return {
+        "email": email,
+        "password": password,
+        "first_name": first_name,
+        "last_name": last_name,
+        "account_type": account_type,
+        "trainer_email": trainer_email,
+        "mapping_status": MAPPING_STATUSES[mapping_status],
+    }
+
+
+async def _registered_emails(db: AsyncSession, emails: list) -> set:
+    # Both member tables in one round trip
+    result = await db.execute(union_all(
+        select(models.User.email).where(models.User.email.in_(emails)),
+        select(models.Trainer.email).where(models.Trainer.email.in_(emails)),
+    ))
+    return set(result.scalars().all())
+
+
+async def _resolve_trainers(db: AsyncSession, emails: set, trainer_ids: dict):
+    missing = [email for email in emails if email not in trainer_ids]
+    if missing:
+        result = await db.execute(
+            select(models.Trainer.email, models.Trainer.trainer_id).where(models.Trainer.email.in_(missing))
+        )
+        trainer_ids.update(result.all())
+
+
+async def _insert_chunk(db: AsyncSession, rows: list, hashes: list, trainer_ids: dict, report: ImportReport):
+    trainers = [(row, hashed) for row, hashed in zip(rows, hashes) if row["account_type"] == "trainer"]
+    users = [(row, hashed) for row, hashed in zip(rows, hashes) if row["account_type"] == "user"]
+
+    created_trainers = {}
+    if trainers:
+        result = await db.execute(
+            insert(models.Trainer).returning(models.Trainer.email, models.Trainer.trainer_id),
+            [{"email": row["email"], "hashed_password": hashed, "first_name": row["first_name"],
+              "last_name": row["last_name"], "role": "trainer"} for row, hashed in trainers],
+        )
+        created_trainers = dict(result.all())
+
+    mapped = []
+    created_users = {}
+    if users:
+        wanted = {row["trainer_email"] for row, _ in users if row["trainer_email"]} - set(created_trainers)
+        await _resolve_trainers(db, wanted, trainer_ids)
+        lookup = {**trainer_ids, **created_trainers}
+        insertable = []
+        for row, hashed in users:
+            if row["trainer_email"] and row["trainer_email"] not in lookup:
+                report.fail(row["line"], row["email"], f"Unknown trainer {row['trainer_email']}")
+                continue
+            insertable.append((row, hashed))
+        if insertable:
+            result = await db.execute(
+                insert(models.User).returning(models.User.email, models.User.user_id),
+                [{"email": row["email"], "hashed_password": hashed, "first_name": row["first_name"],
+                  "last_name": row["last_name"], "role": models.UserRole.user.value} for row, hashed in insertable],
+            )
+            created_users = dict(result.all())
+        mapped = [{"trainer_id": lookup[row["trainer_email"]], "user_id": created_users[row["email"]],
+                   "status": row["mapping_status"], "requester_id": lookup[row["trainer_email"]]}
+                  for row, _ in insertable if row["trainer_email"]]
+        if mapped:
+            await db.execute(insert(models.TrainerUserMap), mapped)
+    identities = [{"email": email, "account_type": "trainer", "member_id": member_id}
+                  for email, member_id in created_trainers.items()]
+    identities += [{"email": email, "account_type": "user", "member_id": member_id}
+                   for email, member_id in created_users.items()]
+    if identities:
+        await db.execute(insert(models.MemberEmail), identities)
+    return created_trainers, created_users, len(mapped)
+
+
+async def _import_chunk(db: AsyncSession, chunk: list, hasher: hashing.PasswordHasher,
+                        seen: set, trainer_ids: dict, report: ImportReport):
+    rows = []
+    for line, record in chunk:
+        if isinstance(record, str):
+            report.fail(line, None, record)
+            continue
+        try:
+            row = _validate(record)
+        except ValueError as e:
+            report.fail(line, record.get("email"), str(e))
+            continue
+        if row["email"] in seen:
+            report.fail(line, row["email"], "Duplicate email in import")
+            continue
+        seen.add(row["email"])
+        rows.append({**row, "line": line})
+    if not rows:
+        return
+
+    registered = await _registered_emails(db, [row["email"] for row in rows])
+    for row in [row for row in rows if row["email"] in registered]:
+        report.fail(row["line"], row["email"], "Email already registered")
+    rows = [row for row in rows if row["email"] not in registered]
+    if not rows:
+        return
+
+    hashes = await asyncio.gather(*(hasher.hash(row["password"]) for row in rows))
+    try:
+        created_trainers, created_users, mappings = await _insert_chunk(db, rows, hashes, trainer_ids, report)
+        await db.commit()
+    except IntegrityError as e:
+        # Someone registered one of these emails after the uniqueness check; fail the chunk rather than guess
+        await db.rollback()
+        logger.warning("Bulk import chunk rolled back: %s", e.orig)
+        for row in rows:
+            report.fail(row["line"], row["email"], "Conflicting concurrent registration; retry this row")
+        return
+    trainer_ids.update(created_trainers)
+    report.trainers_created += len(created_trainers)
+    report.users_created += len(created_users)
+    report.mappings_created += mappings
+
+
+async def import_members(db: AsyncSession, lines, fmt: str = "csv", chunk_size: int = BULK_IMPORT_CHUNK_SIZE,
+                         hasher: hashing.PasswordHasher = None) -> ImportReport:
+    if fmt not in ("csv", "ndjson"):
+        raise ValueError(f"Unsupported import format: {fmt}")
+    hasher = hasher or get_import_hasher()
+    # A whole chunk is hashed at once, so it must fit under the pool's pending limit
+    chunk_size = max(1, min(chunk_size, hasher.max_pending))
+    report = ImportReport()
+    seen = set()
+    trainer_ids = {}
+    chunk = []
+    async with _import_lock:
+        async for line, record in parse_rows(lines, fmt):
+            report.rows += 1
+            chunk.append((line, record))
+            if len(chunk) >= chunk_size:
+                await _import_chunk(db, chunk, hasher, seen, trainer_ids, report)
+                chunk = []
+        if chunk:
+            await _import_chunk(db, chunk, hasher, seen, trainer_ids, report)
+    logger.info("Bulk import: %d rows, %d users, %d trainers, %d mappings, %d failed", report.rows,
+                report.users_created, report.trainers_created, report.mappings_created, report.failed)
+    return report
+
+
+async def _read_file(path: str, block_size: int = 1 << 16):
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            yield block
+
+
+async def _main(path: str, fmt: str, chunk_size: int):
+    from .database import AsyncSession as SessionFactory, engine
+    async with SessionFactory() as db:
+        report = await import_members(db, iter_lines(_read_file(path)), fmt, chunk_size)
+    get_import_hasher().shutdown()
+    await engine.dispose()
+    print(json.dumps(report.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import users, trainers and trainer-user mappings")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=BULK_IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    asyncio.run(_main(args.path, fmt, args.chunk_size))
@@ -0,0 +1,67 @@
+import os
+import logging
+from cachetools import TTLCache
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+
+
+class PrincipalCache:
+    """TTL+LRU cache of authenticated members keyed on (subject, type, iat).
+
+    Only column values are stored, never live ORM instances, so a cached
+    member can be re-attached to any request's session without sharing state.
+    """
+
+    def __init__(self, maxsize: int = PRINCIPAL_CACHE_SIZE, ttl: int = PRINCIPAL_CACHE_TTL):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        model, values = entry
+        member = model(**values)
+        make_transient_to_detached(member)
+        return member
+
+    def put(self, key: tuple, member):
+        mapper = inspect(member).mapper
+        values = {attr.key: getattr(member, attr.key) for attr in mapper.column_attrs}
+        self._entries[key] = (mapper.class_, values)
+
+    def invalidate(self, subject: str, member_type: str):
+        # Tokens issued at different times share a subject, so drop every entry for it
+        stale = [key for key in list(self._entries.keys()) if key[0] == subject and key[1] == member_type]
+        for key in stale:
+            self._entries.pop(key, None)
+        if stale:
+            self.invalidations += len(stale)
+            logger.debug("Invalidated %d cached principal(s) for %s", len(stale), subject)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self._entries.maxsize,
+            "ttl_seconds": self._entries.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+principal_cache = PrincipalCache()
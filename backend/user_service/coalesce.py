@@ -0,0 +1,63 @@
+import asyncio
+import logging
+
+from backend.common import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one.
+
+    The first caller for a key runs the load; callers arriving while it is in
+    flight wait for and share its result (or exception). Nothing is kept once
+    the load finishes, so this is coalescing, not caching. Shared results must
+    not be session-bound ORM instances; pass plain values.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight = {}
+        self.calls = 0
+        self.collapsed = 0
+
+    async def do(self, key, load):
+        while True:
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            self.collapsed += 1
+            metrics.SINGLE_FLIGHT_CALLS.inc((self.name, "collapsed"))
+            await asyncio.wait([future])
+            if not future.cancelled():
+                return future.result()
+            # The caller running the load was cancelled; the next waiter takes over
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark the exception retrieved when nobody else was waiting for it
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        self.calls += 1
+        metrics.SINGLE_FLIGHT_CALLS.inc((self.name, "executed"))
+        try:
+            result = await load()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    def stats(self) -> dict:
+        total = self.calls + self.collapsed
+        return {
+            "in_flight": len(self._inflight),
+            "calls": self.calls,
+            "collapsed": self.collapsed,
+            "collapse_ratio": round(self.collapsed / total, 4) if total else 0.0,
+        }
@@ -1,52 +1,56 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, or_, and_
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import select, delete, insert, update, or_, and_, literal, union_all
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import make_transient_to_detached
 from fastapi import HTTPException
 from . import models, schemas
-import bcrypt
 import logging
-from . import utils
+import os
+from . import utils, hashing, cache, coalesce
+from backend.common import events
 
-async def is_email_unique(db: AsyncSession, email: str) -> bool:
-    # Check user table
-    user_result = await db.execute(select(models.User).filter(models.User.email == email))
-    user = user_result.scalar_one_or_none()
-    if user:
-        return False
+logger = logging.getLogger(__name__)
+
+MEMBER_DELETE_CHUNK_SIZE = int(os.getenv("MEMBER_DELETE_CHUNK_SIZE", "500"))
 
-    # Check trainer table
-    trainer_result = await db.execute(select(models.Trainer).filter(models.Trainer.email == email))
-    trainer = trainer_result.scalar_one_or_none()
-    if trainer:
-        return False
+# Fast pre-check before hashing; member_emails' primary key is what actually enforces uniqueness
+async def is_email_unique(db: AsyncSession, email: str) -> bool:
+    probe = union_all(
+        select(literal(1)).where(models.User.email == email),
+        select(literal(1)).where(models.Trainer.email == email),
+    )
+    result = await db.execute(select(probe.exists()))
+    return not result.scalar()
 
-    return True
+async def _add_member(db: AsyncSession, member, account_type: str):
+    db.add(member)
+    try:
+        await db.flush()
+        member_id = member.user_id if account_type == "user" else member.trainer_id
+        db.add(models.MemberEmail(email=member.email, account_type=account_type, member_id=member_id))
+        await db.commit()
+    except IntegrityError:
+        # Lost a race with a concurrent sign-up for the same email
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Email already registered")
+    await db.refresh(member)
+    return member
 
 # Creating user
 async def create_user(db: AsyncSession, user: schemas.UserCreate):
     if not await is_email_unique(db, user.email):
         raise HTTPException(status_code=400, detail="Email already registered")
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(user.password.encode('utf-8'), salt)
-    after_hashed_password = hashed_password.decode('utf-8')
+    after_hashed_password = await hashing.hash_password(user.password)
     db_user = models.User(email=user.email, hashed_password=after_hashed_password, first_name=user.first_name, last_name=user.last_name, role=models.UserRole.user.value)
-    db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
-    return db_user
+    return await _add_member(db, db_user, "user")
 
 # Creating trainer
 async def create_trainer(db: AsyncSession, trainer: schemas.TrainerCreate):
     if not await is_email_unique(db, trainer.email):
         raise HTTPException(status_code=400, detail="Email already registered")
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(trainer.password.encode('utf-8'), salt)
-    after_hashed_password = hashed_password.decode('utf-8')
+    after_hashed_password = await hashing.hash_password(trainer.password)
     db_user = models.Trainer(email=trainer.email, hashed_password=after_hashed_password, first_name=trainer.first_name, last_name=trainer.last_name)
-    db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
-    return db_user
+    return await _add_member(db, db_user, "trainer")
 
 # Call user with ID
 async def get_user_by_id(db: AsyncSession, user_id: int):
@@ -58,108 +62,165 @@ async def get_trainer_by_id(db: AsyncSession, trainer_id: int):
     result = await db.execute(select(models.Trainer).filter(models.Trainer.trainer_id == trainer_id))
     return result.scalar_one_or_none()
 
+# Concurrent lookups of the same email (every client of one trainer at class start) share one query
+user_email_flight = coalesce.SingleFlight("user_by_email")
+trainer_email_flight = coalesce.SingleFlight("trainer_by_email")
+
+async def _load_member_values(db: AsyncSession, model, email: str):
+    result = await db.execute(select(*model.__table__.columns).where(model.email == email))
+    row = result.mappings().first()
+    return dict(row) if row is not None else None
+
+async def _get_member_by_email(db: AsyncSession, flight: coalesce.SingleFlight, model, email: str):
+    # The shared result is column values; each caller gets its own instance in its own session
+    values = await flight.do(email, lambda: _load_member_values(db, model, email))
+    if values is None:
+        return None
+    member = model(**values)
+    make_transient_to_detached(member)
+    return await db.merge(member, load=False)
+
 # Call user with email
 async def get_user_by_email(db: AsyncSession, email: str):
-    result = await db.execute(select(models.User).filter(models.User.email == email))
-    return result.scalar_one_or_none()
+    return await _get_member_by_email(db, user_email_flight, models.User, email)
 
 # Call trainer with email
 async def get_trainer_by_email(db: AsyncSession, email: str):
-    result = await db.execute(select(models.Trainer).filter(models.Trainer.email == email))
-    return result.scalar_one_or_none()
+    return await _get_member_by_email(db, trainer_email_flight, models.Trainer, email)
+
+# Resolve an email to either account type with one UNION query over both email indexes
+async def get_identity_by_email(db: AsyncSession, email: str):
+    users = select(
+        literal("user").label("account_type"),
+        models.User.user_id.label("member_id"),
+        models.User.email,
+        models.User.hashed_password,
+        models.User.role,
+    ).where(models.User.email == email)
+    trainers = select(
+        literal("trainer").label("account_type"),
+        models.Trainer.trainer_id.label("member_id"),
+        models.Trainer.email,
+        models.Trainer.hashed_password,
+        models.Trainer.role,
+    ).where(models.Trainer.email == email)
+    result = await db.execute(union_all(users, trainers).limit(1))
+    return result.first()
+
+# Listing columns exclude hashed_password; pages are keyed on the primary key instead of OFFSET
+USER_LIST_COLUMNS = (
+    models.User.user_id, models.User.email, models.User.first_name, models.User.last_name,
+    models.User.age, models.User.height, models.User.weight, models.User.workout_duration,
+    models.User.workout_frequency, models.User.workout_goal, models.User.role,
+)
+TRAINER_LIST_COLUMNS = (
+    models.Trainer.trainer_id, models.Trainer.email, models.Trainer.first_name,
+    models.Trainer.last_name, models.Trainer.role,
+)
+
+def _listing_query(columns, id_column, after_id: int = None):
+    query = select(*columns).order_by(id_column)
+    if after_id is not None:
+        query = query.where(id_column > after_id)
+    return query
+
+async def _stream_listing(db: AsyncSession, query, batch_size: int):
+    result = await db.stream(query.execution_options(yield_per=batch_size))
+    async for row in result.mappings():
+        yield dict(row)
 
 # Call multiple users
-async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100):
-    result = await db.execute(select(models.User).offset(skip).limit(limit))
-    return result.scalars().all()
+async def get_users(db: AsyncSession, after_id: int = None, limit: int = 100):
+    result = await db.execute(_listing_query(USER_LIST_COLUMNS, models.User.user_id, after_id).limit(limit))
+    return result.mappings().all()
+
+# Stream every user after the cursor without materialising the whole table
+def stream_users(db: AsyncSession, after_id: int = None, batch_size: int = 1000):
+    return _stream_listing(db, _listing_query(USER_LIST_COLUMNS, models.User.user_id, after_id), batch_size)
 
 # Call multiple trainers
-async def get_trainers(db: AsyncSession, skip: int = 0, limit: int = 100):
-    result = await db.execute(select(models.Trainer).offset(skip).limit(limit))
-    return result.scalars().all()
+async def get_trainers(db: AsyncSession, after_id: int = None, limit: int = 100):
+    result = await db.execute(_listing_query(TRAINER_LIST_COLUMNS, models.Trainer.trainer_id, after_id).limit(limit))
+    return result.mappings().all()
+
+# Stream every trainer after the cursor without materialising the whole table
+def stream_trainers(db: AsyncSession, after_id: int = None, batch_size: int = 1000):
+    return _stream_listing(db, _listing_query(TRAINER_LIST_COLUMNS, models.Trainer.trainer_id, after_id), batch_size)
+
+# Identical batch lookups that arrive while one is running share its query
+user_batch_flight = coalesce.SingleFlight("users_batch")
+trainer_batch_flight = coalesce.SingleFlight("trainers_batch")
+
+async def _get_batch(db: AsyncSession, columns, id_column, email_column, ids: tuple, emails: tuple):
+    conditions = []
+    if ids:
+        conditions.append(id_column.in_(ids))
+    if emails:
+        conditions.append(email_column.in_(emails))
+    if not conditions:
+        return []
+    result = await db.execute(select(*columns).where(or_(*conditions)).order_by(id_column))
+    return [dict(row) for row in result.mappings()]
+
+# Resolve many users by id and/or email with one IN query
+async def get_users_batch(db: AsyncSession, ids: list, emails: list):
+    key = (tuple(sorted(set(ids))), tuple(sorted(set(emails))))
+    return await user_batch_flight.do(
+        key, lambda: _get_batch(db, USER_LIST_COLUMNS, models.User.user_id, models.User.email, *key)
+    )
+
+# Resolve many trainers by id and/or email with one IN query
+async def get_trainers_batch(db: AsyncSession, ids: list, emails: list):
+    key = (tuple(sorted(set(ids))), tuple(sorted(set(emails))))
+    return await trainer_batch_flight.do(
+        key, lambda: _get_batch(db, TRAINER_LIST_COLUMNS, models.Trainer.trainer_id, models.Trainer.email, *key)
+    )
+
+# Profile columns a member may change through PATCH /users/me
+USER_PROFILE_FIELDS = ("age", "height", "weight", "workout_duration", "workout_frequency", "workout_goal")
+
+# Password changes: verify the current password, validate and hash the new one
+async def _new_password_hash(current_member, update_data: dict) -> str:
+    if 'current_password' not in update_data:
+        raise ValueError("Current password is required to change password")
+    if not await hashing.verify_password(update_data['current_password'], current_member.hashed_password):
+        raise ValueError("Incorrect current password")
+    utils.validate_password(update_data['new_password'])
+    return await hashing.hash_password(update_data['new_password'])
+
+# One UPDATE ... RETURNING against the row the caller already holds; no re-SELECT or refresh
+async def _update_member(db: AsyncSession, model, id_column, member_id: int, values: dict):
+    stmt = (
+        update(model).where(id_column == member_id).values(**values).returning(model)
+        .execution_options(populate_existing=True)
+    )
+    result = await db.execute(stmt)
+    member = result.scalar_one_or_none()
+    await db.commit()
+    return member
 
 # Updating user info
 async def update_user(db: AsyncSession, current_user: models.User, user_update: dict):
-    # Prepare update data
     update_data = {k: v for k, v in user_update.items() if v is not None}
-
-    # Handle password change if requested
+    values = {k: update_data[k] for k in USER_PROFILE_FIELDS if k in update_data}
     if 'new_password' in update_data:
-        if 'current_password' not in update_data:
-            raise ValueError("Current password is required to change password")
-        
-        # Verify current password
-        if not bcrypt.checkpw(update_data['current_password'].encode('utf-8'), current_user.hashed_password.encode('utf-8')):
-            raise ValueError("Incorrect current password")
-
-        # Validate new password
-        utils.validate_password(update_data['new_password'])
-
-        # Hash the new password
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(update_data['new_password'].encode('utf-8'), salt)
-        update_data['hashed_password'] = hashed_password.decode('utf-8')
-
-        # Remove password fields from update_data
-        del update_data['new_password']
-        del update_data['current_password']
-
-    # Update the user in the database
-    stmt = select(models.User).where(models.User.user_id == current_user.user_id)
-    result = await db.execute(stmt)
-    db_user = result.scalar_one_or_none()
-
-    if db_user is None:
-        return None
-
-    for key, value in update_data.items():
-        setattr(db_user, key, value)
-
-    await db.commit()
-    await db.refresh(db_user)
+        values['hashed_password'] = await _new_password_hash(current_user, update_data)
+    if not values:
+        return current_user
 
+    db_user = await _update_member(db, models.User, models.User.user_id, current_user.user_id, values)
+    cache.principal_cache.invalidate(current_user.email, "user")
     return db_user
 
 # Updating trainer info
 async def update_trainer(db: AsyncSession, current_trainer: models.Trainer, trainer_update: dict):
-    # Prepare update data
     update_data = {k: v for k, v in trainer_update.items() if v is not None}
+    if 'new_password' not in update_data:
+        return current_trainer
 
-    # Handle password change if reqFuuested
-    if 'new_password' in update_data:
-        if 'current_password' not in update_data:
-            raise ValueError("Current password is required to change password")
-        
-        # Verify current password
-        if not bcrypt.checkpw(update_data['current_password'].encode('utf-8'), current_trainer.hashed_password.encode('utf-8')):
-            raise ValueError("Incorrect current password")
-
-        # Validate new password
-        utils.validate_password(update_data['new_password'])
-
-        # Hash the new password
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(update_data['new_password'].encode('utf-8'), salt)
-        update_data['hashed_password'] = hashed_password.decode('utf-8')
-
-        # Remove password fields from update_data
-        del update_data['new_password']
-        del update_data['current_password']
-
-    # Update the trainer in the database
-    stmt = select(models.Trainer).where(models.Trainer.trainer_id == current_trainer.trainer_id)
-    result = await db.execute(stmt)
-    db_trainer = result.scalar_one_or_none()
-
-    if db_trainer is None:
-        return None
-
-    for key, value in update_data.items():
-        setattr(db_trainer, key, value)
-
-    await db.commit()
-    await db.refresh(db_trainer)
-
+    values = {'hashed_password': await _new_password_hash(current_trainer, update_data)}
+    db_trainer = await _update_member(db, models.Trainer, models.Trainer.trainer_id, current_trainer.trainer_id, values)
+    cache.principal_cache.invalidate(current_trainer.email, "trainer")
     return db_trainer
 
 
@@ -170,7 +231,7 @@ async def create_trainer_user_mapping_request(db: AsyncSession, current_user_id:
         else:
             trainer_id, user_id = other_id, current_user_id
 
-        logging.debug(f"Attempting to create mapping: trainer_id={trainer_id}, user_id={user_id}")
+        logger.debug("Creating mapping: trainer_id=%s, user_id=%s", trainer_id, user_id)
 
         # Check if mapping already exists
         existing_mapping = await db.execute(
@@ -183,7 +244,6 @@ async def create_trainer_user_mapping_request(db: AsyncSession, current_user_id:
             raise ValueError("This mapping already exists")
 
         new_status = models.MappingStatus.pending
-        logging.debug(f"Creating new mapping with status: {new_status.value}")
         
         db_mapping = models.TrainerUserMap(
             trainer_id=trainer_id, 
@@ -192,92 +252,98 @@ async def create_trainer_user_mapping_request(db: AsyncSession, current_user_id:
             requester_id=current_user_id  # Add the requester_id
         )
         
-        logging.debug(f"New mapping object created: {db_mapping.__dict__}")
         db.add(db_mapping)
-        logging.debug("Added mapping to session")
         await db.commit()
-        logging.debug("Committed session")
         await db.refresh(db_mapping)
-        logging.debug(f"Refreshed mapping object: {db_mapping.__dict__}")
+        logger.debug("Created mapping %s with status %s", db_mapping.id, new_status.value)
         return db_mapping
     except SQLAlchemyError as e:
         await db.rollback()
-        logging.error(f"Database error occurred: {str(e)}")
+        logger.error("Database error occurred: %s", e)
         raise
     except ValueError as e:
-        logging.warning(str(e))
+        logger.warning("%s", e)
         raise
     except Exception as e:
         await db.rollback()
-        logging.error(f"Unexpected error occurred: {str(e)}")
+        logger.error("Unexpected error occurred: %s", e)
         raise
 
 async def update_trainer_user_mapping_status(db: AsyncSession, mapping_id: int, current_user_id: int, new_status: models.MappingStatus):
+    mapping = models.TrainerUserMap
     try:
-        # Fetch the mapping
-        mapping = await db.execute(select(models.TrainerUserMap).where(models.TrainerUserMap.id == mapping_id))
-        mapping = mapping.scalar_one_or_none()
-
-        if not mapping:
-            raise ValueError("Mapping not found")
-
-        # Check if the current user is the one who didn't request the mapping
-        if mapping.requester_id == current_user_id:
-            raise ValueError("You cannot update the status of a mapping you requested")
-
-        # Check if the current user is either the trainer or the user in the mapping
-        if current_user_id not in (mapping.trainer_id, mapping.user_id):
+        # Authorization lives in the WHERE clause, so the check and the write are one atomic statement:
+        # only a participant who did not send the request may change its status
+        result = await db.execute(
+            update(mapping)
+            .where(
+                mapping.id == mapping_id,
+                mapping.requester_id.is_distinct_from(current_user_id),
+                or_(mapping.trainer_id == current_user_id, mapping.user_id == current_user_id),
+            )
+            .values(status=new_status)
+            .returning(mapping.id, mapping.trainer_id, mapping.user_id, mapping.status)
+        )
+        updated = result.first()
+        if updated is None:
+            await db.rollback()
+            # Only a refused update pays for a second query, to say why
+            existing = await db.execute(
+                select(mapping.requester_id, mapping.trainer_id, mapping.user_id).where(mapping.id == mapping_id)
+            )
+            existing = existing.first()
+            if existing is None:
+                raise ValueError("Mapping not found")
+            if existing.requester_id == current_user_id:
+                raise ValueError("You cannot update the status of a mapping you requested")
             raise ValueError("You are not authorized to update this mapping")
 
-        # Update the status
-        mapping.status = new_status
         await db.commit()
-        await db.refresh(mapping)
-        return mapping
+        await events.publish(events.TRAINER_USER_MAPPING_CHANNEL, {"trainer_id": updated.trainer_id, "user_id": updated.user_id})
+        return updated
     except SQLAlchemyError as e:
         await db.rollback()
-        logging.error(f"Database error occurred: {str(e)}")
+        logger.error("Database error occurred: %s", e)
         raise
     except ValueError as e:
-        logging.warning(str(e))
+        logger.warning("%s", e)
         raise
     except Exception as e:
         await db.rollback()
-        logging.error(f"Unexpected error occurred: {str(e)}")
+        logger.error("Unexpected error occurred: %s", e)
         raise
 
-async def get_user_mappings(db: AsyncSession, user_id: int, is_trainer: bool):
+# Mappings joined with the counterpart's profile in one query, paged by mapping id
+async def get_user_mappings(db: AsyncSession, user_id: int, is_trainer: bool,
+                            status: models.MappingStatus = None, after_id: int = None, limit: int = 100):
+    mapping = models.TrainerUserMap
     if is_trainer:
-        query = select(models.TrainerUserMap).where(models.TrainerUserMap.trainer_id == user_id)
+        query = select(
+            mapping.id.label("mapping_id"),
+            models.User.user_id,
+            models.User.email.label("user_email"),
+            models.User.first_name.label("user_first_name"),
+            models.User.last_name.label("user_last_name"),
+            models.User.workout_frequency,
+            mapping.status,
+        ).join(models.User, models.User.user_id == mapping.user_id).where(mapping.trainer_id == user_id)
     else:
-        query = select(models.TrainerUserMap).where(models.TrainerUserMap.user_id == user_id)
-    
-    result = await db.execute(query)
-    mappings = result.scalars().all()
-    
-    mapping_data = []
-    for mapping in mappings:
-        if is_trainer:
-            user = await get_user_by_id(db, mapping.user_id)
-            mapping_info = {
-                "user_id": user.user_id,
-                "user_email": user.email,
-                "user_first_name": user.first_name,
-                "user_last_name": user.last_name,
-                "status": mapping.status
-            }
-        else:
-            trainer = await get_trainer_by_id(db, mapping.trainer_id)
-            mapping_info = {
-                "trainer_id": trainer.trainer_id,
-                "trainer_email": trainer.email,
-                "trainer_first_name": trainer.first_name,
-                "trainer_last_name": trainer.last_name,
-                "status": mapping.status
-            }
-        mapping_data.append(mapping_info)
-    
-    return mapping_data
+        query = select(
+            mapping.id.label("mapping_id"),
+            models.Trainer.trainer_id,
+            models.Trainer.email.label("trainer_email"),
+            models.Trainer.first_name.label("trainer_first_name"),
+            models.Trainer.last_name.label("trainer_last_name"),
+            mapping.status,
+        ).join(models.Trainer, models.Trainer.trainer_id == mapping.trainer_id).where(mapping.user_id == user_id)
+
+    if status is not None:
+        query = query.where(mapping.status == status)
+    if after_id is not None:
+        query = query.where(mapping.id > after_id)
+
+    result = await db.execute(query.order_by(mapping.id).limit(limit))
+    return [dict(row) for row in result.mappings()]
 
 async def remove_specific_mapping(db: AsyncSession, current_user_id: int, other_id: int, is_trainer: bool) -> bool:
     try:
@@ -298,27 +364,72 @@ async def remove_specific_mapping(db: AsyncSession, current_user_id: int, other_
         if mapping_to_remove is None:
             return False
 
+        trainer_id, user_id = mapping_to_remove.trainer_id, mapping_to_remove.user_id
         await db.delete(mapping_to_remove)
         await db.commit()
+        await events.publish(events.TRAINER_USER_MAPPING_CHANNEL, {"trainer_id": trainer_id, "user_id": user_id})
         return True
     except SQLAlchemyError as e:
         await db.rollback()
-        logging.error(f"Database error occurred: {str(e)}")
+        logger.error("Database error occurred: %s", e)
         raise
     except Exception as e:
         await db.rollback()
-        logging.error(f"Unexpected error occurred: {str(e)}")
+        logger.error("Unexpected error occurred: %s", e)
         raise
 
 async def delete_user(db: AsyncSession, user: models.User):
     await db.execute(delete(models.TrainerUserMap).where(models.TrainerUserMap.user_id == user.user_id))
+    await db.execute(delete(models.MemberEmail).where(models.MemberEmail.email == user.email))
     await db.delete(user)
+    db.add(models.MemberPurge(account_type="user", member_id=user.user_id))
     await db.commit()
+    cache.principal_cache.invalidate(user.email, "user")
+    await events.publish(events.TRAINER_USER_MAPPING_CHANNEL, {"user_id": user.user_id})
+    await events.publish(events.MEMBER_DELETED_CHANNEL, {"user_ids": [user.user_id]})
     
 async def delete_trainer(db: AsyncSession, trainer: models.Trainer):
     await db.execute(delete(models.TrainerUserMap).where(models.TrainerUserMap.trainer_id == trainer.trainer_id))
+    await db.execute(delete(models.MemberEmail).where(models.MemberEmail.email == trainer.email))
     await db.delete(trainer)
+    db.add(models.MemberPurge(account_type="trainer", member_id=trainer.trainer_id))
     await db.commit()
+    cache.principal_cache.invalidate(trainer.email, "trainer")
+    await events.publish(events.TRAINER_USER_MAPPING_CHANNEL, {"trainer_id": trainer.trainer_id})
+    await events.publish(events.MEMBER_DELETED_CHANNEL, {"trainer_ids": [trainer.trainer_id]})
+
+# Set-based deletion of many accounts, e.g. when a gym closes. Each chunk is its own transaction,
+# queues its members in member_purges for purge_outbox and is announced on the member-deleted channel.
+# Yields a progress dict after every chunk.
+async def delete_members(db: AsyncSession, user_ids: list = (), trainer_ids: list = (),
+                         chunk_size: int = MEMBER_DELETE_CHUNK_SIZE):
+    mapping = models.TrainerUserMap
+    targets = (
+        ("user", models.User, models.User.user_id, mapping.user_id, list(dict.fromkeys(user_ids))),
+        ("trainer", models.Trainer, models.Trainer.trainer_id, mapping.trainer_id, list(dict.fromkeys(trainer_ids))),
+    )
+    progress = {"total": sum(len(ids) for *_, ids in targets), "processed": 0, "deleted": 0, "not_found": 0}
+    for account_type, model, id_column, mapping_column, ids in targets:
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            await db.execute(delete(mapping).where(mapping_column.in_(chunk)))
+            result = await db.execute(delete(model).where(id_column.in_(chunk)).returning(id_column, model.email))
+            removed = result.all()
+            if removed:
+                await db.execute(delete(models.MemberEmail).where(models.MemberEmail.email.in_([row[1] for row in removed])))
+                await db.execute(insert(models.MemberPurge),
+                                 [{"account_type": account_type, "member_id": row[0]} for row in removed])
+            await db.commit()
+
+            for _, email in removed:
+                cache.principal_cache.invalidate(email, account_type)
+            if removed:
+                await events.publish(events.MEMBER_DELETED_CHANNEL, {f"{account_type}_ids": [row[0] for row in removed]})
+            progress["processed"] += len(chunk)
+            progress["deleted"] += len(removed)
+            progress["not_found"] += len(chunk) - len(removed)
+            yield {"account_type": account_type, **progress}
+    logger.info("Bulk member deletion: %d of %d accounts deleted", progress["deleted"], progress["total"])
 
 async def get_specific_connected_user_info(db: AsyncSession, trainer_id: int, user_id: int):
     query = select(models.User).join(
@@ -358,5 +469,5 @@ async def get_trainer_user_mapping(db: AsyncSession, trainer_id: int, user_id: i
         )
         return result.scalar_one_or_none()
     except Exception as e:
-        logging.error(f"Error in get_trainer_user_mapping: {str(e)}")
+        logger.error("Error in get_trainer_user_mapping: %s", e)
         raise
\ No newline at end of file
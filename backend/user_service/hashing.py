@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from backend.common import metrics
+
+logger = logging.getLogger(__name__)
+
+# bcrypt releases the GIL, so a thread pool is enough for request handling.
+# "process" is available for CPU-heavy batch jobs that hash thousands of passwords.
+HASH_POOL_KIND = os.getenv("HASH_POOL_KIND", "thread")
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_POOL_MAX_PENDING = int(os.getenv("HASH_POOL_MAX_PENDING", "64"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+
+# Worker functions live at module level so they can be pickled for a process pool
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+def _check(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+def _timed(fn, enqueued_at: float, *args):
+    started_at = time.perf_counter()
+    result = fn(*args)
+    return result, started_at - enqueued_at, time.perf_counter() - started_at
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop on a bounded pool.
+
+    At most ``max_pending`` operations may be queued or running at once; beyond
+    that callers get a 429 instead of piling up behind the pool.
+    """
+
+    def __init__(self, workers: int = HASH_POOL_WORKERS, max_pending: int = HASH_POOL_MAX_PENDING,
+                 kind: str = HASH_POOL_KIND, rounds: int = BCRYPT_ROUNDS):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown hash pool kind: {kind}")
+        self.workers = workers
+        self.max_pending = max_pending
+        self.kind = kind
+        self.rounds = rounds
+        self._executor: Executor | None = None
+        self.pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.failed = 0
+        self.queue_wait_seconds = 0.0
+        self.busy_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            logger.warning("Password hashing pool saturated (%d pending)", self.pending)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        self.submitted += 1
+        submitted_at = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, waited, busy = await loop.run_in_executor(
+                self._get_executor(), _timed, fn, submitted_at, *args
+            )
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+            metrics.add_bcrypt_time(time.perf_counter() - submitted_at)
+        self.completed += 1
+        self.queue_wait_seconds += waited
+        self.busy_seconds += busy
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password, self.rounds)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(_check, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        done = self.completed or 1
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "avg_queue_wait_ms": round(self.queue_wait_seconds / done * 1000, 3),
+            "avg_hash_ms": round(self.busy_seconds / done * 1000, 3),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
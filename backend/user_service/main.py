@@ -1,21 +1,39 @@
-import bcrypt
+import json
 import logging
-from fastapi import FastAPI, APIRouter, Depends, HTTPException, status
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Annotated, Union, Optional
-from . import crud, models, schemas, utils
-from .database import get_db
+from . import bulk_import, crud, member_deletion, models, purge_outbox, schemas, utils, hashing, cache
+from backend.common import events
+from backend.common.engine import check_health, pool_stats
+from backend.common.logs import RequestIdMiddleware, setup_logging
+from backend.common.metrics import MetricsMiddleware, metrics_response
+from .database import get_db, engine
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from datetime import timedelta
+from contextlib import asynccontextmanager
 
-app = FastAPI()  # Create the main FastAPI application
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    purge_outbox.purge_outbox.start()
+    yield
+    await member_deletion.deletion_jobs.shutdown()
+    await purge_outbox.purge_outbox.stop()
+    # Let in-flight bcrypt work finish before the worker exits
+    hashing.password_hasher.shutdown()
+    bulk_import.get_import_hasher().shutdown()
+    await events.get_event_bus().close()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO,
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                    datefmt='%Y-%m-%d %H:%M:%S')
+# JSON logs written off the event loop; levels from LOG_LEVEL / LOG_LEVELS
+setup_logging("user_service")
+logger = logging.getLogger(__name__)
+
+app = FastAPI(lifespan=lifespan)  # Create the main FastAPI application
+app.add_middleware(RequestIdMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 router = APIRouter()  # Create an APIRouter
 
@@ -24,16 +42,22 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 # Login for both trainer + member
 @router.post("/login")
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
-    user = await utils.authenticate_member(db, form_data.username, form_data.password)
-    if not user:
+    member = await utils.authenticate_member(db, form_data.username, form_data.password)
+    if not member:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    # Embed the account id and role so other services can authorise from the token alone
     access_token = utils.create_access_token(
-        data={"sub": user.email, "role": user.role},  # Include user's role instead of user_type
+        data={
+            "sub": member.email,
+            "type": member.account_type,
+            "role": member.role,
+            f"{member.account_type}_id": member.member_id,
+        },
         expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
@@ -80,26 +104,68 @@ async def update_trainer(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+async def ndjson_lines(rows):
+    async for row in rows:
+        yield json.dumps(row) + "\n"
+
 # Only Admin can use. Get all users
+# Page with after_id=<last user_id>; format=ndjson streams every user after the cursor
 @router.get("/users/", response_model=List[schemas.User])
 async def read_users(
-    skip: int = 0,
-    limit: int = 100,
+    after_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
     db: AsyncSession = Depends(utils.get_db),
     current_user: schemas.User = Depends(utils.admin_required)
 ):
-    users = await crud.get_users(db, skip=skip, limit=limit)
+    if format == "ndjson":
+        return StreamingResponse(ndjson_lines(crud.stream_users(db, after_id=after_id)), media_type="application/x-ndjson")
+    users = await crud.get_users(db, after_id=after_id, limit=limit)
     return users
 
+# Only Admin can use. Bulk-create users, trainers and mappings from a streamed CSV or NDJSON body;
+# bad rows are skipped and reported by line number
+@router.post("/import/members", response_model=schemas.MemberImportReport)
+async def import_members(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    chunk_size: int = Query(bulk_import.BULK_IMPORT_CHUNK_SIZE, ge=1, le=5000),
+    db: AsyncSession = Depends(utils.get_db),
+    current_user: schemas.User = Depends(utils.admin_required)
+):
+    report = await bulk_import.import_members(db, bulk_import.iter_lines(request.stream()), format, chunk_size)
+    return report.as_dict()
+
+# Only Admin can use. Delete many accounts at once in a background job; poll the returned job_id
+# for progress. workout_service purges the members' sessions as each chunk is announced
+@router.post("/admin/members/delete", response_model=schemas.MemberDeletionJob, status_code=status.HTTP_202_ACCEPTED)
+async def delete_members(
+    request: schemas.MemberBulkDelete,
+    current_user: schemas.User = Depends(utils.admin_required)
+):
+    job = member_deletion.deletion_jobs.start(request.user_ids, request.trainer_ids)
+    return job.as_dict()
+
+# Only Admin can use. Progress of a bulk deletion job
+@router.get("/admin/members/delete/{job_id}", response_model=schemas.MemberDeletionJob)
+async def read_member_deletion_job(job_id: str, current_user: schemas.User = Depends(utils.admin_required)):
+    job = member_deletion.deletion_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Deletion job not found")
+    return job.as_dict()
+
 # Only Admin can use. Get all trainers
-@router.get("/trainers/", response_model=List[schemas.Trainer])
+@router.get("/trainers/", response_model=List[schemas.TrainerSummary])
 async def read_trainers(
-    skip: int = 0, 
-    limit: int = 100, 
+    after_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
     db: AsyncSession = Depends(utils.get_db),
     current_user: schemas.User = Depends(utils.admin_required)
 ):
-    trainers = await crud.get_trainers(db, skip=skip, limit=limit)
+    if format == "ndjson":
+        return StreamingResponse(ndjson_lines(crud.stream_trainers(db, after_id=after_id)), media_type="application/x-ndjson")
+    trainers = await crud.get_trainers(db, after_id=after_id, limit=limit)
     return trainers
 
 # Getting a user with id
@@ -135,6 +201,34 @@ async def read_trainer_email(email: str, db: AsyncSession = Depends(get_db)):
     return db_trainer
 
 
+def _missing(lookup: schemas.MemberBatchLookup, found: list, id_key: str) -> dict:
+    ids = {row[id_key] for row in found}
+    emails = {row["email"] for row in found}
+    return {
+        "missing_ids": [i for i in dict.fromkeys(lookup.ids) if i not in ids],
+        "missing_emails": [e for e in dict.fromkeys(lookup.emails) if e not in emails],
+    }
+
+# Getting many users by id and/or email in one query, instead of one request per person
+@router.post("/users/batch", response_model=schemas.UserBatch)
+async def read_users_batch(
+    lookup: schemas.MemberBatchLookup,
+    current_user: Union[models.User, models.Trainer] = Depends(utils.get_current_member),
+    db: AsyncSession = Depends(get_db)
+):
+    users = await crud.get_users_batch(db, lookup.ids, lookup.emails)
+    return {"users": users, **_missing(lookup, users, "user_id")}
+
+# Getting many trainers by id and/or email in one query
+@router.post("/trainers/batch", response_model=schemas.TrainerBatch)
+async def read_trainers_batch(
+    lookup: schemas.MemberBatchLookup,
+    current_user: Union[models.User, models.Trainer] = Depends(utils.get_current_member),
+    db: AsyncSession = Depends(get_db)
+):
+    trainers = await crud.get_trainers_batch(db, lookup.ids, lookup.emails)
+    return {"trainers": trainers, **_missing(lookup, trainers, "trainer_id")}
+
 @router.post("/trainer-user-mapping/request", response_model=schemas.TrainerUserMappingResponse)
 async def request_trainer_user_mapping(
     mapping: schemas.CreateTrainerUserMapping,
@@ -186,13 +280,23 @@ async def update_trainer_user_mapping_status(
 
 @router.get("/my-mappings/", response_model=List[Union[schemas.UserMappingInfo, schemas.TrainerMappingInfo]])
 async def read_my_mappings(
+    request: Request,
+    response: Response,
+    status_filter: Optional[schemas.MappingStatus] = Query(None, alias="status"),
+    after_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=500),
     current_user: Union[models.User, models.Trainer] = Depends(utils.get_current_member),
     db: AsyncSession = Depends(utils.get_db)
 ):
+    # A full page carries a Link: <...after_id=<last mapping_id>>; rel="next" header; no header means the last page
     is_trainer = isinstance(current_user, models.Trainer)
     user_id = current_user.trainer_id if is_trainer else current_user.user_id
+    mapping_status = models.MappingStatus(status_filter.value) if status_filter else None
     
-    mappings = await crud.get_user_mappings(db, user_id, is_trainer)
+    mappings = await crud.get_user_mappings(db, user_id, is_trainer, status=mapping_status, after_id=after_id, limit=limit)
+    if len(mappings) == limit:
+        next_url = request.url.include_query_params(after_id=mappings[-1]["mapping_id"], limit=limit)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
     return mappings
 
 @router.delete("/trainer-user-mapping/{other_id}", response_model=schemas.Message)
@@ -254,7 +358,7 @@ async def delete_users_me(
         return current_user
     except Exception as e:
         await db.rollback()
-        logging.error(f"Error deleting user: {str(e)}")
+        logger.error("Error deleting user: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to delete user: {str(e)}")
     
 @router.delete("/trainers/me/", response_model=schemas.Trainer)
@@ -269,7 +373,7 @@ async def delete_trainers_me(
         return current_trainer
     except Exception as e:
         await db.rollback()
-        logging.error(f"Error deleting user: {str(e)}")
+        logger.error("Error deleting trainer: %s", e)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to delete trainer: {str(e)}")
     
 @router.get("/check-trainer-user-mapping/{trainer_id}/{user_id}")
@@ -288,17 +392,50 @@ async def check_trainer_user_mapping(
         mapping = await crud.get_trainer_user_mapping(db, trainer_id, user_id)
         
         if mapping:
-            logging.info(f"Mapping found: {mapping}")
-            logging.info(f"Mapping status: {mapping.status}")
-            logging.info(f"Mappingstatus: {schemas.MappingStatus.accepted}")
             exists = (str(mapping.status) == str(schemas.MappingStatus.accepted))
-            logging.info(f"Returning exists: {exists}")
+            logger.debug("Mapping %s status %s", mapping.id, mapping.status)
             return {"exists": exists}
         else:
-            logging.info("No mapping found")
+            logger.debug("No mapping for trainer %s and user %s", trainer_id, user_id)
             return {"exists": False}
     except Exception as e:
-        logging.error(f"Error in check_trainer_user_mapping: {str(e)}")
+        logger.error("Error in check_trainer_user_mapping: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
-    
+
+# Liveness plus a SELECT 1 against the user database
+@router.get("/health")
+async def health():
+    return await check_health(engine)
+
+# Connection pool usage, for sizing against the Postgres connection budget
+@router.get("/stats/db-pool")
+async def read_db_pool_stats():
+    return pool_stats(engine)
+
+# Password hashing pool metrics
+@router.get("/stats/password-hashing")
+async def read_password_hashing_stats():
+    return hashing.password_hasher.stats()
+
+# Principal cache hit/miss counters
+@router.get("/stats/principal-cache")
+async def read_principal_cache_stats():
+    return cache.principal_cache.stats()
+
+# Single-flight counters: how many identity and batch lookups were collapsed into another call's query
+@router.get("/stats/single-flight")
+async def read_single_flight_stats():
+    flights = (crud.user_email_flight, crud.trainer_email_flight, crud.user_batch_flight, crud.trainer_batch_flight)
+    return {flight.name: flight.stats() for flight in flights}
+
+# Deleted members handed to workout_service for purging, and delivery rounds that failed and will be retried
+@router.get("/stats/member-purges")
+async def read_member_purge_stats():
+    return purge_outbox.purge_outbox.stats()
+
+# Prometheus scrape target; 404 when METRICS_ENABLED=false
+@router.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    return metrics_response()
+
 app.include_router(router)
\ No newline at end of file
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import os
+import uuid
+
+from cachetools import TTLCache
+
+from . import crud
+from .database import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+DELETION_JOB_TTL = int(os.getenv("DELETION_JOB_TTL", "86400"))
+DELETION_JOB_HISTORY = int(os.getenv("DELETION_JOB_HISTORY", "100"))
+
+
+class DeletionJob:
+    def __init__(self, job_id: str, total: int):
+        self.job_id = job_id
+        self.status = "running"
+        self.progress = {"total": total, "processed": 0, "deleted": 0, "not_found": 0}
+        self.error = None
+        self.task = None
+
+    def as_dict(self) -> dict:
+        return {"job_id": self.job_id, "status": self.status, **self.progress, "error": self.error}
+
+
+class DeletionJobs:
+    """Bulk account deletions running as background tasks, independent of the request that started them.
+
+    Each job works through crud.delete_members on its own session, so a client that disconnects
+    or stops polling doesn't stop the deletion. Finished jobs stay visible for DELETION_JOB_TTL
+    seconds; the task reference is held here so it can't be garbage-collected mid-run.
+    """
+
+    def __init__(self, session_factory=AsyncSession, history: int = DELETION_JOB_HISTORY, ttl: int = DELETION_JOB_TTL):
+        self.session_factory = session_factory
+        self._finished = TTLCache(maxsize=history, ttl=ttl)
+        self._running = {}
+
+    def start(self, user_ids: list, trainer_ids: list) -> DeletionJob:
+        job = DeletionJob(uuid.uuid4().hex, len(set(user_ids)) + len(set(trainer_ids)))
+        self._running[job.job_id] = job
+        job.task = asyncio.create_task(self._run(job, user_ids, trainer_ids))
+        return job
+
+    async def _run(self, job: DeletionJob, user_ids: list, trainer_ids: list):
+        try:
+            async with self.session_factory() as db:
+                async for progress in crud.delete_members(db, user_ids=user_ids, trainer_ids=trainer_ids):
+                    job.progress = {key: progress[key] for key in job.progress}
+            job.status = "done"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            # Chunks committed so far stay deleted; re-running the job with the same ids finishes it
+            job.status = "failed"
+            job.error = str(e)
+            logger.exception("Bulk member deletion %s failed", job.job_id)
+        finally:
+            self._running.pop(job.job_id, None)
+            job.task = None
+            self._finished[job.job_id] = job
+
+    def get(self, job_id: str) -> DeletionJob | None:
+        return self._running.get(job_id) or self._finished.get(job_id)
+
+    async def shutdown(self):
+        tasks = [job.task for job in self._running.values() if job.task is not None]
+        for job in self._running.values():
+            logger.warning("Cancelling bulk member deletion %s at %s", job.job_id, job.progress)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+deletion_jobs = DeletionJobs()
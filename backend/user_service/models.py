@@ -41,6 +41,24 @@ class Trainer(Base, AsyncAttrs):
     # Relationship with TrainerUserMap
     user_mappings = relationship("TrainerUserMap", back_populates="trainer")
 
+# One row per registered email across users and trainers. The primary key is the
+# cross-table uniqueness guarantee; crud keeps it in step with both tables
+class MemberEmail(Base):
+    __tablename__ = "member_emails"
+
+    email = Column(String, primary_key=True)
+    account_type = Column(String, nullable=False)
+    member_id = Column(Integer, nullable=False)
+
+# Deleted members whose workout data workout_service has not yet confirmed purging. Written in
+# the deleting transaction and removed by purge_outbox once the purge call succeeds
+class MemberPurge(Base):
+    __tablename__ = "member_purges"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    account_type = Column(String, nullable=False)
+    member_id = Column(Integer, nullable=False)
+
 class MappingStatus(PyEnum):
     pending = "pending"
     accepted = "accepted"
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import os
+from datetime import timedelta
+
+import httpx
+from sqlalchemy import delete, select
+
+from . import models, utils
+from .database import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+WORKOUT_SERVICE_URL = os.getenv("WORKOUT_SERVICE_URL", "http://workout-service:8000")
+PURGE_OUTBOX_INTERVAL = float(os.getenv("PURGE_OUTBOX_INTERVAL", "10"))
+PURGE_OUTBOX_BATCH_SIZE = int(os.getenv("PURGE_OUTBOX_BATCH_SIZE", "100"))
+PURGE_OUTBOX_TIMEOUT = float(os.getenv("PURGE_OUTBOX_TIMEOUT", "60"))
+
+
+class PurgeOutbox:
+    """Delivers member deletions to workout_service until it confirms the purge.
+
+    Deleting an account writes a member_purges row in the same transaction, so
+    the purge survives a crash, a restart of either service or a lost event.
+    A background worker posts pending rows in batches to workout_service's
+    /internal/members/purge, which answers only once the data is gone, and
+    deletes them on success; on failure the rows stay and the next round
+    retries them. The member-deleted event stays the fast path; purging is
+    idempotent, so a member purged by both costs one empty pass.
+    """
+
+    def __init__(self, session_factory=AsyncSession, base_url: str = WORKOUT_SERVICE_URL,
+                 interval: float = PURGE_OUTBOX_INTERVAL, batch_size: int = PURGE_OUTBOX_BATCH_SIZE,
+                 timeout: float = PURGE_OUTBOX_TIMEOUT, transport: httpx.AsyncBaseTransport = None):
+        self.session_factory = session_factory
+        self.base_url = base_url
+        self.interval = interval
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._transport = transport
+        self._worker = None
+        self.delivered = 0
+        self.failed_rounds = 0
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.deliver()
+            except Exception:
+                # Undelivered rows stay queued for the next round
+                self.failed_rounds += 1
+                logger.exception("Member purge delivery to workout_service failed")
+            await asyncio.sleep(self.interval)
+
+    async def deliver(self) -> int:
+        delivered = 0
+        # Short-lived service credential; workout_service only accepts it on the internal routes
+        token = utils.create_access_token({"sub": "user_service", "type": "service"}, timedelta(minutes=5))
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, transport=self._transport) as client:
+            async with self.session_factory() as db:
+                while True:
+                    result = await db.execute(
+                        select(models.MemberPurge).order_by(models.MemberPurge.id).limit(self.batch_size)
+                    )
+                    rows = result.scalars().all()
+                    if not rows:
+                        break
+                    body = {
+                        "user_ids": [row.member_id for row in rows if row.account_type == "user"],
+                        "trainer_ids": [row.member_id for row in rows if row.account_type == "trainer"],
+                    }
+                    response = await client.post("/internal/members/purge", json=body,
+                                                 headers={"Authorization": f"Bearer {token}"})
+                    response.raise_for_status()
+                    await db.execute(delete(models.MemberPurge).where(models.MemberPurge.id.in_([row.id for row in rows])))
+                    await db.commit()
+                    delivered += len(rows)
+                    self.delivered += len(rows)
+                    if len(rows) < self.batch_size:
+                        break
+        if delivered:
+            logger.info("Workout data purged for %d deleted member(s)", delivered)
+        return delivered
+
+    def stats(self) -> dict:
+        return {"delivered": self.delivered, "failed_rounds": self.failed_rounds}
+
+
+purge_outbox = PurgeOutbox()
@@ -67,6 +67,10 @@ class Trainer(TrainerBase):
     hashed_password: str
     role: str
     
+class TrainerSummary(TrainerBase):
+    trainer_id: int
+    role: str
+
 class TrainerUpdate(BaseModel):
     current_password: Optional[str] = None
     new_password: Optional[str] = None
@@ -91,13 +95,16 @@ class MappingStatus(str, Enum):
     accepted = "accepted"
 
 class UserMappingInfo(BaseModel):
+    mapping_id: Optional[int] = None
     user_id: int
     user_email: str
     user_first_name: str
     user_last_name: str
+    workout_frequency: Optional[int] = None
     status: MappingStatus
 
 class TrainerMappingInfo(BaseModel):
+    mapping_id: Optional[int] = None
     trainer_id: int
     trainer_email: str
     trainer_first_name: str
@@ -116,9 +123,54 @@ class TrainerUserMappingResponse(BaseModel):
 class TrainerUserMappingUpdate(BaseModel):
     new_status: str
 
+MEMBER_BATCH_MAX = 500
+
+class MemberBatchLookup(BaseModel):
+    ids: List[int] = Field(default_factory=list, max_length=MEMBER_BATCH_MAX)
+    emails: List[str] = Field(default_factory=list, max_length=MEMBER_BATCH_MAX)
+
+class UserBatch(BaseModel):
+    users: List[User]
+    missing_ids: List[int]
+    missing_emails: List[str]
+
+class TrainerBatch(BaseModel):
+    trainers: List[TrainerSummary]
+    missing_ids: List[int]
+    missing_emails: List[str]
+
+MEMBER_DELETE_MAX = 10000
+
+class MemberBulkDelete(BaseModel):
+    user_ids: List[int] = Field(default_factory=list, max_length=MEMBER_DELETE_MAX)
+    trainer_ids: List[int] = Field(default_factory=list, max_length=MEMBER_DELETE_MAX)
+
+class MemberDeletionJob(BaseModel):
+    job_id: str
+    status: str
+    total: int
+    processed: int
+    deleted: int
+    not_found: int
+    error: Optional[str] = None
+
 class Message(BaseModel):
     message: str
 
+class MemberImportError(BaseModel):
+    line: int
+    email: Optional[str] = None
+    error: str
+
+class MemberImportReport(BaseModel):
+    rows: int
+    users_created: int
+    trainers_created: int
+    mappings_created: int
+    failed: int
+    errors: List[MemberImportError]
+    errors_truncated: bool
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -3,7 +3,6 @@ from typing import Optional, Annotated
 from sqlalchemy import select
 import jwt
 from jwt.exceptions import PyJWTError 
-import bcrypt
 from fastapi import Depends, HTTPException, status
 
 from fastapi.security import OAuth2PasswordBearer
@@ -11,12 +10,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 import pytz
 from . import schemas, models
 from .database import AsyncSession, get_db
-from . import crud  
+from . import crud, hashing, cache
 import os
 import logging
 import re
 import datetime
 
+logger = logging.getLogger(__name__)
+
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 20
@@ -24,11 +25,12 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
+    issued_at = datetime.datetime.now(datetime.timezone.utc)
     if expires_delta:
-        expire = datetime.datetime.now(datetime.timezone.utc) + expires_delta
+        expire = issued_at + expires_delta
     else:
-        expire = datetime.datetime.now(datetime.timezone.utc) + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+        expire = issued_at + timedelta(minutes=15)
+    to_encode.update({"exp": expire, "iat": issued_at})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -43,44 +45,44 @@ async def get_current_member(token: str = Depends(oauth2_scheme), db: AsyncSessi
         email: str = payload.get("sub")
         user_type: str = payload.get("type")
         if email is None or user_type is None:
-            logging.error("Email or user_type is None in the token payload")
+            logger.error("Email or user_type is None in the token payload")
             raise credentials_exception
     except PyJWTError as e:
-        logging.error(f"JWT decode error: {str(e)}")
+        logger.error("JWT decode error: %s", e)
         raise credentials_exception
 
-    logging.info(f"Token decoded successfully. Email: {email}, User Type: {user_type}")
+    # Serve repeat requests with the same token from the principal cache
+    cache_key = (email, user_type, payload.get("iat"))
+    cached_member = cache.principal_cache.get(cache_key)
+    if cached_member is not None:
+        return await db.merge(cached_member, load=False)
 
     if user_type == 'user':
         user = await crud.get_user_by_email(db, email)
     elif user_type == 'trainer':
         user = await crud.get_trainer_by_email(db, email)
     else:
-        logging.error(f"Invalid user_type: {user_type}")
+        logger.error("Invalid user_type: %s", user_type)
         raise credentials_exception
 
     if user is None:
-        logging.error(f"User not found for email: {email}")
+        logger.warning("Member not found for token subject")
         raise credentials_exception
 
-    logging.info(f"User authenticated successfully: {user}")
+    cache.principal_cache.put(cache_key, user)
     return user
 
-def verify_password(plain_password, hashed_password):
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+async def verify_password(plain_password, hashed_password):
+    return await hashing.verify_password(plain_password, hashed_password)
 
 async def authenticate_member(db: AsyncSession, email: str, password: str):
-    # Check user table
-    user_result = await db.execute(select(models.User).filter(models.User.email == email))
-    user = user_result.scalar_one_or_none()
-    if user and verify_password(password, user.hashed_password):
-        return user, 'user'
-    # Check trainer table
-    trainer_result = await db.execute(select(models.Trainer).filter(models.Trainer.email == email))
-    trainer = trainer_result.scalar_one_or_none()
-    if trainer and verify_password(password, trainer.hashed_password):
-        return trainer, 'trainer'
-    return None, None
+    # One lookup across users and trainers, then exactly one bcrypt check
+    member = await crud.get_identity_by_email(db, email)
+    if member is None or not member.hashed_password:
+        return None
+    if not await verify_password(password, member.hashed_password):
+        return None
+    return member
 
 async def admin_required(current_user: schemas.User = Depends(get_current_member)):
     if current_user.role != "admin":
@@ -0,0 +1,176 @@
+"""Vectorised trainer dashboard aggregates.
+
+Rows are pulled in bulk into flat NumPy columns and every grouped aggregate is
+a single ``np.bincount`` over a combined (client, bucket) index, so the cost is
+a few passes over the arrays regardless of how many clients a trainer has.
+"""
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.workout_service import models
+from backend.workout_service.catalogue import CatalogueIndex
+
+UNKNOWN_PART = "Unknown"
+
+
+@dataclass
+class SetFrame:
+    user_id: np.ndarray      # int64
+    day: np.ndarray          # int64 proleptic ordinal of workout_date
+    workout_key: np.ndarray  # int64
+    volume: np.ndarray       # float64, weight * reps (reps default 1)
+
+
+@dataclass
+class SessionFrame:
+    user_id: np.ndarray
+    day: np.ndarray
+
+
+@dataclass
+class PartLookup:
+    keys: np.ndarray   # sorted catalogue workout_keys
+    parts: np.ndarray  # index into names for each entry of keys
+    names: list
+
+    @classmethod
+    def from_catalogue(cls, index: CatalogueIndex):
+        names = sorted({e.workout_part for e in index.entries}) + [UNKNOWN_PART]
+        position = {name: i for i, name in enumerate(names)}
+        entries = sorted(index.entries, key=lambda e: e.workout_key)
+        keys = np.array([e.workout_key for e in entries], dtype=np.int64)
+        parts = np.array([position[e.workout_part] for e in entries], dtype=np.int64)
+        return cls(keys, parts, names)
+
+    def parts_for(self, workout_keys: np.ndarray) -> np.ndarray:
+        # Sized by the catalogue, not by its largest key; keys not in it map to UNKNOWN_PART
+        unknown = len(self.names) - 1
+        parts = np.full(len(workout_keys), unknown, dtype=np.int64)
+        if not len(self.keys):
+            return parts
+        pos = np.minimum(np.searchsorted(self.keys, workout_keys), len(self.keys) - 1)
+        found = self.keys[pos] == workout_keys
+        parts[found] = self.parts[pos[found]]
+        return parts
+
+
+def week_window(weeks: int, today: date = None) -> tuple:
+    # Calendar weeks starting Monday; the last one is the current, partial week
+    today = today or date.today()
+    start = today - timedelta(days=today.weekday()) - timedelta(weeks=weeks - 1)
+    return start, start + timedelta(weeks=weeks, days=-1)
+
+
+def _client_positions(sorted_ids: np.ndarray, order: np.ndarray, user_ids: np.ndarray):
+    pos = np.searchsorted(sorted_ids, user_ids)
+    pos = np.minimum(pos, len(sorted_ids) - 1)
+    valid = sorted_ids[pos] == user_ids
+    return order[pos], valid
+
+
+def compute_dashboard(sets: SetFrame, sessions: SessionFrame, client_ids: np.ndarray, targets: np.ndarray,
+                      start: date, weeks: int, parts: PartLookup, current_week_elapsed: float = 1.0) -> dict:
+    """Weekly volume, body-part volume and session adherence for every client at once.
+
+    ``targets`` holds each client's sessions-per-week goal (0 when unknown).
+    ``current_week_elapsed`` is the share of the last, current week that has
+    passed; adherence prorates that week's target by it, so it isn't understated
+    early in the week.
+    """
+    n_clients = len(client_ids)
+    n_parts = len(parts.names)
+    if n_clients == 0:
+        return {"weekly_volume": np.zeros((0, weeks)), "part_volume": np.zeros((0, n_parts)),
+                "sessions_per_week": np.zeros((0, weeks), dtype=np.int64), "adherence": np.zeros(0)}
+
+    order = np.argsort(client_ids, kind="stable")
+    sorted_ids = client_ids[order]
+    start_day = start.toordinal()
+
+    client, valid = _client_positions(sorted_ids, order, sets.user_id)
+    week = (sets.day - start_day) // 7
+    valid &= (week >= 0) & (week < weeks)
+    client, week = client[valid], week[valid]
+    volume = sets.volume[valid]
+    part = parts.parts_for(sets.workout_key[valid])
+
+    weekly_volume = np.bincount(client * weeks + week, weights=volume,
+                                minlength=n_clients * weeks).reshape(n_clients, weeks)
+    part_volume = np.bincount(client * n_parts + part, weights=volume,
+                              minlength=n_clients * n_parts).reshape(n_clients, n_parts)
+
+    s_client, s_valid = _client_positions(sorted_ids, order, sessions.user_id)
+    s_week = (sessions.day - start_day) // 7
+    s_valid &= (s_week >= 0) & (s_week < weeks)
+    sessions_per_week = np.bincount(s_client[s_valid] * weeks + s_week[s_valid],
+                                    minlength=n_clients * weeks).reshape(n_clients, weeks)
+
+    targets = targets.astype(np.float64)
+    adherence = np.full(n_clients, np.nan)
+    expected_weeks = weeks - 1 + current_week_elapsed
+    np.divide(sessions_per_week.sum(axis=1), targets * expected_weeks, out=adherence, where=targets > 0)
+    return {"weekly_volume": weekly_volume, "part_volume": part_volume,
+            "sessions_per_week": sessions_per_week, "adherence": adherence}
+
+
+async def load_frames(db: AsyncSession, client_ids: list, start: date, end: date) -> tuple:
+    window = (models.SessionIDMap.user_id.in_(client_ids),
+              models.SessionIDMap.workout_date >= start, models.SessionIDMap.workout_date <= end)
+
+    set_rows = (await db.execute(
+        select(models.SessionIDMap.user_id, models.SessionIDMap.workout_date, models.Session.workout_key,
+               models.Session.weight, models.Session.reps)
+        .join(models.Session, models.Session.session_id == models.SessionIDMap.session_id)
+        .where(*window)
+    )).all()
+    session_rows = (await db.execute(
+        select(models.SessionIDMap.user_id, models.SessionIDMap.workout_date).where(*window)
+    )).all()
+
+    n = len(set_rows)
+    sets = SetFrame(
+        user_id=np.fromiter((r[0] for r in set_rows), dtype=np.int64, count=n),
+        day=np.fromiter((r[1].toordinal() for r in set_rows), dtype=np.int64, count=n),
+        workout_key=np.fromiter((r[2] for r in set_rows), dtype=np.int64, count=n),
+        volume=np.fromiter((r[3] * (r[4] or 1) for r in set_rows), dtype=np.float64, count=n),
+    )
+    m = len(session_rows)
+    sessions = SessionFrame(
+        user_id=np.fromiter((r[0] for r in session_rows), dtype=np.int64, count=m),
+        day=np.fromiter((r[1].toordinal() for r in session_rows), dtype=np.int64, count=m),
+    )
+    return sets, sessions
+
+
+async def trainer_dashboard(db: AsyncSession, clients: list, catalogue: CatalogueIndex, weeks: int,
+                            today: date = None) -> dict:
+    """``clients`` is a list of {"user_id", "workout_frequency"} dicts for the trainer's accepted clients."""
+    start, end = week_window(weeks, today)
+    week_starts = [start + timedelta(weeks=w) for w in range(weeks)]
+    if not clients:
+        return {"week_starts": week_starts, "clients": []}
+
+    client_ids = np.array([c["user_id"] for c in clients], dtype=np.int64)
+    targets = np.array([c.get("workout_frequency") or 0 for c in clients], dtype=np.int64)
+    parts = PartLookup.from_catalogue(catalogue)
+    sets, sessions = await load_frames(db, client_ids.tolist(), start, end)
+    # Days of the current week so far, today included
+    elapsed = ((today or date.today()) - week_starts[-1]).days + 1
+    result = compute_dashboard(sets, sessions, client_ids, targets, start, weeks, parts, elapsed / 7)
+
+    rows = []
+    for i, client in enumerate(clients):
+        adherence = result["adherence"][i]
+        rows.append({
+            "user_id": client["user_id"],
+            "weekly_volume": result["weekly_volume"][i].round(2).tolist(),
+            "sessions_per_week": result["sessions_per_week"][i].tolist(),
+            "body_part_volume": {name: round(float(v), 2) for name, v in zip(parts.names, result["part_volume"][i]) if v},
+            "target_sessions_per_week": int(targets[i]) or None,
+            "adherence": None if np.isnan(adherence) else round(float(adherence), 3),
+        })
+    return {"week_starts": week_starts, "clients": rows}
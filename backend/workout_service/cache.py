@@ -0,0 +1,84 @@
+import os
+import logging
+from cachetools import TTLCache
+
+from backend.common import events
+
+logger = logging.getLogger(__name__)
+
+# Without a cross-process bus, invalidations from user_service never arrive and only the TTL bounds
+# staleness, so the default is much shorter. 0 disables the cache
+MAPPING_CACHE_TTL = int(os.getenv("MAPPING_CACHE_TTL", "30" if events.is_process_local() else "300"))
+MAPPING_CACHE_SIZE = int(os.getenv("MAPPING_CACHE_SIZE", "50000"))
+
+
+class MappingCache:
+    """Accepted (trainer_id, user_id) pairs confirmed by user_service.
+
+    Only positive answers are cached; user_service publishes an event whenever
+    a mapping changes or a member is deleted, and ``handle_event`` drops the
+    affected pairs.
+    """
+
+    def __init__(self, maxsize: int = MAPPING_CACHE_SIZE, ttl: int = MAPPING_CACHE_TTL):
+        self.ttl = ttl
+        self.enabled = ttl > 0
+        self._entries = TTLCache(maxsize=maxsize, ttl=max(ttl, 1))
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def is_accepted(self, trainer_id: int, user_id: int) -> bool:
+        if self.enabled and (trainer_id, user_id) in self._entries:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, trainer_id: int, user_id: int):
+        if self.enabled:
+            self._entries[(trainer_id, user_id)] = True
+
+    def invalidate(self, trainer_id: int = None, user_id: int = None):
+        stale = [
+            key for key in list(self._entries.keys())
+            if (trainer_id is None or key[0] == trainer_id) and (user_id is None or key[1] == user_id)
+        ]
+        for key in stale:
+            self._entries.pop(key, None)
+        self.invalidations += len(stale)
+
+    def invalidate_members(self, trainer_ids=(), user_ids=()):
+        # One pass over the cache for a whole batch of deleted accounts
+        trainer_ids, user_ids = set(trainer_ids), set(user_ids)
+        stale = [key for key in list(self._entries.keys()) if key[0] in trainer_ids or key[1] in user_ids]
+        for key in stale:
+            self._entries.pop(key, None)
+        self.invalidations += len(stale)
+
+    async def handle_event(self, message: dict):
+        trainer_id = message.get("trainer_id")
+        user_id = message.get("user_id")
+        if trainer_id is None and user_id is None:
+            logger.warning("Ignoring mapping event without ids: %s", message)
+            return
+        self.invalidate(trainer_id=trainer_id, user_id=user_id)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "maxsize": self._entries.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+mapping_cache = MappingCache()
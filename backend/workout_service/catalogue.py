@@ -0,0 +1,114 @@
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.workout_service import models
+
+logger = logging.getLogger(__name__)
+
+CATALOGUE_REFRESH_SECONDS = int(os.getenv("CATALOGUE_REFRESH_SECONDS", "300"))
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogueEntry:
+    workout_key: int
+    workout_name: str
+    workout_part: str
+
+
+class CatalogueIndex:
+    """Immutable snapshot of workout_key_name_mapping.
+
+    Lookups by key, by body part and by case-insensitive name prefix are all
+    served from memory. ``version`` is a content hash, so two snapshots of the
+    same rows share a version (and an ETag).
+    """
+
+    def __init__(self, entries):
+        entries = tuple(sorted(entries, key=lambda e: e.workout_key))
+        self.entries = entries
+        self.by_key = MappingProxyType({e.workout_key: e for e in entries})
+        by_part = {}
+        for e in entries:
+            by_part.setdefault(e.workout_part, []).append(e)
+        self.by_part = MappingProxyType({part: tuple(items) for part, items in by_part.items()})
+        self._names = tuple(sorted((e.workout_name.lower(), e.workout_key) for e in entries))
+
+        rows = [[e.workout_key, e.workout_name, e.workout_part] for e in entries]
+        self.version = hashlib.sha1(json.dumps(rows).encode("utf-8")).hexdigest()[:16]
+        self.etag = f'"{self.version}"'
+        # Serialised once per version; the endpoint returns these bytes as-is
+        self.body = json.dumps({"version": self.version, "workouts": [entry_dict(e) for e in entries]}).encode("utf-8")
+
+    def etag_for(self, part: str | None = None, prefix: str | None = None) -> str:
+        # Filtered bodies differ from the full one, so their validators must too
+        if part is None and prefix is None:
+            return self.etag
+        selector = hashlib.sha1(json.dumps([part, prefix]).encode("utf-8")).hexdigest()[:8]
+        return f'"{self.version}-{selector}"'
+
+    def __contains__(self, workout_key: int) -> bool:
+        return workout_key in self.by_key
+
+    def search_prefix(self, prefix: str) -> tuple:
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self._names, (prefix,))
+        matches = []
+        for name, workout_key in self._names[start:]:
+            if not name.startswith(prefix):
+                break
+            matches.append(self.by_key[workout_key])
+        return tuple(matches)
+
+
+def entry_dict(entry: CatalogueEntry) -> dict:
+    return {"workout_key": entry.workout_key, "workout_name": entry.workout_name, "workout_part": entry.workout_part}
+
+
+class WorkoutCatalogue:
+    def __init__(self):
+        self.index: CatalogueIndex | None = None
+        self.reloads = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self.index is not None
+
+    async def load(self, db: AsyncSession) -> CatalogueIndex:
+        result = await db.execute(select(
+            models.WorkoutKeyNameMap.workout_key,
+            models.WorkoutKeyNameMap.workout_name,
+            models.WorkoutKeyNameMap.workout_part,
+        ))
+        index = CatalogueIndex(CatalogueEntry(*row) for row in result.all())
+        # Swap the reference only when the content changed; readers never see a half-built index
+        if self.index is None or self.index.version != index.version:
+            logger.info("Workout catalogue loaded: version %s, %d workouts", index.version, len(index.entries))
+            self.index = index
+            self.reloads += 1
+        return self.index
+
+    async def get(self, db: AsyncSession) -> CatalogueIndex:
+        if self.index is None:
+            await self.load(db)
+        return self.index
+
+    async def refresh_periodically(self, session_factory, interval: int = CATALOGUE_REFRESH_SECONDS):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with session_factory() as db:
+                    await self.load(db)
+            except Exception as e:
+                logger.error("Workout catalogue refresh failed: %s", e)
+
+
+workout_catalogue = WorkoutCatalogue()
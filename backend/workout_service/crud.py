@@ -1,6 +1,8 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from backend.workout_service import models, schemas
+from sqlalchemy import insert, tuple_
+from sqlalchemy.exc import IntegrityError
+from backend.workout_service import models, schemas, progress
 import logging
 
 logger = logging.getLogger(__name__)
@@ -24,13 +26,98 @@ async def check_trainer_user_mapping(db: AsyncSession, trainer_id: int, user_id:
 
 async def create_session(db: AsyncSession, session_data: dict):
     try:
+        if not isinstance(session_data, dict):
+            session_data = session_data.model_dump()
         new_session = models.SessionIDMap(**session_data)
         db.add(new_session)
         await db.commit()
         await db.refresh(new_session)
-        logger.info(f"Session created: {new_session.session_id}")
+        logger.info("Session created: %s", new_session.session_id)
         return new_session
     except Exception as e:
-        logger.error(f"Error creating session: {str(e)}")
+        logger.error("Error creating session: %s", e)
         await db.rollback()
-        raise
\ No newline at end of file
+        raise
+
+async def get_session(db: AsyncSession, session_id: int):
+    result = await db.execute(select(models.SessionIDMap).filter(models.SessionIDMap.session_id == session_id))
+    return result.scalar_one_or_none()
+
+# One round-trip to learn which of the requested workout keys exist
+async def get_existing_workout_keys(db: AsyncSession, workout_keys) -> set:
+    result = await db.execute(
+        select(models.WorkoutKeyNameMap.workout_key).where(models.WorkoutKeyNameMap.workout_key.in_(set(workout_keys)))
+    )
+    return set(result.scalars().all())
+
+# Write every set of a session with a single multi-row INSERT and fold them into the
+# daily progress aggregates in the same transaction
+async def create_sets(db: AsyncSession, session: models.SessionIDMap, sets: list):
+    session_id = session.session_id
+    rows = [
+        {"session_id": session_id, "workout_key": s.workout_key, "set_num": s.set_num, "weight": s.weight, "reps": s.reps}
+        for s in sets
+    ]
+    try:
+        await db.execute(insert(models.Session).values(rows))
+        await progress.apply_sets(db, session, sets)
+        await db.commit()
+        logger.info("Created %d sets for session %s", len(rows), session_id)
+        return len(rows)
+    except IntegrityError:
+        await db.rollback()
+        raise
+    except Exception as e:
+        logger.error("Error creating sets: %s", e)
+        await db.rollback()
+        raise
+
+# One page of a user's sessions, newest first, joined with their sets in a single statement.
+# before is a (workout_date, session_id) keyset cursor from the previous page.
+async def get_user_session_history(db: AsyncSession, user_id: int, date_from=None, date_to=None,
+                                   before: tuple = None, limit: int = 20):
+    sessions = models.SessionIDMap
+    page = select(sessions.session_id, sessions.workout_date, sessions.trainer_id, sessions.is_pt).where(
+        sessions.user_id == user_id
+    )
+    if date_from is not None:
+        page = page.where(sessions.workout_date >= date_from)
+    if date_to is not None:
+        page = page.where(sessions.workout_date <= date_to)
+    if before is not None:
+        page = page.where(tuple_(sessions.workout_date, sessions.session_id) < tuple_(*before))
+    page = page.order_by(sessions.workout_date.desc(), sessions.session_id.desc()).limit(limit).subquery()
+
+    query = select(page, models.Session.workout_key, models.Session.set_num, models.Session.weight,
+                   models.Session.reps).outerjoin(
+        models.Session, models.Session.session_id == page.c.session_id
+    ).order_by(page.c.workout_date.desc(), page.c.session_id.desc(), models.Session.workout_key, models.Session.set_num)
+    result = await db.execute(query)
+
+    history = {}
+    for row in result:
+        item = history.get(row.session_id)
+        if item is None:
+            item = history[row.session_id] = {
+                "session_id": row.session_id,
+                "workout_date": row.workout_date,
+                "trainer_id": row.trainer_id,
+                "is_pt": row.is_pt,
+                "sets": [],
+            }
+        if row.workout_key is not None:
+            item["sets"].append({"workout_key": row.workout_key, "set_num": row.set_num, "weight": row.weight, "reps": row.reps})
+    return list(history.values())
+
+# Daily progress points for one exercise, read from the precomputed aggregate table
+async def get_exercise_progress(db: AsyncSession, user_id: int, workout_key: int, date_from=None, date_to=None):
+    query = select(models.ExerciseDailyProgress).where(
+        models.ExerciseDailyProgress.user_id == user_id,
+        models.ExerciseDailyProgress.workout_key == workout_key,
+    )
+    if date_from is not None:
+        query = query.where(models.ExerciseDailyProgress.workout_date >= date_from)
+    if date_to is not None:
+        query = query.where(models.ExerciseDailyProgress.workout_date <= date_to)
+    result = await db.execute(query.order_by(models.ExerciseDailyProgress.workout_date))
+    return result.scalars().all()
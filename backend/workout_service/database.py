@@ -1,7 +1,8 @@
 import os
 from dotenv import load_dotenv
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from backend.common.engine import create_engine
 
 load_dotenv(override=True)
 SQLALCHEMY_DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_WORKOUT_URL")
@@ -9,10 +10,8 @@ SQLALCHEMY_DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_WORKOUT_URL")
 if not SQLALCHEMY_DATABASE_URL:
     raise ValueError("SQLALCHEMY_DATABASE_URL is not set in the environment or .env file")
 
-engine = create_async_engine(
-    SQLALCHEMY_DATABASE_URL,
-    echo=True,
-)
+# Pool sizing and echo come from DB_* / WORKOUT_DB_* environment variables
+engine = create_engine(SQLALCHEMY_DATABASE_URL, "WORKOUT")
 
 AsyncSession = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
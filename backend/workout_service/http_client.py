@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import os
+import random
+import time
+
+import httpx
+from fastapi import HTTPException
+
+from backend.common import metrics
+
+logger = logging.getLogger(__name__)
+
+USER_SERVICE_URL = os.getenv("USER_SERVICE_URL", "http://127.0.0.1:8000")
+USER_SERVICE_TIMEOUT = float(os.getenv("USER_SERVICE_TIMEOUT", "5.0"))
+USER_SERVICE_CONNECT_TIMEOUT = float(os.getenv("USER_SERVICE_CONNECT_TIMEOUT", "2.0"))
+USER_SERVICE_MAX_CONNECTIONS = int(os.getenv("USER_SERVICE_MAX_CONNECTIONS", "100"))
+USER_SERVICE_MAX_KEEPALIVE = int(os.getenv("USER_SERVICE_MAX_KEEPALIVE", "20"))
+USER_SERVICE_HTTP2 = os.getenv("USER_SERVICE_HTTP2", "false").lower() == "true"
+USER_SERVICE_RETRIES = int(os.getenv("USER_SERVICE_RETRIES", "2"))
+USER_SERVICE_BACKOFF = float(os.getenv("USER_SERVICE_BACKOFF", "0.1"))
+USER_SERVICE_BREAKER_THRESHOLD = int(os.getenv("USER_SERVICE_BREAKER_THRESHOLD", "5"))
+USER_SERVICE_BREAKER_RESET = float(os.getenv("USER_SERVICE_BREAKER_RESET", "30"))
+
+
+class CircuitBreaker:
+    """Stops calling a failing upstream for ``reset_timeout`` seconds after
+    ``failure_threshold`` consecutive failures, then lets one probe through.
+
+    While the probe is in flight every other call is rejected as if the circuit
+    were still open; the probe's outcome closes or re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+    def allow(self) -> bool:
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self.probing:
+                return False
+            self.probing = True
+        return True
+
+    def release_probe(self):
+        # The probe ended without an outcome (e.g. it was cancelled); let the next call probe instead
+        self.probing = False
+
+    def record_success(self):
+        self.failures = 0
+        self.state = "closed"
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning("Circuit to user service opened after %d failures", self.failures)
+            self.state = "open"
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+
+class UserServiceClient:
+    """One keep-alive connection pool shared by every call to user_service."""
+
+    def __init__(self, base_url: str = USER_SERVICE_URL, timeout: float = USER_SERVICE_TIMEOUT,
+                 connect_timeout: float = USER_SERVICE_CONNECT_TIMEOUT,
+                 max_connections: int = USER_SERVICE_MAX_CONNECTIONS,
+                 max_keepalive: int = USER_SERVICE_MAX_KEEPALIVE, http2: bool = USER_SERVICE_HTTP2,
+                 retries: int = USER_SERVICE_RETRIES, backoff: float = USER_SERVICE_BACKOFF,
+                 breaker_threshold: int = USER_SERVICE_BREAKER_THRESHOLD,
+                 breaker_reset: float = USER_SERVICE_BREAKER_RESET, transport: httpx.AsyncBaseTransport = None):
+        self.base_url = base_url
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        self.http2 = http2
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_reset)
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self.requests = 0
+        self.retried = 0
+        self.failed = 0
+        self.short_circuited = 0
+
+    async def start(self):
+        if self._client is not None:
+            return
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("USER_SERVICE_HTTP2 is set but the h2 package is not installed; using HTTP/1.1")
+                http2 = False
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            limits=self.limits,
+            http2=http2,
+            transport=self._transport,
+        )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get(self, path: str, headers: dict = None) -> httpx.Response:
+        if not self.breaker.allow():
+            self.short_circuited += 1
+            raise HTTPException(status_code=503, detail="User service is temporarily unavailable")
+        probe = self.breaker.state == "half_open"
+        try:
+            return await self._get(path, headers)
+        finally:
+            if probe:
+                self.breaker.release_probe()
+
+    async def _get(self, path: str, headers: dict = None) -> httpx.Response:
+        # Retries only cover transport errors and 5xx; 4xx responses are returned to the caller
+        await self.start()
+        response = None
+        error = None
+        for attempt in range(self.retries + 1):
+            self.requests += 1
+            started = time.perf_counter()
+            try:
+                response = await self._client.get(path, headers=headers)
+            except httpx.TransportError as e:
+                response, error = None, e
+            finally:
+                metrics.add_http_time(time.perf_counter() - started)
+            if response is not None and response.status_code < 500:
+                self.breaker.record_success()
+                return response
+            if attempt < self.retries:
+                self.retried += 1
+                # Full jitter keeps synchronized retries from hammering a recovering upstream
+                await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+        self.failed += 1
+        self.breaker.record_failure()
+        if response is not None:
+            return response
+        raise error
+
+    def pool_stats(self) -> dict:
+        # httpx has no public pool API; read httpcore's pool defensively
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []))
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {
+            "open_connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+        }
+
+    def stats(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "http2": self.http2,
+            "requests": self.requests,
+            "retried": self.retried,
+            "failed": self.failed,
+            "short_circuited": self.short_circuited,
+            "circuit_state": self.breaker.state,
+            "pool": self.pool_stats(),
+        }
+
+
+user_service_client = UserServiceClient()
@@ -1,24 +1,60 @@
-from fastapi import FastAPI, Depends, HTTPException, Request, Header
+from fastapi import FastAPI, Depends, HTTPException, Request, Header, Response, Query
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 from sqlalchemy.ext.asyncio import AsyncSession
-from backend.workout_service.database import get_db
-from backend.workout_service import crud, schemas, utils
-from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from backend.workout_service.database import get_db, engine
+from backend.workout_service import analytics, crud, database, schemas, utils, http_client, cache, purge
+from backend.workout_service.catalogue import workout_catalogue, entry_dict, CATALOGUE_REFRESH_SECONDS
+from backend.common import events
+from backend.common.engine import check_health, pool_stats
+from backend.common.logs import RequestIdMiddleware, setup_logging
+from backend.common.metrics import MetricsMiddleware, metrics_response
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import Optional
+import asyncio
+import json
 import logging
 import httpx
 import os
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler()]
-)
+# JSON logs written off the event loop; levels from LOG_LEVEL / LOG_LEVELS
+setup_logging("workout_service")
 logger = logging.getLogger(__name__)
 
-app = FastAPI(docs_url=None, redoc_url=None, openapi_url=None)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await http_client.user_service_client.start()
+    event_bus = events.get_event_bus()
+    await event_bus.subscribe(events.TRAINER_USER_MAPPING_CHANNEL, cache.mapping_cache.handle_event)
+    await event_bus.subscribe(events.MEMBER_DELETED_CHANNEL, purge.member_purger.handle_event)
+    purge.member_purger.start()
+    if cache.mapping_cache.enabled:
+        events.warn_if_process_local(
+            f"mapping changes from user_service are not received; removed or rejected mappings stay cached "
+            f"as accepted for up to {cache.mapping_cache.ttl}s (MAPPING_CACHE_TTL=0 disables the cache)"
+        )
+    try:
+        async with database.AsyncSession() as db:
+            await workout_catalogue.load(db)
+    except Exception as e:
+        # The catalogue loads lazily on first use if the database isn't reachable yet
+        logger.error("Could not load workout catalogue at startup: %s", e)
+    refresh_task = None
+    if CATALOGUE_REFRESH_SECONDS > 0:
+        refresh_task = asyncio.create_task(workout_catalogue.refresh_periodically(database.AsyncSession))
+    yield
+    if refresh_task:
+        refresh_task.cancel()
+    await event_bus.unsubscribe(events.TRAINER_USER_MAPPING_CHANNEL, cache.mapping_cache.handle_event)
+    await event_bus.unsubscribe(events.MEMBER_DELETED_CHANNEL, purge.member_purger.handle_event)
+    await purge.member_purger.stop()
+    await http_client.user_service_client.close()
 
-USER_SERVICE_URL = "http://127.0.0.1:8000"
+app = FastAPI(docs_url=None, redoc_url=None, openapi_url=None, lifespan=lifespan)
+app.add_middleware(RequestIdMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 def custom_openapi():
     if app.openapi_schema:
@@ -52,40 +88,41 @@ async def get_openapi_json():
     return app.openapi()
 
 async def check_trainer_user_mapping(trainer_id: int, user_id: int, token: str):
-    async with httpx.AsyncClient() as client:
-        headers = {"Authorization": token}
-        try:
-            response = await client.get(f"{USER_SERVICE_URL}/check-trainer-user-mapping/{trainer_id}/{user_id}", headers=headers)
-            response.raise_for_status()
-            result = await response.json()
-            logger.debug(f"Trainer-user mapping check result: {result}")
-            return result.get("exists", False)
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error occurred while checking trainer-user mapping: {e.response.status_code} - {e.response.text}")
-            raise HTTPException(status_code=e.response.status_code, detail=f"Error checking trainer-user mapping: {e.response.text}")
-        except Exception as e:
-            logger.error(f"Unexpected error occurred while checking trainer-user mapping: {str(e)}")
-            raise HTTPException(status_code=500, detail="Unexpected error occurred")
+    # Accepted mappings rarely change; user_service events evict them when they do
+    if cache.mapping_cache.is_accepted(trainer_id, user_id):
+        return True
+
+    headers = {"Authorization": token}
+    try:
+        response = await http_client.user_service_client.get(f"/check-trainer-user-mapping/{trainer_id}/{user_id}", headers=headers)
+        response.raise_for_status()
+        result = response.json()
+        exists = result.get("exists", False)
+        if exists:
+            cache.mapping_cache.add(trainer_id, user_id)
+        return exists
+    except httpx.HTTPStatusError as e:
+        logger.error("HTTP error while checking trainer-user mapping: %s", e.response.status_code)
+        raise HTTPException(status_code=e.response.status_code, detail=f"Error checking trainer-user mapping: {e.response.text}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Unexpected error while checking trainer-user mapping: %s", e)
+        raise HTTPException(status_code=500, detail="Unexpected error occurred")
 
 @app.post("/create_session", response_model=schemas.SessionIDMap)
 async def create_session(
-    request: Request,
     user_id: int = None,
     db: AsyncSession = Depends(get_db),
     authorization: str = Header(None)
 ):
-    logger.debug(f"Received request headers for create_session: {request.headers}")
-    
     if not authorization:
         raise HTTPException(status_code=401, detail="Authorization header is missing")
-    
-    logger.debug(f"Attempting to authenticate with token: {authorization}")
-    
+
     try:
         current_user = await utils.get_current_member(authorization)
-        logger.debug(f"Authentication successful. Current user: {current_user}")
     except HTTPException as e:
-        logger.error(f"Authentication error: {str(e)}")
+        logger.warning("Authentication error: %s", e.detail)
         raise e
     
     try:
@@ -93,9 +130,8 @@ async def create_session(
             if not user_id:
                 raise HTTPException(status_code=400, detail="user_id is required for trainers")
             
-            logger.debug(f"Checking trainer-user mapping for trainer_id={current_user.get('trainer_id')} and user_id={user_id}")
             mapping_exists = await check_trainer_user_mapping(current_user.get('trainer_id'), user_id, authorization)
-            logger.debug(f"Mapping exists: {mapping_exists}")
+            logger.debug("Mapping trainer_id=%s user_id=%s exists: %s", current_user.get('trainer_id'), user_id, mapping_exists)
             if not mapping_exists:
                 raise HTTPException(status_code=403, detail="Trainer is not associated with this user")
             is_pt = "Y"
@@ -106,34 +142,202 @@ async def create_session(
             is_pt = "N"
 
         session_data = schemas.SessionCreate(
-            workout_date=datetime.now().strftime("%Y-%m-%d"),
+            workout_date=date.today(),
             user_id=user_id,
             trainer_id=current_user.get('trainer_id') if current_user['user_type'] == 'trainer' else None,
             is_pt=is_pt
         )
 
-        logger.debug(f"Attempting to create session with data: {session_data}")
         new_session = await crud.create_session(db, session_data)
-        logger.info(f"Session created successfully: {new_session.session_id}")
         return new_session
     except ValueError as ve:
-        logger.error(f"Validation error in create_session: {str(ve)}")
+        logger.warning("Validation error in create_session: %s", ve)
         raise HTTPException(status_code=400, detail=str(ve))
-    except HTTPException as he:
-        logger.error(f"HTTP exception in create_session: {str(he)}")
-        raise he
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error creating session: {str(e)}")
+        logger.error("Error creating session: %s", e)
         raise HTTPException(status_code=500, detail="Error creating session")
-    
-    
+
+
+@app.post("/sessions/{session_id}/sets", response_model=schemas.SessionSetsResponse)
+async def create_session_sets(
+    session_id: int,
+    payload: schemas.SessionSetsCreate,
+    db: AsyncSession = Depends(get_db),
+    authorization: str = Header(None)
+):
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Authorization header is missing")
+
+    current_user = await utils.get_current_member(authorization)
+
+    session = await crud.get_session(db, session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if current_user['user_type'] == 'trainer':
+        if session.trainer_id != current_user.get('trainer_id'):
+            raise HTTPException(status_code=403, detail="Trainer is not associated with this session")
+    elif session.user_id != current_user.get('user_id'):
+        raise HTTPException(status_code=403, detail="User can only log sets for their own sessions")
+
+    set_keys = [(s.workout_key, s.set_num) for s in payload.sets]
+    if len(set(set_keys)) != len(set_keys):
+        raise HTTPException(status_code=400, detail="Duplicate workout_key/set_num in request")
+
+    requested_keys = {s.workout_key for s in payload.sets}
+    # The in-memory index is only a fast path: keys added since its last refresh are checked in the DB
+    unknown_keys = requested_keys
+    if workout_catalogue.loaded:
+        unknown_keys = {key for key in requested_keys if key not in workout_catalogue.index}
+    if unknown_keys:
+        unknown_keys = unknown_keys - await crud.get_existing_workout_keys(db, unknown_keys)
+    if unknown_keys:
+        raise HTTPException(status_code=400, detail=f"Unknown workout_key(s): {sorted(unknown_keys)}")
+
+    try:
+        created = await crud.create_sets(db, session, payload.sets)
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="One or more sets are already logged for this session")
+    except Exception as e:
+        logger.error("Error logging sets: %s", e)
+        raise HTTPException(status_code=500, detail="Error logging sets")
+    return {"session_id": session_id, "sets_created": created}
+
+
+# Members may read their own data; trainers only that of clients with an accepted mapping
+async def authorize_member_access(current_user: dict, user_id: int, authorization: str):
+    if current_user.get('role') == 'admin':
+        return
+    if current_user['user_type'] == 'trainer':
+        if not await check_trainer_user_mapping(current_user.get('trainer_id'), user_id, authorization):
+            raise HTTPException(status_code=403, detail="Trainer is not associated with this user")
+    elif current_user.get('user_id') != user_id:
+        raise HTTPException(status_code=403, detail="Users can only read their own sessions")
+
+def encode_history_cursor(item: dict) -> str:
+    return f"{item['workout_date'].isoformat()}_{item['session_id']}"
+
+def decode_history_cursor(cursor: str) -> tuple:
+    try:
+        workout_date, session_id = cursor.split("_")
+        return date.fromisoformat(workout_date), int(session_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@app.get("/users/{user_id}/sessions", response_model=schemas.SessionHistoryPage)
+async def read_user_sessions(
+    user_id: int,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    authorization: str = Header(None)
+):
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Authorization header is missing")
+
+    current_user = await utils.get_current_member(authorization)
+    await authorize_member_access(current_user, user_id, authorization)
+
+    before = decode_history_cursor(cursor) if cursor else None
+    sessions = await crud.get_user_session_history(db, user_id, date_from, date_to, before=before, limit=limit)
+    next_cursor = encode_history_cursor(sessions[-1]) if len(sessions) == limit else None
+    return {"sessions": sessions, "next_cursor": next_cursor}
+
+
+# Daily volume, top weight and estimated 1RM for one exercise, for progress charts
+@app.get("/users/{user_id}/progress/{workout_key}", response_model=schemas.ExerciseProgress)
+async def read_exercise_progress(
+    user_id: int,
+    workout_key: int,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_db),
+    authorization: str = Header(None)
+):
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Authorization header is missing")
+
+    current_user = await utils.get_current_member(authorization)
+    await authorize_member_access(current_user, user_id, authorization)
+
+    points = await crud.get_exercise_progress(db, user_id, workout_key, date_from, date_to)
+    return {"user_id": user_id, "workout_key": workout_key, "points": points}
+
+
+# Accepted clients of the calling trainer, paged through user_service's /my-mappings/
+async def fetch_trainer_clients(token: str) -> list:
+    clients = []
+    after_id = 0
+    while True:
+        response = await http_client.user_service_client.get(
+            f"/my-mappings/?status=accepted&limit=500&after_id={after_id}", headers={"Authorization": token}
+        )
+        response.raise_for_status()
+        page = response.json()
+        clients.extend({"user_id": m["user_id"], "workout_frequency": m.get("workout_frequency")} for m in page)
+        if "next" not in response.links:
+            return clients
+        after_id = page[-1]["mapping_id"]
+
+@app.get("/trainer/dashboard", response_model=schemas.TrainerDashboard)
+async def read_trainer_dashboard(
+    weeks: int = Query(4, ge=1, le=52),
+    db: AsyncSession = Depends(get_db),
+    authorization: str = Header(None)
+):
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Authorization header is missing")
+
+    current_user = await utils.get_current_member(authorization)
+    if current_user['user_type'] != 'trainer':
+        raise HTTPException(status_code=403, detail="Trainer access required")
+
+    try:
+        clients = await fetch_trainer_clients(authorization)
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=e.response.status_code, detail="Error fetching trainer clients")
+    catalogue_index = await workout_catalogue.get(db)
+    return await analytics.trainer_dashboard(db, clients, catalogue_index, weeks)
+
+
+@app.get("/workouts/catalogue")
+async def read_workout_catalogue(
+    request: Request,
+    part: Optional[str] = None,
+    prefix: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    index = await workout_catalogue.get(db)
+    etag = index.etag_for(part, prefix)
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=0, must-revalidate"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    if part is None and prefix is None:
+        return Response(content=index.body, media_type="application/json", headers=headers)
+
+    entries = index.search_prefix(prefix) if prefix is not None else index.entries
+    if part is not None:
+        entries = [e for e in entries if e.workout_part == part]
+    body = {"version": index.version, "workouts": [entry_dict(e) for e in entries]}
+    return Response(content=json.dumps(body), media_type="application/json", headers=headers)
+
+
+# Called by user_service's purge outbox, which retries until this succeeds; answers only once the data is gone
+@app.post("/internal/members/purge", include_in_schema=False)
+async def purge_members(body: schemas.MemberPurgeRequest, authorization: str = Header(None)):
+    utils.require_service_token(authorization)
+    cache.mapping_cache.invalidate_members(trainer_ids=body.trainer_ids, user_ids=body.user_ids)
+    await purge.member_purger.purge(user_ids=body.user_ids, trainer_ids=body.trainer_ids)
+    return {"user_ids": len(body.user_ids), "trainer_ids": len(body.trainer_ids)}
+
 @app.get("/test")
 async def test_endpoint(
-    request: Request,
     authorization: str = Header(None)
 ):
-    logger.debug(f"Received request headers for test: {request.headers}")
-    
     if not authorization:
         raise HTTPException(status_code=401, detail="Authorization header is missing")
     
@@ -141,5 +345,35 @@ async def test_endpoint(
         current_user = await utils.get_current_member(authorization)
         return {"message": "Test successful", "user": current_user['email']}
     except HTTPException as e:
-        logger.error(f"Authentication error: {str(e)}")
-        raise e
\ No newline at end of file
+        logger.warning("Authentication error: %s", e.detail)
+        raise e
+
+# Liveness plus a SELECT 1 against the workout database
+@app.get("/health")
+async def health():
+    return await check_health(engine)
+
+# Connection pool usage, for sizing against the Postgres connection budget
+@app.get("/stats/db-pool")
+async def read_db_pool_stats():
+    return pool_stats(engine)
+
+# Outbound user_service client and connection pool metrics
+@app.get("/stats/user-service-client")
+async def read_user_service_client_stats():
+    return http_client.user_service_client.stats()
+
+# Trainer-user mapping cache hit/miss counters
+@app.get("/stats/mapping-cache")
+async def read_mapping_cache_stats():
+    return cache.mapping_cache.stats()
+
+# Progress of the workout-data purge for deleted members
+@app.get("/stats/member-purge")
+async def read_member_purge_stats():
+    return purge.member_purger.stats()
+
+# Prometheus scrape target; 404 when METRICS_ENABLED=false
+@app.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    return metrics_response()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -12,14 +12,31 @@ class WorkoutKeyNameMap(Base):
 class SessionIDMap(Base):
     __tablename__ = "session_id_mapping"
     session_id = Column(Integer, primary_key=True, index=True)
-    workout_date = Column(String, nullable=False)
+    workout_date = Column(Date, nullable=False)
     user_id = Column(Integer, nullable=False)
     trainer_id = Column(Integer, nullable=True)  # Changed to nullable
     is_pt = Column(String, nullable=False)
 
+    # Serves per-user history scans in (workout_date, session_id) order
+    __table_args__ = (
+        Index("ix_session_id_mapping_user_id_workout_date", "user_id", "workout_date", "session_id"),
+    )
+
 class Session(Base):
     __tablename__ = "session"
     session_id = Column(Integer, ForeignKey("session_id_mapping.session_id"), primary_key=True)
     workout_key = Column(Integer, ForeignKey("workout_key_name_mapping.workout_key"), primary_key=True)
     set_num = Column(Integer, primary_key=True)
-    weight = Column(Float, nullable=False)
\ No newline at end of file
+    weight = Column(Float, nullable=False)
+    reps = Column(Integer, nullable=True)
+
+class ExerciseDailyProgress(Base):
+    # Per user, exercise and day; maintained alongside set inserts so charts never scan session
+    __tablename__ = "exercise_daily_progress"
+    user_id = Column(Integer, primary_key=True)
+    workout_key = Column(Integer, ForeignKey("workout_key_name_mapping.workout_key"), primary_key=True)
+    workout_date = Column(Date, primary_key=True)
+    total_sets = Column(Integer, nullable=False)
+    total_volume = Column(Float, nullable=False)
+    max_weight = Column(Float, nullable=False)
+    estimated_1rm = Column(Float, nullable=False)
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""Per-exercise daily progress aggregates.
+
+Rebuild from scratch with:
+    python -m backend.workout_service.progress --batch-size 500
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import case, delete, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.common.logs import setup_logging
+from backend.workout_service import models
+
+logger = logging.getLogger(__name__)
+
+Progress = models.ExerciseDailyProgress
+
+
+def epley_1rm(weight: float, reps: int | None) -> float:
+    # A single (or unrecorded reps) is its own 1RM; Epley otherwise
+    if reps is None or reps <= 1:
+        return weight
+    return weight * (1 + reps / 30)
+
+
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _merged_values(incoming):
+    # Column updates that fold a new batch into an existing row; ``incoming`` is excluded.* or bound values
+    return {
+        "total_sets": Progress.total_sets + incoming["total_sets"],
+        "total_volume": Progress.total_volume + incoming["total_volume"],
+        "max_weight": case((incoming["max_weight"] > Progress.max_weight, incoming["max_weight"]),
+                           else_=Progress.max_weight),
+        "estimated_1rm": case((incoming["estimated_1rm"] > Progress.estimated_1rm, incoming["estimated_1rm"]),
+                              else_=Progress.estimated_1rm),
+    }
+
+
+async def _update_then_insert(db: AsyncSession, rows: list):
+    # Portable fallback for dialects without ON CONFLICT: UPDATE, INSERT when no row matched, and
+    # UPDATE again if a concurrent writer inserted the row first. All inside the caller's transaction
+    for row in rows:
+        key = (Progress.user_id == row["user_id"], Progress.workout_key == row["workout_key"],
+               Progress.workout_date == row["workout_date"])
+        merge = update(Progress).where(*key).values(_merged_values({k: literal(v) for k, v in row.items()}))
+        merge = merge.execution_options(synchronize_session=False)
+        if (await db.execute(merge)).rowcount:
+            continue
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(Progress).values(row))
+        except IntegrityError:
+            await db.execute(merge)
+
+
+# Fold a batch of sets for one session into the daily aggregates; runs inside the caller's transaction
+async def apply_sets(db: AsyncSession, session: models.SessionIDMap, sets: list):
+    daily = {}
+    for s in sets:
+        reps = s.reps or 1
+        agg = daily.setdefault(s.workout_key, {"total_sets": 0, "total_volume": 0.0, "max_weight": 0.0, "estimated_1rm": 0.0})
+        agg["total_sets"] += 1
+        agg["total_volume"] += s.weight * reps
+        agg["max_weight"] = max(agg["max_weight"], s.weight)
+        agg["estimated_1rm"] = max(agg["estimated_1rm"], epley_1rm(s.weight, s.reps))
+
+    rows = [
+        {"user_id": session.user_id, "workout_key": workout_key, "workout_date": session.workout_date, **agg}
+        for workout_key, agg in daily.items()
+    ]
+    upsert_insert = UPSERT_INSERTS.get(db.bind.dialect.name)
+    if upsert_insert is None:
+        await _update_then_insert(db, rows)
+        return
+    stmt = upsert_insert(Progress).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Progress.user_id, Progress.workout_key, Progress.workout_date],
+        set_=_merged_values({name: getattr(stmt.excluded, name) for name in ("total_sets", "total_volume", "max_weight", "estimated_1rm")}),
+    )
+    await db.execute(stmt)
+
+
+def _aggregate_query(user_ids: list):
+    reps = func.coalesce(models.Session.reps, 1)
+    one_rm = case((reps <= 1, models.Session.weight), else_=models.Session.weight * (1 + reps / 30.0))
+    return select(
+        models.SessionIDMap.user_id,
+        models.Session.workout_key,
+        models.SessionIDMap.workout_date,
+        func.count(),
+        func.sum(models.Session.weight * reps),
+        func.max(models.Session.weight),
+        func.max(one_rm),
+    ).join(
+        models.SessionIDMap, models.SessionIDMap.session_id == models.Session.session_id
+    ).where(
+        models.SessionIDMap.user_id.in_(user_ids)
+    ).group_by(models.SessionIDMap.user_id, models.Session.workout_key, models.SessionIDMap.workout_date)
+
+
+# Recompute the aggregates from the session table, one committed batch of users at a time
+async def rebuild_progress(db: AsyncSession, batch_size: int = 500) -> int:
+    last_user_id = None
+    rebuilt_users = 0
+    while True:
+        query = select(models.SessionIDMap.user_id).distinct().order_by(models.SessionIDMap.user_id).limit(batch_size)
+        if last_user_id is not None:
+            query = query.where(models.SessionIDMap.user_id > last_user_id)
+        user_ids = (await db.execute(query)).scalars().all()
+        if not user_ids:
+            break
+
+        await db.execute(delete(Progress).where(Progress.user_id.in_(user_ids)))
+        await db.execute(insert(Progress).from_select(
+            ["user_id", "workout_key", "workout_date", "total_sets", "total_volume", "max_weight", "estimated_1rm"],
+            _aggregate_query(user_ids),
+        ))
+        await db.commit()
+
+        rebuilt_users += len(user_ids)
+        last_user_id = user_ids[-1]
+        logger.info("Rebuilt progress for %d users (through user_id %d)", rebuilt_users, last_user_id)
+    return rebuilt_users
+
+
+async def _main(batch_size: int):
+    from backend.workout_service import database
+    async with database.AsyncSession() as db:
+        users = await rebuild_progress(db, batch_size)
+    await database.engine.dispose()
+    logger.info("Progress rebuild finished: %d users", users)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild exercise_daily_progress from logged sets")
+    parser.add_argument("--batch-size", type=int, default=500, help="users per transaction")
+    args = parser.parse_args()
+    setup_logging("workout_service.progress")
+    asyncio.run(_main(args.batch_size))
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import os
+
+from sqlalchemy import delete, select, update
+
+from backend.workout_service import cache, database, models
+
+logger = logging.getLogger(__name__)
+
+MEMBER_PURGE_CHUNK_SIZE = int(os.getenv("MEMBER_PURGE_CHUNK_SIZE", "500"))
+MEMBER_PURGE_BATCH_SIZE = int(os.getenv("MEMBER_PURGE_BATCH_SIZE", "100"))
+
+# The purge session never holds ORM objects, so there is nothing to synchronise
+BULK = {"synchronize_session": False}
+
+
+class MemberPurger:
+    """Removes workout data for members deleted in user_service.
+
+    ``handle_event`` only queues the ids; a background worker drains the queue
+    in batches and deletes in chunks of at most ``chunk_size`` sessions, each
+    committed on its own, so a large account never holds locks for long. A
+    deleted user's sessions, sets and daily progress go away; a deleted
+    trainer's clients keep their sessions with trainer_id cleared. Purging is
+    idempotent, so replaying an event is harmless.
+
+    Events are the fast path and can be lost (no bus configured, or workout_service
+    down when one is published). user_service's purge outbox also calls
+    /internal/members/purge, which runs ``purge`` directly, and retries until it
+    succeeds, so every deletion is purged eventually.
+    """
+
+    def __init__(self, session_factory, chunk_size: int = MEMBER_PURGE_CHUNK_SIZE,
+                 batch_size: int = MEMBER_PURGE_BATCH_SIZE):
+        self.session_factory = session_factory
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self._queue = asyncio.Queue()
+        self._worker = None
+        self.users_purged = 0
+        self.trainers_detached = 0
+        self.sessions_deleted = 0
+        self.sets_deleted = 0
+        self.progress_rows_deleted = 0
+        self.failed_batches = 0
+
+    async def handle_event(self, message: dict):
+        user_ids = message.get("user_ids") or []
+        trainer_ids = message.get("trainer_ids") or []
+        if not user_ids and not trainer_ids:
+            logger.warning("Ignoring member deletion event without ids: %s", message)
+            return
+        cache.mapping_cache.invalidate_members(trainer_ids=trainer_ids, user_ids=user_ids)
+        for user_id in user_ids:
+            self._queue.put_nowait(("user", user_id))
+        for trainer_id in trainer_ids:
+            self._queue.put_nowait(("trainer", trainer_id))
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self.purge(
+                    user_ids=[member_id for kind, member_id in batch if kind == "user"],
+                    trainer_ids=[member_id for kind, member_id in batch if kind == "trainer"],
+                )
+            except Exception:
+                # Keep the worker alive; the ids are logged so the purge can be replayed
+                self.failed_batches += 1
+                logger.exception("Member purge failed for %s", batch)
+
+    async def purge(self, user_ids: list = (), trainer_ids: list = ()):
+        async with self.session_factory() as db:
+            if user_ids:
+                await self._purge_users(db, list(user_ids))
+            if trainer_ids:
+                await self._detach_trainers(db, list(trainer_ids))
+
+    async def _purge_users(self, db, user_ids: list):
+        mapping = models.SessionIDMap
+        while True:
+            result = await db.execute(
+                select(mapping.session_id).where(mapping.user_id.in_(user_ids)).limit(self.chunk_size)
+            )
+            session_ids = result.scalars().all()
+            if not session_ids:
+                break
+            sets = await db.execute(delete(models.Session).where(models.Session.session_id.in_(session_ids)),
+                                    execution_options=BULK)
+            await db.execute(delete(mapping).where(mapping.session_id.in_(session_ids)), execution_options=BULK)
+            await db.commit()
+            self.sessions_deleted += len(session_ids)
+            self.sets_deleted += sets.rowcount
+
+        progress = await db.execute(
+            delete(models.ExerciseDailyProgress).where(models.ExerciseDailyProgress.user_id.in_(user_ids)),
+            execution_options=BULK,
+        )
+        await db.commit()
+        self.progress_rows_deleted += progress.rowcount
+        self.users_purged += len(user_ids)
+        logger.info("Purged workout data for %d deleted user(s)", len(user_ids))
+
+    async def _detach_trainers(self, db, trainer_ids: list):
+        mapping = models.SessionIDMap
+        while True:
+            chunk = select(mapping.session_id).where(mapping.trainer_id.in_(trainer_ids)).limit(self.chunk_size)
+            result = await db.execute(
+                update(mapping).where(mapping.session_id.in_(chunk)).values(trainer_id=None), execution_options=BULK
+            )
+            await db.commit()
+            if result.rowcount < self.chunk_size:
+                break
+        self.trainers_detached += len(trainer_ids)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "users_purged": self.users_purged,
+            "trainers_detached": self.trainers_detached,
+            "sessions_deleted": self.sessions_deleted,
+            "sets_deleted": self.sets_deleted,
+            "progress_rows_deleted": self.progress_rows_deleted,
+            "failed_batches": self.failed_batches,
+        }
+
+
+member_purger = MemberPurger(database.AsyncSession)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, List, Optional
 from datetime import date
 
 class SessionIDMap(BaseModel):
@@ -21,4 +21,62 @@ class Member(BaseModel):
     user_type: str
 
     class ConfigDict(ConfigDict):
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class SetCreate(BaseModel):
+    workout_key: int
+    set_num: int = Field(ge=1)
+    weight: float = Field(ge=0)
+    reps: Optional[int] = Field(default=None, ge=1)
+
+class SessionSetsCreate(BaseModel):
+    sets: List[SetCreate] = Field(min_length=1, max_length=500)
+
+class SessionSetsResponse(BaseModel):
+    session_id: int
+    sets_created: int
+
+class SetRecord(BaseModel):
+    workout_key: int
+    set_num: int
+    weight: float
+    reps: Optional[int] = None
+
+class SessionHistoryItem(BaseModel):
+    session_id: int
+    workout_date: date
+    trainer_id: Optional[int]
+    is_pt: str
+    sets: List[SetRecord]
+
+class SessionHistoryPage(BaseModel):
+    sessions: List[SessionHistoryItem]
+    next_cursor: Optional[str] = None
+
+class ProgressPoint(BaseModel):
+    workout_date: date
+    total_sets: int
+    total_volume: float
+    max_weight: float
+    estimated_1rm: float
+
+class ExerciseProgress(BaseModel):
+    user_id: int
+    workout_key: int
+    points: List[ProgressPoint]
+
+class ClientDashboard(BaseModel):
+    user_id: int
+    weekly_volume: List[float]
+    sessions_per_week: List[int]
+    body_part_volume: Dict[str, float]
+    target_sessions_per_week: Optional[int]
+    adherence: Optional[float]
+
+class TrainerDashboard(BaseModel):
+    week_starts: List[date]
+    clients: List[ClientDashboard]
+
+class MemberPurgeRequest(BaseModel):
+    user_ids: List[int] = []
+    trainer_ids: List[int] = []
@@ -4,60 +4,95 @@ import os
 import logging
 import jwt
 from jwt.exceptions import PyJWTError
+from cachetools import TTLCache
+from backend.workout_service import http_client
 
-USER_SERVICE_URL = "http://127.0.0.1:8000"
 SECRET_KEY = os.getenv("SECRET_KEY")  # Make sure this matches the secret key used in user_service
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Remote existence checks are only for revocation, so a short TTL is enough
+REVOCATION_CHECK_ENABLED = os.getenv("WORKOUT_REVOCATION_CHECK", "false").lower() == "true"
+REVOCATION_CACHE_TTL = int(os.getenv("WORKOUT_REVOCATION_CACHE_TTL", "30"))
+revocation_cache = TTLCache(maxsize=10000, ttl=REVOCATION_CACHE_TTL)
+
+async def member_still_exists(user_type: str, email: str, token: str) -> bool:
+    cache_key = (user_type, email)
+    if cache_key in revocation_cache:
+        return revocation_cache[cache_key]
+
+    path = "users" if user_type == 'user' else "trainers"
+    response = await http_client.user_service_client.get(f"/{path}/byemail/{email}", headers={"Authorization": f"Bearer {token}"})
+    if response.status_code == 404:
+        exists = False
+    else:
+        response.raise_for_status()
+        exists = True
+    revocation_cache[cache_key] = exists
+    return exists
+
 async def get_current_member(token: str):
     try:
         # Remove 'Bearer ' prefix if present
         if token.startswith('Bearer '):
             token = token[7:]
 
+        # The token is signed by user_service, so its claims are trusted as-is
         payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
         email: str = payload.get("sub")
         user_type: str = payload.get("type")
         
         if email is None or user_type is None:
             raise HTTPException(status_code=401, detail="Invalid token payload")
-        
-        logger.debug(f"Decoded token payload: email={email}, user_type={user_type}")
-
-        async with httpx.AsyncClient() as client:
-            headers = {"Authorization": f"Bearer {token}"}
-            if user_type == 'user':
-                response = await client.get(f"{USER_SERVICE_URL}/users/byemail/{email}", headers=headers)
-            elif user_type == 'trainer':
-                response = await client.get(f"{USER_SERVICE_URL}/trainers/byemail/{email}", headers=headers)
-            else:
-                logger.error(f"Invalid user_type: {user_type}")
-                raise HTTPException(status_code=400, detail="Invalid user type")
-            
-            response.raise_for_status()
-            user_data = response.json()
-            
-            # Add user_type to the user_data
-            user_data['user_type'] = user_type
-            
-            logger.info(f"User authenticated successfully: {user_data}")
-            return user_data
+        if user_type not in ('user', 'trainer'):
+            logger.warning("Invalid user_type: %s", user_type)
+            raise HTTPException(status_code=400, detail="Invalid user type")
 
-    except PyJWTError as e:
-        logger.error(f"JWT decode error: {str(e)}")
-        raise HTTPException(status_code=401, detail="Invalid token")
-    except httpx.HTTPStatusError as e:
-        logger.error(f"HTTP error occurred: {e}")
-        if e.response.status_code == 401:
+        id_claim = f"{user_type}_id"
+        member_id = payload.get(id_claim)
+        if member_id is None:
+            raise HTTPException(status_code=401, detail="Invalid token payload")
+
+        if REVOCATION_CHECK_ENABLED and not await member_still_exists(user_type, email, token):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        else:
-            raise HTTPException(status_code=e.response.status_code, detail=str(e))
+
+        return {
+            "email": email,
+            "user_type": user_type,
+            "role": payload.get("role"),
+            id_claim: member_id,
+        }
+
+    except PyJWTError as e:
+        logger.warning("JWT decode error: %s", e)
+        raise HTTPException(status_code=401, detail="Invalid token")
+    except HTTPException:
+        raise
+    except httpx.HTTPStatusError as e:
+        logger.error("HTTP error occurred: %s", e)
+        raise HTTPException(status_code=e.response.status_code, detail=str(e))
+    except httpx.TransportError as e:
+        # Retries are spent; answer like the open circuit does
+        logger.error("User service unreachable for the revocation check: %s", e)
+        raise HTTPException(status_code=503, detail="User service is temporarily unavailable")
     except Exception as e:
-        logger.error(f"An unexpected error occurred: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        logger.error("An unexpected error occurred: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+# Internal routes called by user_service itself, with a token of type "service" signed by the shared key
+def require_service_token(token: str):
+    if not token:
+        raise HTTPException(status_code=401, detail="Authorization header is missing")
+    if token.startswith('Bearer '):
+        token = token[7:]
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+    except PyJWTError as e:
+        logger.warning("JWT decode error: %s", e)
+        raise HTTPException(status_code=401, detail="Invalid token")
+    if payload.get("type") != "service":
+        raise HTTPException(status_code=403, detail="Service credentials required")
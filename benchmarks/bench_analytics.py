@@ -0,0 +1,88 @@
+"""Trainer dashboard aggregation on a synthetic set log.
+
+Times analytics.compute_dashboard (the vectorised path) on --sets rows and a
+plain Python dict-accumulator on a --baseline-sets sample for comparison.
+
+Usage: python -m benchmarks.bench_analytics [--sets 10000000] [--clients 100] [--weeks 12]
+"""
+import argparse
+import time
+from collections import defaultdict
+from datetime import date
+
+import numpy as np
+
+from backend.workout_service.analytics import PartLookup, SessionFrame, SetFrame, compute_dashboard, week_window
+
+PARTS = ["Back", "Chest", "Core", "Legs", "Shoulders", "Arms"]
+
+
+def synthetic_frames(n_sets: int, n_users: int, n_keys: int, start: date, days: int, rng):
+    sets = SetFrame(
+        user_id=rng.integers(1, n_users + 1, n_sets, dtype=np.int64),
+        day=start.toordinal() + rng.integers(0, days, n_sets, dtype=np.int64),
+        workout_key=rng.integers(1, n_keys + 1, n_sets, dtype=np.int64),
+        volume=rng.uniform(20, 200, n_sets) * rng.integers(1, 13, n_sets),
+    )
+    n_sessions = n_sets // 20
+    sessions = SessionFrame(
+        user_id=rng.integers(1, n_users + 1, n_sessions, dtype=np.int64),
+        day=start.toordinal() + rng.integers(0, days, n_sessions, dtype=np.int64),
+    )
+    return sets, sessions
+
+
+def python_baseline(sets: SetFrame, client_ids, start: date, weeks: int, parts: PartLookup):
+    # The straightforward per-row loop the vectorised path replaces
+    clients = set(client_ids.tolist())
+    part_of = dict(zip(parts.keys.tolist(), parts.parts.tolist()))
+    start_day = start.toordinal()
+    weekly = defaultdict(float)
+    by_part = defaultdict(float)
+    for user_id, day, key, volume in zip(sets.user_id.tolist(), sets.day.tolist(), sets.workout_key.tolist(),
+                                         sets.volume.tolist()):
+        week = (day - start_day) // 7
+        if user_id in clients and 0 <= week < weeks:
+            weekly[(user_id, week)] += volume
+            by_part[(user_id, part_of.get(key, -1))] += volume
+    return weekly, by_part
+
+
+def main(args):
+    rng = np.random.default_rng(0)
+    start, _ = week_window(args.weeks, date(2024, 12, 31))
+    n_keys = 200
+    parts = PartLookup(np.arange(1, n_keys + 1, dtype=np.int64), np.arange(n_keys, dtype=np.int64) % len(PARTS),
+                       PARTS + ["Unknown"])
+
+    generated = time.perf_counter()
+    sets, sessions = synthetic_frames(args.sets, args.users, n_keys, start, args.weeks * 7, rng)
+    print(f"generated {args.sets:,} sets in {time.perf_counter() - generated:.2f}s")
+
+    client_ids = rng.choice(np.arange(1, args.users + 1), args.clients, replace=False).astype(np.int64)
+    targets = rng.integers(0, 6, args.clients)
+
+    timings = []
+    for _ in range(args.repeat):
+        began = time.perf_counter()
+        compute_dashboard(sets, sessions, client_ids, targets, start, args.weeks, parts)
+        timings.append(time.perf_counter() - began)
+    best = min(timings)
+    print(f"vectorised: {best:.3f}s for {args.sets:,} sets ({args.sets / best / 1e6:.1f}M sets/s)")
+
+    sample = SetFrame(*(column[:args.baseline_sets] for column in (sets.user_id, sets.day, sets.workout_key, sets.volume)))
+    began = time.perf_counter()
+    python_baseline(sample, client_ids, start, args.weeks, parts)
+    elapsed = time.perf_counter() - began
+    print(f"python loop: {elapsed:.3f}s for {args.baseline_sets:,} sets ({args.baseline_sets / elapsed / 1e6:.2f}M sets/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sets", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=100, help="distinct user ids in the log; load_frames only fetches clients")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--weeks", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline-sets", type=int, default=1_000_000)
+    main(parser.parse_args())
@@ -0,0 +1,114 @@
+"""Request throughput under each logging configuration.
+
+Drives a small in-process app whose handler logs like a typical endpoint does
+(a few DEBUG lines and one INFO line). It is run three ways:
+
+    sync-debug   the old setup: basicConfig-style StreamHandler, f-strings, DEBUG
+    queue-debug  backend.common.logs at DEBUG (JSON, background writer)
+    queue-info   backend.common.logs at INFO, so the DEBUG calls are skipped
+
+--sink-latency-us makes every write block for that long, the way stderr does
+when a terminal or container log pipe falls behind; with the default of 0 the
+sink is a buffered temp file.
+
+Usage: python -m benchmarks.bench_logging [--requests 20000] [--concurrency 50] [--sink-latency-us 0]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from backend.common import logs
+
+logger = logging.getLogger("bench.endpoint")
+
+
+class SlowSink:
+    def __init__(self, stream, latency: float):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, text: str):
+        time.sleep(self.latency)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def build_app(lazy: bool) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(logs.RequestIdMiddleware)
+    headers = {"authorization": "Bearer " + "x" * 180, "user-agent": "bench", "accept": "*/*"}
+    member = {"email": "user@example.com", "user_type": "user", "user_id": 1}
+
+    @app.get("/work")
+    async def work():
+        if lazy:
+            logger.debug("Authenticated member %s", member["user_id"])
+            logger.debug("Mapping trainer_id=%s user_id=%s exists: %s", 7, 1, True)
+            logger.debug("Creating session for user %s", 1)
+            logger.info("Session created: %s", 42)
+        else:
+            logger.debug(f"Received request headers: {headers}")
+            logger.debug(f"Authentication successful. Current user: {member}")
+            logger.debug(f"Attempting to create session with data: {member}")
+            logger.info(f"Session created successfully: {42}")
+        return {"ok": True}
+
+    return app
+
+
+def configure(mode: str, stream):
+    logs.stop_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    if mode == "sync-debug":
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        root.addHandler(handler)
+        root.setLevel(logging.DEBUG)
+    else:
+        os.environ["LOG_LEVEL"] = "DEBUG" if mode == "queue-debug" else "INFO"
+        logs.setup_logging("bench", stream=stream)
+
+
+async def drive(app: FastAPI, requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(requests))
+
+        async def worker():
+            for _ in remaining:
+                response = await client.get("/work")
+                response.raise_for_status()
+
+        began = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - began
+
+
+async def main(args):
+    with tempfile.TemporaryFile("w") as file:
+        sink = SlowSink(file, args.sink_latency_us / 1e6) if args.sink_latency_us else file
+        for mode in ("sync-debug", "queue-debug", "queue-info"):
+            configure(mode, sink)
+            app = build_app(lazy=mode != "sync-debug")
+            await drive(app, min(500, args.requests), args.concurrency)  # warm-up
+            elapsed = await drive(app, args.requests, args.concurrency)
+            logs.stop_logging()  # drain the queue so the next mode starts clean
+            print(f"{mode:12s} {args.requests / elapsed:8.0f} req/s ({elapsed:.2f}s for {args.requests:,} requests)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--sink-latency-us", type=float, default=0)
+    asyncio.run(main(parser.parse_args()))
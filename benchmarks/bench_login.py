@@ -0,0 +1,85 @@
+"""Login latency: legacy two-table lookup vs the single UNION lookup.
+
+Usage: python -m benchmarks.bench_login [--members 2000] [--logins 200] [--rounds 10]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.user_service import hashing, models, utils
+
+
+# The pre-UNION implementation, kept here only as the "before" baseline
+async def legacy_authenticate_member(db: AsyncSession, email: str, password: str):
+    user_result = await db.execute(select(models.User).filter(models.User.email == email))
+    user = user_result.scalar_one_or_none()
+    if user and await hashing.verify_password(password, user.hashed_password):
+        return user
+    trainer_result = await db.execute(select(models.Trainer).filter(models.Trainer.email == email))
+    trainer = trainer_result.scalar_one_or_none()
+    if trainer and await hashing.verify_password(password, trainer.hashed_password):
+        return trainer
+    return None
+
+
+async def seed(db: AsyncSession, members: int):
+    hashed = await hashing.hash_password("password123")
+    db.add_all(models.User(email=f"user{i}@example.com", hashed_password=hashed, role="user") for i in range(members))
+    db.add_all(models.Trainer(email=f"trainer{i}@example.com", hashed_password=hashed) for i in range(members // 10))
+    await db.commit()
+
+
+def percentiles(samples: list[float]) -> dict:
+    cuts = statistics.quantiles(samples, n=100)
+    return {"p50_ms": round(cuts[49] * 1000, 2), "p99_ms": round(cuts[98] * 1000, 2)}
+
+
+async def run(db: AsyncSession, authenticate, emails: list[str]) -> dict:
+    samples = []
+    for email in emails:
+        password = "password123" if random.random() < 0.8 else "wrong-password"
+        start = time.perf_counter()
+        await authenticate(db, email, password)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+async def main(args):
+    hashing.password_hasher.rounds = args.rounds
+    engine = create_async_engine(os.getenv("BENCH_DATABASE_URL", "sqlite+aiosqlite:///:memory:"), poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with async_session() as db:
+        await seed(db, args.members)
+        # Mix of user, trainer and unknown-email logins
+        emails = [random.choice([
+            f"user{random.randrange(args.members)}@example.com",
+            f"trainer{random.randrange(args.members // 10)}@example.com",
+            "missing@example.com",
+        ]) for _ in range(args.logins)]
+        before = await run(db, legacy_authenticate_member, emails)
+        after = await run(db, utils.authenticate_member, emails)
+
+    await engine.dispose()
+    hashing.password_hasher.shutdown()
+    print(f"before: {before}")
+    print(f"after:  {after}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--members", type=int, default=2000)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=10)
+    random.seed(0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,353 @@
+"""Mixed-workload benchmark for user_service and workout_service.
+
+Seeds synthetic users, trainers, mappings and sessions, then drives a weighted
+mix of login, me, mappings and create_session requests from --concurrency
+workers. It reports per-scenario RPS and p50/p95/p99 latency, plus per-route
+SQL statement counts taken from the services' /metrics endpoints. Results are
+written as JSON so runs can be diffed across commits.
+
+    --mode inprocess  both apps behind httpx.ASGITransport. workout_service
+                      reaches user_service through the same transport
+    --mode uvicorn    both apps as uvicorn subprocesses on local ports
+
+The databases default to throwaway SQLite files. Point --user-db-url and
+--workout-db-url at scratch Postgres databases to benchmark against Postgres.
+Every table is dropped and recreated, so never use a database you care about.
+
+Usage: python -m benchmarks.bench_services [--users 1000] [--requests 5000] [--concurrency 50]
+                                           [--mix login=1,me=4,mappings=3,create_session=2]
+                                           [--output bench_results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+
+SECRET_KEY = "bench-secret-key-that-is-at-least-32-bytes"
+PASSWORD = "password123"
+SQL_SUM = re.compile(r'^http_request_sql_statements_(sum|count)\{method="([^"]+)",route="([^"]+)"\} (\S+)$')
+
+
+def configure_environment(args, workdir: str):
+    # Must run before any service module is imported: both read their settings at import time
+    os.environ["SQLALCHEMY_DATABASE_USER_URL"] = args.user_db_url or f"sqlite+aiosqlite:///{workdir}/users.db"
+    os.environ["SQLALCHEMY_DATABASE_WORKOUT_URL"] = args.workout_db_url or f"sqlite+aiosqlite:///{workdir}/workout.db"
+    os.environ["SECRET_KEY"] = SECRET_KEY
+    os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ["METRICS_ENABLED"] = "true"
+    os.environ["CATALOGUE_REFRESH_SECONDS"] = "0"
+
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario {name!r}; choose from {sorted(SCENARIOS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+async def seed(args) -> dict:
+    from sqlalchemy import insert
+    from backend.user_service import database as user_database, hashing, models as user_models
+    from backend.workout_service import database as workout_database, models as workout_models
+
+    rng = random.Random(args.seed)
+    hashed = await hashing.hash_password(PASSWORD)
+    n_trainers = max(1, args.users // args.users_per_trainer)
+
+    async with user_database.engine.begin() as conn:
+        await conn.run_sync(user_models.Base.metadata.drop_all)
+        await conn.run_sync(user_models.Base.metadata.create_all)
+        for start in range(0, args.users, 1000):
+            await conn.execute(insert(user_models.User), [{
+                "user_id": i, "email": f"user{i}@bench.local", "hashed_password": hashed, "role": "user",
+                "first_name": "Bench", "last_name": f"User{i}", "workout_goal": rng.randint(1, 3),
+                "workout_duration": rng.choice([30, 45, 60]), "workout_frequency": rng.randint(1, 6),
+            } for i in range(start + 1, min(args.users, start + 1000) + 1)])
+        await conn.execute(insert(user_models.Trainer), [{
+            "trainer_id": t, "email": f"trainer{t}@bench.local", "hashed_password": hashed, "role": "trainer",
+            "first_name": "Bench", "last_name": f"Trainer{t}",
+        } for t in range(1, n_trainers + 1)])
+        # Every user has one trainer; --accepted-ratio of those mappings are accepted
+        mappings = [{
+            "trainer_id": (user_id - 1) % n_trainers + 1, "user_id": user_id, "requester_id": user_id,
+            "status": user_models.MappingStatus.accepted if rng.random() < args.accepted_ratio
+            else user_models.MappingStatus.pending,
+        } for user_id in range(1, args.users + 1)]
+        for start in range(0, len(mappings), 1000):
+            await conn.execute(insert(user_models.TrainerUserMap), mappings[start:start + 1000])
+
+    async with workout_database.engine.begin() as conn:
+        await conn.run_sync(workout_models.Base.metadata.drop_all)
+        await conn.run_sync(workout_models.Base.metadata.create_all)
+        parts = ["Back", "Chest", "Core", "Legs", "Shoulders", "Arms"]
+        await conn.execute(insert(workout_models.WorkoutKeyNameMap), [
+            {"workout_key": k, "workout_name": f"Exercise {k}", "workout_part": parts[k % len(parts)]} for k in range(1, 61)
+        ])
+        today = date.today()
+        sessions, sets = [], []
+        session_id = 0
+        for user_id in range(1, args.users + 1):
+            for _ in range(args.sessions_per_user):
+                session_id += 1
+                sessions.append({"session_id": session_id, "user_id": user_id, "trainer_id": None, "is_pt": "N",
+                                 "workout_date": today - timedelta(days=rng.randrange(90))})
+                for set_num, workout_key in enumerate(rng.sample(range(1, 61), 4), start=1):
+                    sets.append({"session_id": session_id, "workout_key": workout_key, "set_num": set_num,
+                                 "weight": float(rng.randrange(20, 120, 5)), "reps": rng.randint(5, 12)})
+        for start in range(0, len(sessions), 2000):
+            await conn.execute(insert(workout_models.SessionIDMap), sessions[start:start + 2000])
+        for start in range(0, len(sets), 2000):
+            await conn.execute(insert(workout_models.Session), sets[start:start + 2000])
+
+    accepted = [(m["trainer_id"], m["user_id"]) for m in mappings if m["status"] == user_models.MappingStatus.accepted]
+    return {"users": args.users, "trainers": n_trainers, "accepted_mappings": len(accepted),
+            "sessions": len(sessions), "sets": len(sets), "accepted": accepted}
+
+
+def mint_tokens(seeded: dict, rng: random.Random, count: int) -> dict:
+    from backend.user_service import utils
+    # Same claims /login issues; minting skips bcrypt so only the login scenario pays for it
+    users = [utils.create_access_token({"sub": f"user{u}@bench.local", "type": "user", "role": "user", "user_id": u},
+                                       timedelta(hours=1))
+             for u in rng.sample(range(1, seeded["users"] + 1), min(count, seeded["users"]))]
+    trainers = {t: utils.create_access_token({"sub": f"trainer{t}@bench.local", "type": "trainer", "role": "trainer",
+                                              "trainer_id": t}, timedelta(hours=1))
+                for t in range(1, seeded["trainers"] + 1)}
+    return {"users": users, "trainers": trainers}
+
+
+class Clients:
+    def __init__(self, user: httpx.AsyncClient, workout: httpx.AsyncClient, seeded: dict, tokens: dict, rng):
+        self.user = user
+        self.workout = workout
+        self.seeded = seeded
+        self.tokens = tokens
+        self.rng = rng
+
+    def user_token(self) -> dict:
+        return {"Authorization": f"Bearer {self.rng.choice(self.tokens['users'])}"}
+
+    def trainer_token(self, trainer_id: int = None) -> dict:
+        trainer_id = trainer_id or self.rng.randint(1, self.seeded["trainers"])
+        return {"Authorization": f"Bearer {self.tokens['trainers'][trainer_id]}"}
+
+
+async def scenario_login(c: Clients) -> httpx.Response:
+    if c.rng.random() < 0.8:
+        username = f"user{c.rng.randint(1, c.seeded['users'])}@bench.local"
+    else:
+        username = f"trainer{c.rng.randint(1, c.seeded['trainers'])}@bench.local"
+    return await c.user.post("/login", data={"username": username, "password": PASSWORD})
+
+async def scenario_me(c: Clients) -> httpx.Response:
+    return await c.user.get("/users/me/", headers=c.user_token())
+
+async def scenario_mappings(c: Clients) -> httpx.Response:
+    headers = c.user_token() if c.rng.random() < 0.5 else c.trainer_token()
+    return await c.user.get("/my-mappings/", params={"status": "accepted"}, headers=headers)
+
+async def scenario_create_session(c: Clients) -> httpx.Response:
+    # Half self-logged, half logged by the trainer (exercises the cross-service mapping check)
+    if c.seeded["accepted"] and c.rng.random() < 0.5:
+        trainer_id, user_id = c.rng.choice(c.seeded["accepted"])
+        return await c.workout.post("/create_session", params={"user_id": user_id}, headers=c.trainer_token(trainer_id))
+    return await c.workout.post("/create_session", headers=c.user_token())
+
+SCENARIOS = {
+    "login": scenario_login,
+    "me": scenario_me,
+    "mappings": scenario_mappings,
+    "create_session": scenario_create_session,
+}
+
+
+async def drive(clients: Clients, mix: dict, requests: int, concurrency: int) -> tuple:
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    plan = clients.rng.choices(names, weights=weights, k=requests)
+    samples = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    queue = iter(plan)
+
+    async def worker():
+        for name in queue:
+            started = time.perf_counter()
+            try:
+                response = await SCENARIOS[name](clients)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            samples[name].append(time.perf_counter() - started)
+            errors[name] += failed
+
+    began = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, errors, time.perf_counter() - began
+
+
+def summarise(samples: list, errors: int, elapsed: float) -> dict:
+    if len(samples) < 2:
+        return {"requests": len(samples), "errors": errors}
+    cuts = statistics.quantiles(samples, n=100)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / elapsed, 1),
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 2),
+    }
+
+
+async def scrape_sql(clients: list) -> dict:
+    totals = {}
+    for client in clients:
+        text = (await client.get("/metrics")).text
+        for line in text.splitlines():
+            match = SQL_SUM.match(line)
+            if match:
+                kind, method, route, value = match.groups()
+                totals.setdefault(f"{method} {route}", {"sum": 0.0, "count": 0.0})[kind] += float(value)
+    return totals
+
+
+def sql_delta(before: dict, after: dict) -> dict:
+    routes = {}
+    for route, totals in after.items():
+        previous = before.get(route, {"sum": 0.0, "count": 0.0})
+        count = totals["count"] - previous["count"]
+        if count and route.split(" ", 1)[1] not in ("/metrics", "/health"):
+            statements = totals["sum"] - previous["sum"]
+            routes[route] = {"requests": int(count), "sql_statements": int(statements),
+                             "sql_per_request": round(statements / count, 2)}
+    return dict(sorted(routes.items()))
+
+
+async def wait_until_healthy(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{url}/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise SystemExit(f"{url} did not become healthy within {timeout}s")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def main(args):
+    workdir = tempfile.mkdtemp(prefix="bench_services_")
+    configure_environment(args, workdir)
+    rng = random.Random(args.seed)
+
+    seeded = await seed(args)
+    tokens = mint_tokens(seeded, rng, args.token_pool)
+    processes = []
+
+    if args.mode == "inprocess":
+        from backend.user_service.main import app as user_app
+        from backend.workout_service import http_client
+        from backend.workout_service.main import app as workout_app
+        http_client.user_service_client = http_client.UserServiceClient(
+            base_url="http://user-service", transport=httpx.ASGITransport(app=user_app)
+        )
+        user = httpx.AsyncClient(transport=httpx.ASGITransport(app=user_app), base_url="http://user-service")
+        workout = httpx.AsyncClient(transport=httpx.ASGITransport(app=workout_app), base_url="http://workout-service")
+        # Both apps share one metrics registry in-process, so scrape it once
+        metrics_clients = [user]
+    else:
+        user_url = f"http://127.0.0.1:{args.user_port}"
+        workout_url = f"http://127.0.0.1:{args.workout_port}"
+        env = {**os.environ, "USER_SERVICE_URL": user_url}
+        for module, port in (("backend.user_service.main:app", args.user_port),
+                             ("backend.workout_service.main:app", args.workout_port)):
+            processes.append(subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", module, "--port", str(port), "--log-level", "warning"], env=env
+            ))
+        await wait_until_healthy(user_url)
+        await wait_until_healthy(workout_url)
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        user = httpx.AsyncClient(base_url=user_url, limits=limits, timeout=30)
+        workout = httpx.AsyncClient(base_url=workout_url, limits=limits, timeout=30)
+        metrics_clients = [user, workout]
+
+    try:
+        clients = Clients(user, workout, seeded, tokens, rng)
+        mix = parse_mix(args.mix)
+        await drive(clients, mix, args.warmup, args.concurrency)
+        sql_before = await scrape_sql(metrics_clients)
+        samples, errors, elapsed = await drive(clients, mix, args.requests, args.concurrency)
+        sql_after = await scrape_sql(metrics_clients)
+    finally:
+        await user.aclose()
+        await workout.aclose()
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=10)
+
+    all_samples = [s for name in samples for s in samples[name]]
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "mode": args.mode,
+            "database": os.environ["SQLALCHEMY_DATABASE_USER_URL"].split("://", 1)[0],
+            "concurrency": args.concurrency,
+            "mix": mix,
+            "bcrypt_rounds": args.bcrypt_rounds,
+            "seed": args.seed,
+        },
+        "dataset": {k: v for k, v in seeded.items() if k != "accepted"},
+        "overall": summarise(all_samples, sum(errors.values()), elapsed),
+        "scenarios": {name: summarise(samples[name], errors[name], elapsed) for name in samples},
+        "queries": sql_delta(sql_before, sql_after),
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps({"overall": report["overall"], "scenarios": report["scenarios"]}, indent=2))
+    print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess")
+    parser.add_argument("--user-db-url", help="defaults to a SQLite file in a temp directory")
+    parser.add_argument("--workout-db-url", help="defaults to a SQLite file in a temp directory")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--users-per-trainer", type=int, default=20)
+    parser.add_argument("--accepted-ratio", type=float, default=0.8)
+    parser.add_argument("--sessions-per-user", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--mix", default="login=1,me=4,mappings=3,create_session=2")
+    parser.add_argument("--token-pool", type=int, default=200, help="distinct user tokens to spread requests over")
+    parser.add_argument("--bcrypt-rounds", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--user-port", type=int, default=18000)
+    parser.add_argument("--workout-port", type=int, default=18010)
+    parser.add_argument("--output", default="bench_results.json")
+    asyncio.run(main(parser.parse_args()))
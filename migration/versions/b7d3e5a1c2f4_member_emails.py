@@ -0,0 +1,40 @@
+"""member emails
+
+Revision ID: b7d3e5a1c2f4
+Revises: 0be209f20ea5
+Create Date: 2026-10-18 10:12:44.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3e5a1c2f4'
+down_revision: Union[str, None] = '0be209f20ea5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'member_emails',
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('account_type', sa.String(), nullable=False),
+        sa.Column('member_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('email'),
+    )
+    # Backfill from both tables; an email already shared by a user and a trainer fails
+    # the upgrade here and has to be resolved by hand first
+    op.execute(
+        "INSERT INTO member_emails (email, account_type, member_id) "
+        "SELECT email, 'user', user_id FROM users WHERE email IS NOT NULL "
+        "UNION ALL "
+        "SELECT email, 'trainer', trainer_id FROM trainers WHERE email IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('member_emails')
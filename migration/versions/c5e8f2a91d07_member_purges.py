@@ -0,0 +1,32 @@
+"""member purges
+
+Revision ID: c5e8f2a91d07
+Revises: b7d3e5a1c2f4
+Create Date: 2026-10-18 16:40:12.218734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e8f2a91d07'
+down_revision: Union[str, None] = 'b7d3e5a1c2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'member_purges',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('account_type', sa.String(), nullable=False),
+        sa.Column('member_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('member_purges')
@@ -0,0 +1,57 @@
+"""homework tables
+
+Revision ID: 4e1c7b9a2d53
+Revises: 
+Create Date: 2026-10-18 17:05:41.902316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e1c7b9a2d53'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('homework_routine',
+    sa.Column('routine_id', sa.Integer(), nullable=False),
+    sa.Column('trainer_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('items', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False),
+    sa.PrimaryKeyConstraint('routine_id')
+    )
+    op.create_index(op.f('ix_homework_routine_trainer_id'), 'homework_routine', ['trainer_id'], unique=False)
+    op.create_table('homework_assignment',
+    sa.Column('assignment_id', sa.Integer(), nullable=False),
+    sa.Column('routine_id', sa.Integer(), nullable=False),
+    sa.Column('trainer_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=True),
+    sa.Column('days_of_week', sa.Integer(), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['routine_id'], ['homework_routine.routine_id'], ),
+    sa.PrimaryKeyConstraint('assignment_id')
+    )
+    op.create_index('ix_homework_assignment_user_id_active', 'homework_assignment', ['user_id', 'active'], unique=False)
+    op.create_table('daily_homework',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('homework_date', sa.Date(), nullable=False),
+    sa.Column('routines', sa.JSON(), nullable=False),
+    sa.PrimaryKeyConstraint('user_id', 'homework_date')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('daily_homework')
+    op.drop_index('ix_homework_assignment_user_id_active', table_name='homework_assignment')
+    op.drop_table('homework_assignment')
+    op.drop_index(op.f('ix_homework_routine_trainer_id'), table_name='homework_routine')
+    op.drop_table('homework_routine')
@@ -0,0 +1,36 @@
+"""workout date as date
+
+Revision ID: c3a91f5d7e24
+Revises: 85eb8dfa2b93
+Create Date: 2026-10-18 10:12:41.208513
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a91f5d7e24'
+down_revision: Union[str, None] = '85eb8dfa2b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column('session_id_mapping', 'workout_date',
+               existing_type=sa.String(),
+               type_=sa.Date(),
+               existing_nullable=False,
+               postgresql_using='workout_date::date')
+    op.create_index('ix_session_id_mapping_user_id_workout_date', 'session_id_mapping', ['user_id', 'workout_date', 'session_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_session_id_mapping_user_id_workout_date', table_name='session_id_mapping')
+    op.alter_column('session_id_mapping', 'workout_date',
+               existing_type=sa.Date(),
+               type_=sa.String(),
+               existing_nullable=False,
+               postgresql_using="to_char(workout_date, 'YYYY-MM-DD')")
@@ -0,0 +1,39 @@
+"""exercise daily progress
+
+Revision ID: d7b2e8f4a610
+Revises: c3a91f5d7e24
+Create Date: 2026-10-18 11:03:17.664210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7b2e8f4a610'
+down_revision: Union[str, None] = 'c3a91f5d7e24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('session', sa.Column('reps', sa.Integer(), nullable=True))
+    op.create_table('exercise_daily_progress',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('workout_key', sa.Integer(), nullable=False),
+    sa.Column('workout_date', sa.Date(), nullable=False),
+    sa.Column('total_sets', sa.Integer(), nullable=False),
+    sa.Column('total_volume', sa.Float(), nullable=False),
+    sa.Column('max_weight', sa.Float(), nullable=False),
+    sa.Column('estimated_1rm', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['workout_key'], ['workout_key_name_mapping.workout_key'], ),
+    sa.PrimaryKeyConstraint('user_id', 'workout_key', 'workout_date')
+    )
+    # Existing sets are folded in afterwards with: python -m backend.workout_service.progress
+
+
+def downgrade() -> None:
+    op.drop_table('exercise_daily_progress')
+    op.drop_column('session', 'reps')
@@ -5,13 +5,14 @@ import logging
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, StaticPool
 from sqlalchemy.sql import text
 from backend.user_service.database import Base as UserBase, get_db as get_user_db
 from backend.user_service.main import app as user_app
 from backend.workout_service.database import Base as WorkoutBase, get_db as get_workout_db
 from backend.workout_service.main import app as workout_app
 from backend.user_service import models, utils
+from backend.workout_service import models as workout_models
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -44,6 +45,28 @@ async def clear_data(session: AsyncSession):
         for table in reversed(WorkoutBase.metadata.sorted_tables):
             await session.execute(table.delete())
 
+# Real user_service tables on a single shared in-memory connection, for crud-level tests
+@pytest_asyncio.fixture
+async def user_db_session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_session() as session:
+        yield session
+    await engine.dispose()
+
+# Real workout_service tables, same setup as user_db_session
+@pytest_asyncio.fixture
+async def workout_db_session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(workout_models.Base.metadata.create_all)
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_session() as session:
+        yield session
+    await engine.dispose()
+
 @pytest_asyncio.fixture(scope="function")
 async def db_session(engine):
     logger.info("Creating new database session")
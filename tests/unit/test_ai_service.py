@@ -0,0 +1,106 @@
+import asyncio
+import importlib.util
+import os
+import sys
+from datetime import date
+
+import httpx
+import jwt
+import numpy as np
+import pytest
+
+# ai-service is deployed as a standalone app (uvicorn main:app), so load it by path
+AI_SERVICE_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "backend", "ai-service")
+sys.path.insert(0, os.path.abspath(AI_SERVICE_DIR))
+import recommender  # noqa: E402
+
+_spec = importlib.util.spec_from_file_location("ai_service_main", os.path.join(AI_SERVICE_DIR, "main.py"))
+ai_main = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ai_main)
+
+SECRET = "ai-service-test-secret-key-with-32-bytes"
+CATALOGUE = [
+    {"workout_key": 1, "workout_name": "Squat", "workout_part": "Legs"},
+    {"workout_key": 2, "workout_name": "Bench Press", "workout_part": "Chest"},
+    {"workout_key": 3, "workout_name": "Deadlift", "workout_part": "Back"},
+]
+
+
+def test_build_features_and_selection():
+    history = [{"session_id": 7, "workout_date": "2024-07-10",
+                "sets": [{"workout_key": 1, "set_num": 1, "weight": 100.0, "reps": 5}]}]
+    features, best_1rm = recommender.build_features(history, CATALOGUE, date(2024, 7, 11))
+
+    assert features.shape == (3, len(recommender.FEATURES))
+    assert features[0, 1] == 0.0 and features[1, 1] == 1.0
+    assert best_1rm[1] == pytest.approx(100 * (1 + 5 / 30))
+
+    model = recommender.RecommendationModel(recommender.DEFAULT_WEIGHTS)
+    picked = recommender.select_exercises(model.score(features), CATALOGUE, best_1rm, {"workout_goal": 1, "workout_duration": 30})
+    assert len(picked) == 3
+    # Legs were trained yesterday, so they rank last
+    assert picked[-1]["workout_key"] == 1
+    assert picked[-1]["target_weight"] == 100.0
+    assert picked[0]["target_weight"] is None
+
+
+def test_sets_follow_training_frequency():
+    features = np.ones((3, len(recommender.FEATURES)))
+    sets = {frequency: recommender.select_exercises(features.sum(axis=1), CATALOGUE, {}, {
+        "workout_goal": 2, "workout_duration": 30, "workout_frequency": frequency})[0]["sets"]
+        for frequency in (None, 2, 3, 6)}
+    assert sets == {None: 4, 2: 5, 3: 4, 6: 3}
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_scores_concurrent_requests_together():
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return recommender.RecommendationModel(recommender.DEFAULT_WEIGHTS)
+
+    batcher = recommender.MicroBatcher(recommender.LazyModel(loader), max_size=8, max_wait=0.01)
+    inputs = [np.random.default_rng(i).random((3, len(recommender.FEATURES))) for i in range(5)]
+    results = await asyncio.gather(*(batcher.score(f) for f in inputs))
+
+    assert loads == [1]
+    assert batcher.stats()["batches"] == 1
+    assert batcher.stats()["requests"] == 5
+    assert batcher.stats()["in_flight"] == 0
+    for features, scores in zip(inputs, results):
+        np.testing.assert_allclose(scores, features @ np.asarray(recommender.DEFAULT_WEIGHTS))
+
+
+@pytest.mark.asyncio
+async def test_recommendation_cached_per_last_session(monkeypatch):
+    calls = {"catalogue": 0, "profile": 0}
+
+    def handler(request: httpx.Request):
+        if request.url.path == "/users/me/":
+            calls["profile"] += 1
+            return httpx.Response(200, json={"user_id": 1, "workout_goal": 2, "workout_duration": 20})
+        if request.url.path == "/users/1/sessions":
+            return httpx.Response(200, json={"sessions": [{"session_id": 7, "workout_date": "2024-07-10", "trainer_id": None,
+                                                           "is_pt": "N", "sets": []}], "next_cursor": None})
+        if request.url.path == "/workouts/catalogue":
+            calls["catalogue"] += 1
+            return httpx.Response(200, json={"version": "v1", "workouts": CATALOGUE}, headers={"ETag": '"v1"'})
+        return httpx.Response(404)
+
+    monkeypatch.setattr(ai_main, "SECRET_KEY", SECRET)
+    monkeypatch.setitem(ai_main.upstream, "client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    ai_main.result_cache.clear()
+    token = jwt.encode({"sub": "user@example.com", "type": "user", "user_id": 1}, SECRET, algorithm="HS256")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=ai_main.app), base_url="http://test") as client:
+        first = await client.get("/users/1/recommendation", headers={"Authorization": f"Bearer {token}"})
+        second = await client.get("/users/1/recommendation", headers={"Authorization": f"Bearer {token}"})
+        forbidden = await client.get("/users/2/recommendation", headers={"Authorization": f"Bearer {token}"})
+
+    assert first.status_code == 200
+    assert first.json()["based_on_session_id"] == 7
+    assert [e["sets"] for e in first.json()["exercises"]] == [4, 4]
+    assert second.json() == first.json()
+    assert calls == {"catalogue": 1, "profile": 1}
+    assert forbidden.status_code == 403
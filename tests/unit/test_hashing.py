@@ -0,0 +1,41 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from backend.user_service import hashing
+
+class TestPasswordHasher:
+    @pytest.mark.asyncio
+    async def test_hash_and_verify(self):
+        hasher = hashing.PasswordHasher(workers=2, max_pending=4, rounds=4)
+        hashed = await hasher.hash("password123")
+        assert await hasher.verify("password123", hashed)
+        assert not await hasher.verify("wrong-password", hashed)
+        stats = hasher.stats()
+        assert stats["completed"] == 3
+        assert stats["pending"] == 0
+        hasher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_saturated_pool_returns_429(self):
+        hasher = hashing.PasswordHasher(workers=1, max_pending=1, rounds=10)
+        first = asyncio.create_task(hasher.hash("password123"))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as exc_info:
+            await hasher.hash("password456")
+        assert exc_info.value.status_code == 429
+        await first
+        assert hasher.stats()["rejected"] == 1
+        hasher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_bcrypt_time_charged_to_current_request(self):
+        from backend.common import metrics
+        hasher = hashing.PasswordHasher(workers=1, max_pending=4, rounds=4)
+        request_metrics = metrics.RequestMetrics()
+        token = metrics._current.set(request_metrics)
+        try:
+            await hasher.hash("password123")
+        finally:
+            metrics._current.reset(token)
+        assert request_metrics.bcrypt_seconds > 0
+        hasher.shutdown()
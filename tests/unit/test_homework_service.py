@@ -0,0 +1,143 @@
+import asyncio
+import importlib.util
+import os
+import sys
+from datetime import date, timedelta
+
+import httpx
+import jwt
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# homework-service is deployed as a standalone app (uvicorn main:app), so load it by path
+HOMEWORK_SERVICE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "backend", "homework-service"))
+HOMEWORK_SIBLINGS = ("database", "models", "schemas", "scheduler")
+os.environ.setdefault("SQLALCHEMY_DATABASE_HOMEWORK_URL", "sqlite+aiosqlite:///:memory:")
+
+
+def _load_homework_service():
+    # main.py imports its siblings as top-level names (import models); those names exist only while
+    # it executes, and the modules are kept as homework_service_* so they can't clash with others
+    saved = {name: sys.modules.pop(name) for name in HOMEWORK_SIBLINGS if name in sys.modules}
+    sys.path.insert(0, HOMEWORK_SERVICE_DIR)
+    try:
+        spec = importlib.util.spec_from_file_location("homework_service_main", os.path.join(HOMEWORK_SERVICE_DIR, "main.py"))
+        main = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(main)
+        loaded = {name: sys.modules.pop(name) for name in HOMEWORK_SIBLINGS if name in sys.modules}
+    finally:
+        sys.path.remove(HOMEWORK_SERVICE_DIR)
+        sys.modules.update(saved)
+    for name, module in loaded.items():
+        sys.modules[f"homework_service_{name}"] = module
+    return main, loaded["models"]
+
+
+hw_main, hw_models = _load_homework_service()
+
+SECRET = "homework-test-secret-key-with-32-bytes"
+
+
+def bearer(claims: dict) -> dict:
+    return {"Authorization": f"Bearer {jwt.encode(claims, SECRET, algorithm='HS256')}"}
+
+TRAINER = bearer({"sub": "trainer@example.com", "type": "trainer", "trainer_id": 9})
+
+
+@pytest_asyncio.fixture
+async def homework_client(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(hw_models.Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    def mappings(request: httpx.Request):
+        return httpx.Response(200, json=[{"mapping_id": i, "user_id": i} for i in range(1, 301)])
+
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    monkeypatch.setattr(hw_main, "SECRET_KEY", SECRET)
+    monkeypatch.setitem(hw_main.upstream, "client", httpx.AsyncClient(transport=httpx.MockTransport(mappings)))
+    monkeypatch.setattr(hw_main.scheduler, "session_factory", session_factory)
+    hw_main.app.dependency_overrides[hw_main.get_db] = override_get_db
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=hw_main.app), base_url="http://test") as client:
+        client.statements = statements
+        yield client
+    hw_main.app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_bulk_assign_fans_out_in_one_transaction(homework_client):
+    routine = await homework_client.post("/routines", headers=TRAINER, json={
+        "name": "Mobility", "items": [{"workout_key": 1, "sets": 3, "reps": 12}]
+    })
+    assert routine.status_code == 200
+
+    homework_client.statements.clear()
+    response = await homework_client.post("/assignments/bulk", headers=TRAINER, json={
+        "routine_id": routine.json()["routine_id"], "user_ids": list(range(1, 301)),
+        "start_date": date.today().isoformat(),
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["assigned"] == 300
+    assert body["daily_rows"] == 300 * hw_main.scheduler.horizon_days
+    assert sum(s.startswith("INSERT INTO homework_assignment") for s in homework_client.statements) <= 2
+
+    today = await homework_client.get("/homework/today", headers=bearer({"type": "user", "user_id": 42}))
+    assert today.status_code == 200
+    assert today.json()["routines"][0]["name"] == "Mobility"
+
+    not_client = await homework_client.post("/assignments/bulk", headers=TRAINER, json={
+        "routine_id": routine.json()["routine_id"], "user_ids": [1, 999], "start_date": date.today().isoformat(),
+    })
+    assert not_client.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_scheduler_rolls_horizon_and_drops_cancelled(homework_client):
+    routine = await homework_client.post("/routines", headers=TRAINER, json={
+        "name": "Core", "items": [{"workout_key": 2, "sets": 2}]
+    })
+    assigned = await homework_client.post("/assignments/bulk", headers=TRAINER, json={
+        "routine_id": routine.json()["routine_id"], "user_ids": [1, 2], "start_date": date.today().isoformat(),
+        "days_of_week": 0b0000001,
+    })
+    assert assigned.status_code == 200
+
+    run = await hw_main.scheduler.run_once(date.today() + timedelta(days=7))
+    assert run["users"] == 2
+    assert run["rows"] == 4  # two Mondays per user in a 14-day horizon
+
+    cancelled = await homework_client.delete(f"/assignments/{assigned.json()['assignment_ids'][0]}", headers=TRAINER)
+    assert cancelled.status_code == 204
+    run = await hw_main.scheduler.run_once(date.today() + timedelta(days=7))
+    assert run["users"] == 1
+
+
+@pytest.mark.asyncio
+async def test_shutdown_waits_for_the_scheduler_task(monkeypatch):
+    states = []
+
+    async def run_forever():
+        states.append("running")
+        try:
+            await asyncio.sleep(3600)
+        finally:
+            states.append("stopped")
+
+    monkeypatch.setattr(hw_main, "HOMEWORK_SCHEDULER_INTERVAL", 60)
+    monkeypatch.setattr(hw_main.scheduler, "run_forever", run_forever)
+    async with hw_main.lifespan(hw_main.app):
+        await asyncio.sleep(0)
+    assert states == ["running", "stopped"]
+    assert hw_main.pool_stats(hw_main.database.engine)["pool_class"]
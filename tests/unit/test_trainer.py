@@ -1,6 +1,7 @@
 import pytest
 from httpx import AsyncClient
 from unittest.mock import AsyncMock, MagicMock
+from types import SimpleNamespace
 from backend.user_service import schemas, models, crud, utils
 
 class TestTrainerRouter:
@@ -25,13 +26,11 @@ class TestTrainerRouter:
     
     @pytest.mark.asyncio
     async def test_login_trainer(self, user_client: AsyncClient, db_session, monkeypatch):
-        mock_trainer = models.Trainer(
-            trainer_id=1,
+        mock_trainer = SimpleNamespace(
+            account_type="trainer",
+            member_id=1,
             email="login_trainer@example.com",
-            first_name="Login",
-            last_name="Trainer",
-            role="trainer",
-            hashed_password="hashed_password"
+            role="trainer"
         )
         mock_authenticate = AsyncMock(return_value=mock_trainer)
         mock_create_token = MagicMock(return_value="mocked_access_token")
@@ -49,7 +48,7 @@ class TestTrainerRouter:
         mock_authenticate.assert_awaited_once_with(db_session, "login_trainer@example.com", "password")
         mock_create_token.assert_called_once()
         call_args = mock_create_token.call_args[1]
-        assert call_args["data"] == {"sub": "login_trainer@example.com", "role": "trainer"}
+        assert call_args["data"] == {"sub": "login_trainer@example.com", "type": "trainer", "role": "trainer", "trainer_id": 1}
         assert "expires_delta" in call_args
 
     @pytest.mark.asyncio
@@ -1,8 +1,20 @@
 import pytest
-from httpx import AsyncClient
+import asyncio
+import httpx
+import jwt
+from httpx import AsyncClient, ASGITransport
 from unittest.mock import AsyncMock, MagicMock
-from backend.user_service import schemas, models, crud, utils
+from types import SimpleNamespace
+from backend.user_service import (schemas, models, crud, utils, hashing, cache, bulk_import, coalesce, member_deletion,
+                                  purge_outbox)
+from backend.common import events
 from datetime import datetime, timedelta
+from sqlalchemy import event, func, select
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+import json
+from backend.user_service.main import app as user_app
 
 class TestUserRouter:
     @pytest.mark.asyncio
@@ -24,11 +36,10 @@ class TestUserRouter:
     
     @pytest.mark.asyncio
     async def test_login_user(self, user_client: AsyncClient, db_session, monkeypatch):
-        mock_user = models.User(
-            user_id=1,
+        mock_user = SimpleNamespace(
+            account_type="user",
+            member_id=1,
             email="login_test@example.com",
-            first_name="Login",
-            last_name="Test",
             role="user"
         )
         mock_authenticate = AsyncMock(return_value=mock_user)
@@ -47,7 +58,7 @@ class TestUserRouter:
         mock_authenticate.assert_awaited_once_with(db_session, "login_test@example.com", "password")
         mock_create_token.assert_called_once()
         call_args = mock_create_token.call_args[1]
-        assert call_args["data"] == {"sub": "login_test@example.com", "role": "user"}
+        assert call_args["data"] == {"sub": "login_test@example.com", "type": "user", "role": "user", "user_id": 1}
         assert "expires_delta" in call_args
         
     @pytest.mark.asyncio
@@ -154,4 +165,465 @@ class TestUserRouter:
 
         response = await authenticated_user_client.delete("/trainer-user-mapping/2")
         assert response.status_code == 200
-        assert "message" in response.json()
\ No newline at end of file
+        assert "message" in response.json()
+class TestAuthenticateMember:
+    @pytest.mark.asyncio
+    async def test_login_resolves_account_type_with_one_query(self, user_db_session, monkeypatch):
+        monkeypatch.setattr(hashing.password_hasher, "rounds", 4)
+        user_db_session.add_all([
+            models.User(email="member@example.com", hashed_password=await hashing.hash_password("password123"),
+                        first_name="Test", last_name="User", role="user"),
+            models.Trainer(email="coach@example.com", hashed_password=await hashing.hash_password("password123"),
+                           first_name="John", last_name="Doe", role="trainer"),
+        ])
+        await user_db_session.commit()
+
+        verify = AsyncMock(wraps=hashing.verify_password)
+        monkeypatch.setattr(hashing, "verify_password", verify)
+
+        trainer = await utils.authenticate_member(user_db_session, "coach@example.com", "password123")
+        assert trainer.account_type == "trainer"
+        assert trainer.role == "trainer"
+        assert verify.await_count == 1
+
+        assert await utils.authenticate_member(user_db_session, "member@example.com", "wrong-password") is None
+        assert await utils.authenticate_member(user_db_session, "nobody@example.com", "password123") is None
+        assert verify.await_count == 2
+
+class TestPrincipalCache:
+    @pytest.mark.asyncio
+    async def test_get_current_member_is_cached_until_update(self, user_db_session, monkeypatch):
+        monkeypatch.setattr(utils, "SECRET_KEY", "test-secret-key-with-at-least-32-bytes")
+        monkeypatch.setattr(cache, "principal_cache", cache.PrincipalCache())
+        user_db_session.add(models.User(email="cached@example.com", first_name="Test", last_name="User", role="user"))
+        await user_db_session.commit()
+
+        lookup = AsyncMock(wraps=crud.get_user_by_email)
+        monkeypatch.setattr(crud, "get_user_by_email", lookup)
+        token = utils.create_access_token(data={"sub": "cached@example.com", "type": "user"})
+
+        first = await utils.get_current_member(token, user_db_session)
+        second = await utils.get_current_member(token, user_db_session)
+        assert second.user_id == first.user_id
+        assert lookup.await_count == 1
+        assert cache.principal_cache.stats()["hits"] == 1
+
+        await crud.update_user(user_db_session, second, {"age": 31})
+        third = await utils.get_current_member(token, user_db_session)
+        assert third.age == 31
+        assert lookup.await_count == 2
+
+class TestUserMappings:
+    @staticmethod
+    def count_statements(session):
+        statements = []
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(session.bind.sync_engine, "before_cursor_execute", before_cursor_execute)
+        return statements
+
+    @pytest.mark.asyncio
+    async def test_get_user_mappings_uses_constant_queries(self, user_db_session):
+        trainer = models.Trainer(email="coach@example.com", hashed_password="x", first_name="John", last_name="Doe")
+        user_db_session.add(trainer)
+        await user_db_session.commit()
+
+        statements = self.count_statements(user_db_session)
+        for clients in (5, 50):
+            users = [models.User(email=f"client{clients}-{i}@example.com", first_name="C", last_name=str(i)) for i in range(clients)]
+            user_db_session.add_all(users)
+            await user_db_session.flush()
+            user_db_session.add_all(
+                models.TrainerUserMap(trainer_id=trainer.trainer_id, user_id=user.user_id, requester_id=user.user_id,
+                                      status=models.MappingStatus.accepted if i % 2 else models.MappingStatus.pending)
+                for i, user in enumerate(users)
+            )
+            await user_db_session.commit()
+
+            statements.clear()
+            mappings = await crud.get_user_mappings(user_db_session, trainer.trainer_id, is_trainer=True, limit=500)
+            assert len(statements) == 1
+            assert mappings[0]["user_email"].startswith("client")
+
+        accepted = await crud.get_user_mappings(user_db_session, trainer.trainer_id, is_trainer=True,
+                                                status=models.MappingStatus.accepted, limit=500)
+        assert len(accepted) == 2 + 25
+        first_page = await crud.get_user_mappings(user_db_session, trainer.trainer_id, is_trainer=True, limit=20)
+        second_page = await crud.get_user_mappings(user_db_session, trainer.trainer_id, is_trainer=True,
+                                                   after_id=first_page[-1]["mapping_id"], limit=100)
+        assert len(first_page) == 20 and len(second_page) == 35
+        assert first_page[-1]["mapping_id"] < second_page[0]["mapping_id"]
+
+class TestMemberListing:
+    @pytest.mark.asyncio
+    async def test_users_keyset_pages_and_stream(self, user_db_session):
+        user_db_session.add_all(models.User(email=f"member{i}@example.com", hashed_password="secret",
+                                            first_name="M", last_name=str(i), role="user") for i in range(25))
+        await user_db_session.commit()
+
+        first_page = await crud.get_users(user_db_session, limit=10)
+        second_page = await crud.get_users(user_db_session, after_id=first_page[-1]["user_id"], limit=10)
+        assert [row["last_name"] for row in second_page] == [str(i) for i in range(10, 20)]
+        assert "hashed_password" not in first_page[0]
+
+        streamed = [row async for row in crud.stream_users(user_db_session, after_id=second_page[-1]["user_id"], batch_size=2)]
+        assert [row["last_name"] for row in streamed] == [str(i) for i in range(20, 25)]
+
+    @pytest.mark.asyncio
+    async def test_read_users_ndjson_export(self, user_client: AsyncClient, monkeypatch):
+        async def fake_stream(db, after_id=None):
+            for i in range(3):
+                yield {"user_id": i + 1, "email": f"member{i}@example.com"}
+        monkeypatch.setattr(crud, "stream_users", fake_stream)
+        user_app.dependency_overrides[utils.admin_required] = lambda: None
+        try:
+            response = await user_client.get("/users/", params={"format": "ndjson"})
+        finally:
+            user_app.dependency_overrides.pop(utils.admin_required, None)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [json.loads(line)["user_id"] for line in response.text.splitlines()] == [1, 2, 3]
+
+class TestBulkImport:
+    @pytest.mark.asyncio
+    async def test_import_members_chunks_and_reports_bad_rows(self, user_db_session):
+        user_db_session.add(models.User(email="taken@example.com", first_name="T", last_name="U", role="user"))
+        await user_db_session.commit()
+        body = (
+            "email,password,first_name,last_name,account_type,trainer_email\n"
+            "coach@example.com,password123,John,Doe,trainer,\n"
+            "a@example.com,password123,A,One,user,coach@example.com\n"
+            "taken@example.com,password123,T,U,user,\n"
+            "b@example.com,short,B,Two,user,\n"
+            "a@example.com,password123,A,Again,user,\n"
+            "c@example.com,password123,C,Three,user,nobody@example.com\n"
+            "d@example.com,password123,D,Four,user,coach@example.com\n"
+        ).encode()
+
+        async def chunks():
+            for i in range(0, len(body), 7):  # splits rows across reads
+                yield body[i:i + 7]
+
+        statements = TestUserMappings.count_statements(user_db_session)
+        hasher = hashing.PasswordHasher(workers=2, max_pending=10, kind="thread", rounds=4)
+        report = await bulk_import.import_members(user_db_session, bulk_import.iter_lines(chunks()), "csv",
+                                                  chunk_size=3, hasher=hasher)
+        hasher.shutdown()
+
+        assert (report.rows, report.trainers_created, report.users_created, report.mappings_created) == (7, 1, 2, 2)
+        assert [(error["line"], error["email"]) for error in report.errors] == [
+            (4, "taken@example.com"), (5, "b@example.com"), (6, "a@example.com"), (7, "c@example.com")]
+        assert report.errors[1]["error"] == "Password must be at least 8 characters long"
+        inserts = [s for s in statements if s.startswith("INSERT INTO users")]
+        assert len(inserts) == 2  # one multi-row INSERT per chunk that had new users
+
+        trainer = await crud.get_trainer_by_email(user_db_session, "coach@example.com")
+        mappings = await crud.get_user_mappings(user_db_session, trainer.trainer_id, is_trainer=True, limit=10)
+        assert sorted(m["user_email"] for m in mappings) == ["a@example.com", "d@example.com"]
+        assert all(m["status"] == models.MappingStatus.accepted for m in mappings)
+
+    @pytest.mark.asyncio
+    async def test_iter_lines_handles_characters_split_across_reads(self):
+        body = "first_name\nZoë\nRenée".encode()
+        for split in range(1, len(body)):
+            async def chunks():
+                yield body[:split]
+                yield body[split:]
+            assert [line async for line in bulk_import.iter_lines(chunks())] == ["first_name", "Zoë", "Renée"]
+
+    @pytest.mark.asyncio
+    async def test_import_keeps_email_case_for_uniqueness(self, user_db_session):
+        user_db_session.add(models.User(email="Taken@Example.com", first_name="T", last_name="U", role="user"))
+        await user_db_session.commit()
+
+        async def lines():
+            for line in ("email,password,first_name,last_name", "Taken@Example.com,password123,T,U"):
+                yield line
+        hasher = hashing.PasswordHasher(workers=1, max_pending=10, kind="thread", rounds=4)
+        report = await bulk_import.import_members(user_db_session, lines(), "csv", hasher=hasher)
+        hasher.shutdown()
+
+        assert report.users_created == 0
+        assert report.errors == [{"line": 2, "email": "Taken@Example.com", "error": "Email already registered"}]
+
+    @pytest.mark.asyncio
+    async def test_import_requires_names_and_reads_multiline_fields(self, user_db_session):
+        async def lines():
+            for line in ("email,password,first_name,last_name", "x@example.com,password123,,",
+                         'y@example.com,password123,"Mary', 'Ann",Lee', "z@example.com,password123,Z,Last"):
+                yield line
+        hasher = hashing.PasswordHasher(workers=1, max_pending=10, kind="thread", rounds=4)
+        report = await bulk_import.import_members(user_db_session, lines(), "csv", hasher=hasher)
+        hasher.shutdown()
+
+        assert report.users_created == 2
+        assert report.errors == [{"line": 2, "email": "x@example.com", "error": "first_name and last_name are required"}]
+        user = await crud.get_user_by_email(user_db_session, "y@example.com")
+        assert user.first_name == "Mary\nAnn"
+        schemas.User.model_validate(user, from_attributes=True)
+
+class TestBatchLookups:
+    @pytest.mark.asyncio
+    async def test_users_batch_resolves_ids_and_emails_in_one_query(self, user_db_session):
+        user_db_session.add_all(models.User(email=f"member{i}@example.com", first_name="M", last_name=str(i), role="user")
+                                for i in range(5))
+        await user_db_session.commit()
+
+        statements = TestUserMappings.count_statements(user_db_session)
+        users = await crud.get_users_batch(user_db_session, [1, 2, 2, 99], ["member4@example.com", "nobody@example.com"])
+        assert len(statements) == 1
+        assert [user["user_id"] for user in users] == [1, 2, 5]
+        assert "hashed_password" not in users[0]
+
+    @pytest.mark.asyncio
+    async def test_single_flight_collapses_concurrent_identical_calls(self):
+        flight = coalesce.SingleFlight("test")
+        loads = 0
+
+        async def load():
+            nonlocal loads
+            loads += 1
+            call = loads
+            await asyncio.sleep(0.01)
+            return [call]
+
+        results = await asyncio.gather(*(flight.do(("a",), load) for _ in range(5)), flight.do(("b",), load))
+        assert loads == 2
+        assert results[:5] == [[1]] * 5
+        assert flight.stats()["collapsed"] == 4
+        assert await flight.do(("a",), load) == [3]  # nothing is cached once the call finishes
+
+    @pytest.mark.asyncio
+    async def test_concurrent_email_lookups_share_one_query(self, user_db_session):
+        user_db_session.add(models.Trainer(email="coach@example.com", hashed_password="x", first_name="John", last_name="Doe"))
+        await user_db_session.commit()
+        sessions = [AsyncSession(user_db_session.bind, expire_on_commit=False) for _ in range(5)]
+        collapsed_before = crud.trainer_email_flight.collapsed
+
+        statements = TestUserMappings.count_statements(user_db_session)
+        trainers = await asyncio.gather(*(crud.get_trainer_by_email(session, "coach@example.com") for session in sessions))
+
+        assert len(statements) == 1
+        assert crud.trainer_email_flight.collapsed - collapsed_before == 4
+        assert len({id(trainer) for trainer in trainers}) == 5
+        assert all(trainer in session for trainer, session in zip(trainers, sessions))
+        assert await crud.get_trainer_by_email(sessions[0], "nobody@example.com") is None
+        for session in sessions:
+            await session.close()
+
+    @pytest.mark.asyncio
+    async def test_read_users_batch_reports_missing(self, user_client: AsyncClient, monkeypatch):
+        async def fake_batch(db, ids, emails):
+            return [{"user_id": 1, "email": "a@example.com", "first_name": "A", "last_name": "One", "role": "user"}]
+        monkeypatch.setattr(crud, "get_users_batch", fake_batch)
+
+        user_app.dependency_overrides[utils.get_current_member] = lambda: models.User(user_id=1, role="user")
+        try:
+            response = await user_client.post("/users/batch", json={"ids": [1, 7], "emails": ["a@example.com", "b@example.com"]})
+            assert (await user_client.post("/users/batch", json={"ids": list(range(501))})).status_code == 422
+        finally:
+            user_app.dependency_overrides.pop(utils.get_current_member, None)
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["missing_ids"] == [7] and body["missing_emails"] == ["b@example.com"]
+
+    @pytest.mark.asyncio
+    async def test_batch_lookups_require_authentication(self, user_client: AsyncClient):
+        for path in ("/users/batch", "/trainers/batch"):
+            assert (await user_client.post(path, json={"ids": [1]})).status_code == 401
+
+class TestPurgeOutbox:
+    @pytest.mark.asyncio
+    async def test_deletions_are_delivered_until_workout_service_confirms(self, user_db_session, monkeypatch):
+        monkeypatch.setattr(events, "publish", AsyncMock())
+        monkeypatch.setattr(utils, "SECRET_KEY", "test-secret-key-with-at-least-32-bytes")
+        user_db_session.add_all(models.User(user_id=i, email=f"member{i}@example.com", first_name="M", last_name=str(i), role="user")
+                                for i in range(1, 4))
+        user_db_session.add(models.Trainer(trainer_id=9, email="coach@example.com", hashed_password="x", first_name="J", last_name="D"))
+        await user_db_session.commit()
+        await crud.delete_user(user_db_session, await user_db_session.get(models.User, 1))
+        [_ async for _ in crud.delete_members(user_db_session, user_ids=[2, 3], trainer_ids=[9])]
+
+        requests, status = [], {"code": 503}
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(status["code"], json={})
+        outbox = purge_outbox.PurgeOutbox(sessionmaker(user_db_session.bind, class_=AsyncSession, expire_on_commit=False),
+                                          base_url="http://workout", batch_size=3, transport=httpx.MockTransport(handler))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await outbox.deliver()  # workout_service down: nothing is dropped
+        assert (await user_db_session.execute(select(func.count()).select_from(models.MemberPurge))).scalar() == 4
+
+        status["code"] = 200
+        assert await outbox.deliver() == 4
+        assert [json.loads(r.content) for r in requests[1:]] == [
+            {"user_ids": [1, 2, 3], "trainer_ids": []}, {"user_ids": [], "trainer_ids": [9]}]
+        token = requests[-1].headers["Authorization"].removeprefix("Bearer ")
+        assert jwt.decode(token, utils.SECRET_KEY, algorithms=["HS256"])["type"] == "service"
+        assert (await user_db_session.execute(select(func.count()).select_from(models.MemberPurge))).scalar() == 0
+
+class TestEmailUniqueness:
+    @pytest.mark.asyncio
+    async def test_signup_probe_and_constraint(self, user_db_session, monkeypatch):
+        monkeypatch.setattr(hashing.password_hasher, "rounds", 4)
+        statements = TestUserMappings.count_statements(user_db_session)
+        assert await crud.is_email_unique(user_db_session, "shared@example.com")
+        assert len(statements) == 1
+
+        await crud.create_trainer(user_db_session, schemas.TrainerCreate(
+            email="shared@example.com", password="password123", first_name="John", last_name="Doe"))
+        assert not await crud.is_email_unique(user_db_session, "shared@example.com")
+
+        # A sign-up that passed the probe before the trainer committed still hits the constraint
+        async def stale_probe(db, email):
+            return True
+        monkeypatch.setattr(crud, "is_email_unique", stale_probe)
+        with pytest.raises(HTTPException) as exc_info:
+            await crud.create_user(user_db_session, schemas.UserCreate(
+                email="shared@example.com", password="password123", first_name="Test", last_name="User"))
+        assert exc_info.value.status_code == 400
+        assert (await user_db_session.execute(select(func.count()).select_from(models.User))).scalar() == 0
+
+class TestSingleStatementUpdates:
+    @pytest.mark.asyncio
+    async def test_update_user_is_one_update_returning(self, user_db_session):
+        user = models.User(email="member@example.com", first_name="Test", last_name="User", role="user", age=30)
+        user_db_session.add(user)
+        await user_db_session.commit()
+
+        statements = TestUserMappings.count_statements(user_db_session)
+        updated = await crud.update_user(user_db_session, user, {"age": 31, "weight": 70.5, "confirm_password": None})
+
+        assert [s.split()[0] for s in statements] == ["UPDATE"]
+        assert (updated.age, updated.weight) == (31, 70.5)
+        assert updated is user
+
+    @pytest.mark.asyncio
+    async def test_mapping_status_checks_are_in_the_update(self, user_db_session, monkeypatch):
+        monkeypatch.setattr(events, "publish", AsyncMock())
+        user_db_session.add_all([
+            models.Trainer(trainer_id=10, email="coach@example.com", hashed_password="x", first_name="J", last_name="D"),
+            models.User(user_id=20, email="member@example.com", first_name="T", last_name="U", role="user"),
+        ])
+        user_db_session.add(models.TrainerUserMap(id=1, trainer_id=10, user_id=20, requester_id=20,
+                                                  status=models.MappingStatus.pending))
+        await user_db_session.commit()
+
+        with pytest.raises(ValueError, match="you requested"):
+            await crud.update_trainer_user_mapping_status(user_db_session, 1, 20, models.MappingStatus.accepted)
+        with pytest.raises(ValueError, match="not authorized"):
+            await crud.update_trainer_user_mapping_status(user_db_session, 1, 99, models.MappingStatus.accepted)
+        with pytest.raises(ValueError, match="not found"):
+            await crud.update_trainer_user_mapping_status(user_db_session, 2, 10, models.MappingStatus.accepted)
+
+        statements = TestUserMappings.count_statements(user_db_session)
+        mapping = await crud.update_trainer_user_mapping_status(user_db_session, 1, 10, models.MappingStatus.accepted)
+        assert [s.split()[0] for s in statements] == ["UPDATE"]
+        assert (mapping.id, mapping.trainer_id, mapping.user_id, mapping.status) == (1, 10, 20, models.MappingStatus.accepted)
+        events.publish.assert_awaited_once_with(events.TRAINER_USER_MAPPING_CHANNEL, {"trainer_id": 10, "user_id": 20})
+
+class TestBulkDelete:
+    @pytest.mark.asyncio
+    async def test_delete_members_chunks_and_reports_progress(self, user_db_session, monkeypatch):
+        monkeypatch.setattr(events, "publish", AsyncMock())
+        user_db_session.add(models.Trainer(trainer_id=1, email="coach@example.com", hashed_password="x", first_name="J", last_name="D"))
+        user_db_session.add_all(models.User(user_id=i, email=f"member{i}@example.com", first_name="M", last_name=str(i), role="user")
+                                for i in range(1, 4))
+        user_db_session.add_all(models.MemberEmail(email=f"member{i}@example.com", account_type="user", member_id=i) for i in range(1, 4))
+        user_db_session.add(models.TrainerUserMap(trainer_id=1, user_id=2, requester_id=2, status=models.MappingStatus.accepted))
+        await user_db_session.commit()
+
+        progress = [line async for line in crud.delete_members(user_db_session, user_ids=[1, 2, 3, 99], trainer_ids=[1], chunk_size=2)]
+
+        assert [(p["account_type"], p["processed"], p["deleted"]) for p in progress] == [("user", 2, 2), ("user", 4, 3), ("trainer", 5, 4)]
+        assert progress[-1]["total"] == 5 and progress[-1]["not_found"] == 1
+        for model in (models.User, models.Trainer, models.MemberEmail, models.TrainerUserMap):
+            assert (await user_db_session.execute(select(func.count()).select_from(model))).scalar() == 0
+        published = [call.args for call in events.publish.await_args_list]
+        assert published == [
+            (events.MEMBER_DELETED_CHANNEL, {"user_ids": [1, 2]}),
+            (events.MEMBER_DELETED_CHANNEL, {"user_ids": [3]}),
+            (events.MEMBER_DELETED_CHANNEL, {"trainer_ids": [1]}),
+        ]
+
+class TestMappingEndpointsWithRealRows:
+    @pytest.mark.asyncio
+    async def test_request_and_check_mapping_end_to_end(self, user_db_session, monkeypatch):
+        monkeypatch.setattr(events, "publish", AsyncMock())
+        trainer = models.Trainer(trainer_id=5, email="coach@example.com", hashed_password="x", first_name="J", last_name="D")
+        user_db_session.add_all([trainer, models.User(user_id=8, email="member@example.com", first_name="T", last_name="U", role="user")])
+        await user_db_session.commit()
+
+        async def override_get_db():
+            yield user_db_session
+        user_app.dependency_overrides[utils.get_db] = override_get_db
+        user_app.dependency_overrides[utils.get_current_member] = lambda: trainer
+        try:
+            async with AsyncClient(transport=ASGITransport(app=user_app), base_url="http://test") as client:
+                response = await client.post("/trainer-user-mapping/request", json={"other_id": 8})
+                assert response.status_code == 200
+                mapping_id = response.json()["id"]
+
+                assert (await client.get("/check-trainer-user-mapping/5/8")).json() == {"exists": False}
+                mapping = await user_db_session.get(models.TrainerUserMap, mapping_id)
+                mapping.status = models.MappingStatus.accepted
+                await user_db_session.commit()
+                response = await client.get("/check-trainer-user-mapping/5/8")
+                assert response.status_code == 200
+                assert response.json() == {"exists": True}
+        finally:
+            user_app.dependency_overrides.pop(utils.get_db, None)
+            user_app.dependency_overrides.pop(utils.get_current_member, None)
+
+    @pytest.mark.asyncio
+    async def test_my_mappings_links_to_the_next_page(self, user_db_session):
+        trainer = models.Trainer(trainer_id=5, email="coach@example.com", hashed_password="x", first_name="J", last_name="D")
+        user_db_session.add(trainer)
+        user_db_session.add_all(models.User(user_id=i, email=f"member{i}@example.com", first_name="M", last_name=str(i), role="user")
+                                for i in range(1, 4))
+        user_db_session.add_all(models.TrainerUserMap(trainer_id=5, user_id=i, status=models.MappingStatus.accepted, requester_id=5)
+                                for i in range(1, 4))
+        await user_db_session.commit()
+
+        async def override_get_db():
+            yield user_db_session
+        user_app.dependency_overrides[utils.get_db] = override_get_db
+        user_app.dependency_overrides[utils.get_current_member] = lambda: trainer
+        try:
+            async with AsyncClient(transport=ASGITransport(app=user_app), base_url="http://test") as client:
+                seen = []
+                url = "/my-mappings/?status=accepted&limit=2"
+                while url:
+                    response = await client.get(url)
+                    assert response.status_code == 200
+                    seen += [m["user_id"] for m in response.json()]
+                    url = response.links.get("next", {}).get("url")
+                assert seen == [1, 2, 3]
+        finally:
+            user_app.dependency_overrides.pop(utils.get_db, None)
+            user_app.dependency_overrides.pop(utils.get_current_member, None)
+
+    @pytest.mark.asyncio
+    async def test_bulk_delete_runs_as_a_background_job(self, user_db_session, user_client: AsyncClient, monkeypatch):
+        monkeypatch.setattr(events, "publish", AsyncMock())
+        user_db_session.add_all(models.User(user_id=i, email=f"member{i}@example.com", first_name="M", last_name=str(i), role="user")
+                                for i in range(1, 4))
+        await user_db_session.commit()
+        jobs = member_deletion.DeletionJobs(sessionmaker(user_db_session.bind, class_=AsyncSession, expire_on_commit=False))
+        monkeypatch.setattr(member_deletion, "deletion_jobs", jobs)
+        user_app.dependency_overrides[utils.admin_required] = lambda: None
+        try:
+            response = await user_client.post("/admin/members/delete", json={"user_ids": [1, 2, 3, 99]})
+            assert response.status_code == 202
+            job_id = response.json()["job_id"]
+            await jobs.get(job_id).task  # the job carries on whether or not anyone polls
+
+            body = (await user_client.get(f"/admin/members/delete/{job_id}")).json()
+            assert (body["status"], body["processed"], body["deleted"], body["not_found"]) == ("done", 4, 3, 1)
+            assert (await user_client.get("/admin/members/delete/unknown")).status_code == 404
+        finally:
+            user_app.dependency_overrides.pop(utils.admin_required, None)
+        assert (await user_db_session.execute(select(func.count()).select_from(models.User))).scalar() == 0